@@ -5,7 +5,7 @@ import re
 from cryptofeed import FeedHandler
 from cryptofeed.defines import L2_BOOK, TRADES, BID, ASK, \
     TICKER, BOOK_TICKER, OKEX, KLINE
-from cryptofeed.callback import BookCallback, TradeCallback, TickerCallback, BookTickerCallback, KlineCallback
+from cryptofeed.callback import BookCallback, TradeCallback, TickerCallback, BookTickerCallback, KlineCallback, SERIAL
 import cryptofeed.exchanges as cryptofeed_exchanges
 
 from .rest_api_exchange import RestApiExchange
@@ -47,10 +47,12 @@ class WebsocketExchange(RestApiExchange):
             elif self._type == 'swap':
                 channels = [L2_BOOK, BOOK_TICKER]
             LOGGER.info("channel %s ", channels)
+            # the quote store queues are multiprocessing proxies (blocking calls) and
+            # must see updates in order, so each callback gets a thread of its own
             callbacks = {
-                L2_BOOK: BookCallback(self._update_order_book_callback),
-                BOOK_TICKER: BookTickerCallback(self._update_book_ticker_callback),
-                KLINE: KlineCallback(self._update_kline_callback),
+                L2_BOOK: BookCallback(self._update_order_book_callback, policy=SERIAL),
+                BOOK_TICKER: BookTickerCallback(self._update_book_ticker_callback, policy=SERIAL),
+                KLINE: KlineCallback(self._update_kline_callback, policy=SERIAL),
             }
         else:
             if self._type == 'spot' or self._name in contract_exchanges_use_common_channel:
@@ -60,8 +62,8 @@ class WebsocketExchange(RestApiExchange):
             elif self._type == 'swap':
                 channels = [TRADES]
             callbacks = {
-                channels[0]: TradeCallback(self._update_trade_callback),
-                KLINE: KlineCallback(self._update_kline_callback),
+                channels[0]: TradeCallback(self._update_trade_callback, policy=SERIAL),
+                KLINE: KlineCallback(self._update_kline_callback, policy=SERIAL),
             }
         if self._name.lower() == 'poloniex':
             self._feed_handler.add_feed(
@@ -4,6 +4,8 @@ Copyright (C) 2017-2020  Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
+from collections.abc import Mapping
+
 from cryptofeed.defines import BID, ASK
 
 
@@ -28,23 +30,19 @@ def book_convert(book: dict, data: dict, convert=str):
     Converting decimal.Decimal to str. Book will remain unmodified,
     data will be modified
     """
-    for level in book[ASK]:
+    for level, value in book[ASK].items():
         _level = convert(level)
-        if isinstance(book[ASK][level], dict):
-            data[ASK][_level] = book[ASK][level]
-            for order in data[ASK][_level]:
-                data[ASK][_level][order] = convert(data[ASK][_level][order])
+        if isinstance(value, Mapping):
+            data[ASK][_level] = {order: convert(size) for order, size in value.items()}
         else:
-            data[ASK][_level] = convert(book[ASK][level])
+            data[ASK][_level] = convert(value)
 
-    for level in reversed(book[BID]):
+    for level, value in reversed(book[BID].items()):
         _level = convert(level)
-        if isinstance(book[BID][level], dict):
-            data[BID][_level] = book[BID][level]
-            for order in data[BID][convert(level)]:
-                data[BID][_level][order] = convert(data[BID][_level][order])
+        if isinstance(value, Mapping):
+            data[BID][_level] = {order: convert(size) for order, size in value.items()}
         else:
-            data[BID][_level] = convert(book[BID][level])
+            data[BID][_level] = convert(value)
 
 
 def book_flatten(feed: str, pair: str, book: dict, timestamp: float, delta: str) -> dict:
@@ -62,7 +60,7 @@ def book_flatten(feed: str, pair: str, book: dict, timestamp: float, delta: str)
     ret = []
     for side in (BID, ASK):
         for price, data in book[side].items():
-            if isinstance(data, dict):
+            if isinstance(data, Mapping):
                 # L3 book
                 for order_id, size in data.items():
                     ret.append({'feed': feed, 'pair': pair, 'side': side, 'price': price, 'size': size, 'order_id': order_id, 'timestamp': timestamp, 'delta': delta})
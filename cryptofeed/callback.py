@@ -5,28 +5,94 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import asyncio
+import functools
 import inspect
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from decimal import Decimal
+from time import perf_counter
+
+
+# execution policies for synchronous callbacks
+INLINE = 'inline'
+THREAD = 'thread'
+SERIAL = 'serial'
+PROCESS = 'process'
+
+_process_pool = None
+
+
+def shutdown_process_pool():
+    """
+    Shut down the process pool of callbacks with the process policy, if it was started
+    """
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True)
+        _process_pool = None
 
 
 class Callback:
-    def __init__(self, callback):
+    def __init__(self, callback, policy: str = THREAD):
+        """
+        policy: str
+            how a synchronous callback is run. 'thread' (default): in the event loop's default thread pool.
+            'inline': called directly on the event loop, for cheap non blocking callbacks. 'serial': in a
+            thread of its own, so calls run one at a time and in order. 'process': in a shared process pool,
+            the callback and its arguments must be picklable. Coroutine callbacks always run on the loop.
+
+        calls and elapsed count the invocations and the seconds the feed waited on them (see stats)
+        """
+        if policy not in (INLINE, THREAD, SERIAL, PROCESS):
+            raise ValueError(f"Invalid callback policy {policy}")
         self.callback = callback
         self.is_async = inspect.iscoroutinefunction(callback)
+        self.policy = policy
+        self.executor = None
+        self.calls = 0
+        self.elapsed = 0.0
+
+    def _executor(self):
+        global _process_pool
+        if self.policy == SERIAL:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1)
+            return self.executor
+        if self.policy == PROCESS:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor()
+            return _process_pool
+        return None
 
     async def __call__(self, *args, **kwargs):
         if self.callback is None:
             return
-        elif self.is_async:
+        start = perf_counter()
+        if self.is_async:
             await self.callback(*args, **kwargs)
+        elif self.policy == INLINE:
+            self.callback(*args, **kwargs)
         else:
             loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, self.callback, *args, **kwargs)
+            await loop.run_in_executor(self._executor(), functools.partial(self.callback, *args, **kwargs))
+        self.calls += 1
+        self.elapsed += perf_counter() - start
+
+    def stats(self) -> dict:
+        return {'policy': self.policy,
+                'calls': self.calls,
+                'elapsed': self.elapsed,
+                'mean': self.elapsed / self.calls if self.calls else 0.0}
+
+    async def stop(self):
+        if self.executor is not None:
+            executor, self.executor = self.executor, None
+            # let queued calls finish without blocking the loop
+            await asyncio.get_event_loop().run_in_executor(None, executor.shutdown)
 
 
 class TradeCallback(Callback):
 
-    def __init__(self, callback, include_order_type=False):
+    def __init__(self, callback, include_order_type=False, policy: str = THREAD):
         """
         include_order_type is currently supported only on Kraken and Coinbase and enables
         the order_type field in callbacks, which contains information about the order type (market/limit).
@@ -35,7 +101,7 @@ class TradeCallback(Callback):
         do not need to specify any L3_BOOK callbacks)
         """
         self.include_order_type = include_order_type
-        super().__init__(callback)
+        super().__init__(callback, policy=policy)
 
     async def __call__(self, *, feed: str, pair: str, side: str, amount: Decimal, price: Decimal, order_id=None,
                        timestamp: float, receipt_timestamp: float, order_type: str = None):
@@ -63,6 +129,14 @@ class BookTickerCallback(Callback):
         await super().__call__(feed, pair, best_bid, best_bid_size, best_ask, best_ask_size, timestamp, receipt_timestamp)
 
 
+class TopOfBookCallback(BookTickerCallback):
+    """
+    For best bid/ask updates synthesized from a maintained L2 book. Invoked
+    whenever the best bid or ask (price or size) changes
+    """
+    pass
+
+
 class BookCallback(Callback):
     """
     For full L2/L3 book updates
@@ -117,3 +191,26 @@ class MarketInfoCallback(Callback):
 
 class TransactionsCallback(Callback):
     pass
+
+
+class BatchCallback(Callback):
+    """
+    For feeds in batch mode (see Feed), receives all the events of one data type collected
+    in a batch with a single call, as a list of event dicts (the keyword arguments the per
+    event callbacks receive), or with columnar=True as a dict of field name to list of values.
+
+    When the feed is not batching, each event is delivered as a batch of one.
+    """
+
+    def __init__(self, callback, columnar=False, policy: str = THREAD):
+        self.columnar = columnar
+        super().__init__(callback, policy=policy)
+
+    async def __call__(self, **kwargs):
+        await self.batch([kwargs])
+
+    async def batch(self, events: list):
+        if self.columnar:
+            await super().__call__({key: [event.get(key) for event in events] for key in events[0]})
+        else:
+            await super().__call__(events)
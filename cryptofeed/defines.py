@@ -52,6 +52,8 @@ TRADES = 'trades'
 TICKER = 'ticker'
 #最优挂单
 BOOK_TICKER = 'book_ticker'
+# best bid/ask synthesized from the maintained L2 book
+TOP_OF_BOOK = 'top_of_book'
 VOLUME = 'volume'
 FUNDING = 'funding'
 OPEN_INTEREST = 'open_interest'
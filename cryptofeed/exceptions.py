@@ -42,5 +42,9 @@ class BadChecksum(Exception):
     pass
 
 
+class IncompleteBook(Exception):
+    pass
+
+
 class RestResponseError(Exception):
     pass
@@ -5,26 +5,29 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import asyncio
+import functools
 import logging
 from collections import defaultdict
 from datetime import datetime
-from decimal import Decimal
 from time import time
 
 import aiohttp
-from sortedcontainers import SortedDict as sd
 from yapic import json
 
 from cryptofeed.defines import BID, ASK, BINANCE, BUY, FUNDING, L2_BOOK, LIQUIDATIONS, OPEN_INTEREST, SELL, TICKER, \
     TRADES, BOOK_TICKER, KLINE
 from cryptofeed.feed import Feed
-from cryptofeed.standards import pair_exchange_to_std, timestamp_normalize
+from cryptofeed.standards import feed_to_exchange, pair_exchange_to_std, timestamp_normalize
+from cryptofeed.util import http
 
 LOG = logging.getLogger('feedhandler')
 
 
 class Binance(Feed):
     id = BINANCE
+    splittable = True
+    redundant = True
+    string_numbers = True
 
     def __init__(self, pairs=None, channels=None, callbacks=None, depth=1000, **kwargs):
         super().__init__(None, pairs=pairs, channels=channels, callbacks=callbacks, **kwargs)
@@ -43,7 +46,11 @@ class Binance(Feed):
                 address += stream
         return address[:-1]
 
+    def _split_address(self):
+        return self._address()
+
     def _reset(self):
+        self.clear_resyncs()
         self.forced = defaultdict(bool)
         self.l2_book = {}
         self.last_update_id = {}
@@ -65,8 +72,8 @@ class Binance(Feed):
             "M": true         // Ignore
         }
         """
-        price = Decimal(msg['p'])
-        amount = Decimal(msg['q'])
+        price = self.parse_numeric(msg['p'])
+        amount = self.parse_numeric(msg['q'])
         await self.callback(TRADES, feed=self.id,
                             order_id=msg['a'],
                             pair=pair_exchange_to_std(msg['s']),
@@ -91,8 +98,8 @@ class Binance(Feed):
         }
         """
         pair = pair_exchange_to_std(msg['s'])
-        bid = Decimal(msg['b'])
-        ask = Decimal(msg['a'])
+        bid = self.parse_numeric(msg['b'])
+        ask = self.parse_numeric(msg['a'])
         last_price = (bid + ask) / 2
         await self.callback(TICKER, feed=self.id,
                             pair=pair,
@@ -117,10 +124,10 @@ class Binance(Feed):
         }
         """
         pair = pair_exchange_to_std(msg['s'])
-        bid = Decimal(msg['b'])
-        bid_size = Decimal(msg['B'])
-        ask = Decimal(msg['a'])
-        ask_size = Decimal(msg['A'])
+        bid = self.parse_numeric(msg['b'])
+        bid_size = self.parse_numeric(msg['B'])
+        ask = self.parse_numeric(msg['a'])
+        ask_size = self.parse_numeric(msg['A'])
         #self, feed, pair, last_price, first_bid, first_ask, timestamp, receipt_timestamp
         await self.callback(BOOK_TICKER, feed=self.id,
                             pair=pair,
@@ -156,30 +163,43 @@ class Binance(Feed):
                             feed=self.id,
                             pair=pair,
                             side=msg['o']['S'],
-                            leaves_qty=Decimal(msg['o']['q']),
-                            price=Decimal(msg['o']['p']),
+                            leaves_qty=self.parse_numeric(msg['o']['q']),
+                            price=self.parse_numeric(msg['o']['p']),
                             order_id=None,
                             timestamp=timestamp_normalize(self.id, msg['E']),
                             receipt_timestamp=timestamp)
 
+    def _snapshot_weight(self) -> int:
+        # request weight of a depth snapshot, by limit
+        for limit, weight in ((100, 1), (500, 5), (1000, 10)):
+            if self.book_depth <= limit:
+                return weight
+        return 50
+
     async def _snapshot(self, pair: str) -> None:
         url = f'{self.rest_endpoint}/depth?symbol={pair}&limit={self.book_depth}'
+        resp = await http.get_json(self.id, url, weight=self._snapshot_weight())
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                response.raise_for_status()
-                resp = await response.json()
-
-                std_pair = pair_exchange_to_std(pair)
-                self.last_update_id[std_pair] = resp['lastUpdateId']
-                self.l2_book[std_pair] = {BID: sd(), ASK: sd()}
-                for s, side in (('bids', BID), ('asks', ASK)):
-                    for update in resp[s]:
-                        price = Decimal(update[0])
-                        amount = Decimal(update[1])
-                        self.l2_book[std_pair][side][price] = amount
-
-    def _check_update_id(self, pair: str, msg: dict) -> (bool, bool):
+        std_pair = pair_exchange_to_std(pair)
+        self.last_update_id[std_pair] = resp['lastUpdateId']
+        self.load_book(std_pair, resp['bids'], resp['asks'])
+
+    def _first_copy(self, stream: str, msg: dict) -> bool:
+        # book updates and book tickers carry update ids, trades the aggregate trade id,
+        # the other streams are periodic and are keyed by event time
+        sequence = msg['u'] if 'u' in msg else msg['a'] if msg.get('e') == 'aggTrade' else msg['E']
+        return self.first_copy(stream, sequence)
+
+    def _resync_book(self, pair: str, msg: dict, timestamp: float):
+        """
+        Resnapshot only this pair's book, its updates are buffered meanwhile and
+        replayed against the new snapshot
+        """
+        self.l2_book.pop(pair, None)
+        self.forced[pair] = False
+        self.resync(pair, functools.partial(self._snapshot, msg['s']), self._apply_book, (msg, msg['s'], timestamp))
+
+    def _check_update_id(self, pair: str, msg: dict, timestamp: float) -> (bool, bool):
         skip_update = False
         forced = not self.forced[pair]
 
@@ -191,8 +211,8 @@ class Binance(Feed):
         elif not forced and self.last_update_id[pair] + 1 == msg['U']:
             self.last_update_id[pair] = msg['u']
         else:
-            self._reset()
-            LOG.warning("%s: Missing book update detected, resetting book", self.id)
+            LOG.warning("%s: Missing book update detected for %s", self.id, pair)
+            self._resync_book(pair, msg, timestamp)
             skip_update = True
 
         return skip_update, forced
@@ -219,13 +239,18 @@ class Binance(Feed):
             ]
         }
         """
+        if self.buffer_update(pair_exchange_to_std(pair), msg, pair, timestamp):
+            return
+        await self._apply_book(msg, pair, timestamp)
+
+    async def _apply_book(self, msg: dict, pair: str, timestamp: float):
         exchange_pair = pair
         pair = pair_exchange_to_std(pair)
 
         if pair not in self.l2_book:
             await self._snapshot(exchange_pair)
 
-        skip_update, forced = self._check_update_id(pair, msg)
+        skip_update, forced = self._check_update_id(pair, msg, timestamp)
         if skip_update:
             return
 
@@ -234,8 +259,8 @@ class Binance(Feed):
 
         for s, side in (('b', BID), ('a', ASK)):
             for update in msg[s]:
-                price = Decimal(update[0])
-                amount = Decimal(update[1])
+                price = self.parse_numeric(update[0])
+                amount = self.parse_numeric(update[1])
 
                 if amount == 0:
                     if price in self.l2_book[pair][side]:
@@ -264,7 +289,7 @@ class Binance(Feed):
                     end_point = f"{self.rest_endpoint}/openInterest?symbol={pair}"
                     async with session.get(end_point) as response:
                         data = await response.text()
-                        data = json.loads(data, parse_float=Decimal)
+                        data = json.loads(data, parse_float=self.parse_numeric)
 
                         oi = data['openInterest']
                         if oi != self.open_interest.get(pair, None):
@@ -337,13 +362,17 @@ class Binance(Feed):
                             )
 
     async def message_handler(self, msg: str, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = self.decode(msg)
 
         # Combined stream events are wrapped as follows: {"stream":"<streamName>","data":<rawPayload>}
         # streamName is of format <symbol>@<channel>
         pair, _ = msg['stream'].split('@', 1)
+        stream = msg['stream']
         msg = msg['data']
 
+        if self.redundancy > 1 and not self._first_copy(stream, msg):
+            return
+
         pair = pair.upper()
 
         if msg['e'] == 'bookTicker':
@@ -370,3 +399,14 @@ class Binance(Feed):
                 asyncio.create_task(self._open_interest(self.pairs if self.pairs else self.config[chan]))
                 break
         self._reset()
+
+        # fetch the book snapshots concurrently, within the exchange's rate limit. Each
+        # pair's updates are buffered until its snapshot is loaded
+        depth = feed_to_exchange(self.id, L2_BOOK)
+        for chan, pair in self.streams():
+            if chan == depth:
+                self.resync(pair_exchange_to_std(pair), functools.partial(self._snapshot, pair), self._apply_book)
+
+    async def subscribe_replica(self, websocket):
+        # subscriptions are part of the address, the replica connection is already subscribed
+        pass
@@ -4,11 +4,8 @@ Copyright (C) 2017-2020  Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
-from decimal import Decimal
 import logging
 
-from yapic import json
-
 from cryptofeed.defines import BINANCE_DELIVERY, OPEN_INTEREST, TICKER
 from cryptofeed.exchange.binance import Binance
 
@@ -40,7 +37,13 @@ class BinanceDelivery(Binance):
             return None
         return address[:-1]
 
-    def _check_update_id(self, pair: str, msg: dict) -> (bool, bool):
+    def _snapshot_weight(self) -> int:
+        for limit, weight in ((50, 2), (100, 5), (500, 10)):
+            if self.book_depth <= limit:
+                return weight
+        return 20
+
+    def _check_update_id(self, pair: str, msg: dict, timestamp: float) -> (bool, bool):
         skip_update = False
         forced = not self.forced[pair]
 
@@ -52,19 +55,23 @@ class BinanceDelivery(Binance):
         elif not forced and self.last_update_id[pair] == msg['pu']:
             self.last_update_id[pair] = msg['u']
         else:
-            self._reset()
-            LOG.warning("%s: Missing book update detected, resetting book", self.id)
+            LOG.warning("%s: Missing book update detected for %s", self.id, pair)
+            self._resync_book(pair, msg, timestamp)
             skip_update = True
         return skip_update, forced
 
     async def message_handler(self, msg: str, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = self.decode(msg)
 
         # Combined stream events are wrapped as follows: {"stream":"<streamName>","data":<rawPayload>}
         # streamName is of format <symbol>@<channel>
         pair, _ = msg['stream'].split('@', 1)
+        stream = msg['stream']
         msg = msg['data']
 
+        if self.redundancy > 1 and not self._first_copy(stream, msg):
+            return
+
         pair = pair.upper()
 
         msg_type = msg.get('e')
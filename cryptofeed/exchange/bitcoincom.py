@@ -5,7 +5,6 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import logging
-from decimal import Decimal
 
 from sortedcontainers import SortedDict as sd
 from yapic import json
@@ -50,8 +49,8 @@ class BitcoinCom(Feed):
             await self.callback(TRADES, feed=self.id,
                                 pair=pair_exchange_to_std(msg['symbol']),
                                 side=BUY if trade['side'] == 'buy' else SELL,
-                                amount=Decimal(trade['quantity']),
-                                price=Decimal(trade['price']),
+                                amount=self.parse_numeric(trade['quantity']),
+                                price=self.parse_numeric(trade['price']),
                                 order_id=None,
                                 timestamp=timestamp_normalize(self.id, trade['timestamp']),
                                 receipt_timestamp=timestamp)
@@ -59,8 +58,8 @@ class BitcoinCom(Feed):
     async def _ticker(self, msg: dict, timestamp: float):
         await self.callback(TICKER, feed=self.id,
                             pair=pair_exchange_to_std(msg['symbol']),
-                            bid=Decimal(msg['bid']),
-                            ask=Decimal(msg['ask']),
+                            bid=self.parse_numeric(msg['bid']),
+                            ask=self.parse_numeric(msg['ask']),
                             timestamp=timestamp_normalize(self.id, msg['timestamp']),
                             receipt_timestamp=timestamp)
 
@@ -68,10 +67,10 @@ class BitcoinCom(Feed):
         pair = pair_exchange_to_std(msg['symbol'])
         self.l2_book[pair] = {
             BID: sd({
-                Decimal(bid['price']): Decimal(bid['size']) for bid in msg['bid']
+                self.parse_numeric(bid['price']): self.parse_numeric(bid['size']) for bid in msg['bid']
             }),
             ASK: sd({
-                Decimal(ask['price']): Decimal(ask['size']) for ask in msg['ask']
+                self.parse_numeric(ask['price']): self.parse_numeric(ask['size']) for ask in msg['ask']
             })
         }
         await self.book_callback(self.l2_book[pair], L2_BOOK, pair, True, None, timestamp_normalize(self.id, msg['timestamp']), timestamp)
@@ -82,18 +81,18 @@ class BitcoinCom(Feed):
         for side in ('bid', 'ask'):
             s = BID if side == 'bid' else ASK
             for entry in msg[side]:
-                price = Decimal(entry['price'])
-                amount = Decimal(entry['size'])
+                price = self.parse_numeric(entry['price'])
+                amount = self.parse_numeric(entry['size'])
                 if amount == 0:
                     delta[s].append((price, 0))
-                    del self.l2_book[pair][s][price]
+                    self.l2_book[pair][s].pop(price, None)
                 else:
                     delta[s].append((price, amount))
                     self.l2_book[pair][s][price] = amount
         await self.book_callback(self.l2_book[pair], L2_BOOK, pair, False, delta, timestamp_normalize(self.id, msg['timestamp']), timestamp)
 
     async def message_handler(self, msg: str, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = self.decode(msg)
         if 'result' in msg and msg['result'] is True:
             return
         elif 'method' in msg:
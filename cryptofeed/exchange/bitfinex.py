@@ -5,8 +5,6 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import logging
-from collections import defaultdict
-from decimal import Decimal
 
 from sortedcontainers import SortedDict as sd
 from yapic import json
@@ -15,6 +13,7 @@ from cryptofeed.defines import BID, ASK, BITFINEX, BUY, FUNDING, L2_BOOK, L3_BOO
 from cryptofeed.exceptions import MissingSequenceNumber
 from cryptofeed.feed import Feed
 from cryptofeed.standards import pair_exchange_to_std, timestamp_normalize
+from cryptofeed.util.l3_book import L3Book
 
 
 LOG = logging.getLogger('feedhandler')
@@ -56,7 +55,6 @@ class Bitfinex(Feed):
            handler: the handler for this channel type
         '''
         self.channel_map = {}
-        self.order_map = defaultdict(dict)
         self.seq_no = 0
 
     async def _ticker(self, msg: dict, timestamp: float):
@@ -96,8 +94,8 @@ class Bitfinex(Feed):
                 await self.callback(FUNDING, feed=self.id,
                                     pair=pair,
                                     side=side,
-                                    amount=Decimal(amount),
-                                    price=Decimal(price),
+                                    amount=self.parse_numeric(amount),
+                                    price=self.parse_numeric(price),
                                     order_id=order_id,
                                     timestamp=ts,
                                     receipt_timestamp=timestamp,
@@ -106,8 +104,8 @@ class Bitfinex(Feed):
                 await self.callback(TRADES, feed=self.id,
                                     pair=pair,
                                     side=side,
-                                    amount=Decimal(amount),
-                                    price=Decimal(price),
+                                    amount=self.parse_numeric(amount),
+                                    price=self.parse_numeric(price),
                                     order_id=order_id,
                                     timestamp=ts,
                                     receipt_timestamp=timestamp)
@@ -145,8 +143,8 @@ class Bitfinex(Feed):
                 self.l2_book[pair] = {BID: sd(), ASK: sd()}
                 for update in msg[1]:
                     price, _, amount = update
-                    price = Decimal(price)
-                    amount = Decimal(amount)
+                    price = self.parse_numeric(price)
+                    amount = self.parse_numeric(amount)
 
                     if amount > 0:
                         side = BID
@@ -158,8 +156,8 @@ class Bitfinex(Feed):
             else:
                 # book update
                 price, count, amount = msg[1]
-                price = Decimal(price)
-                amount = Decimal(amount)
+                price = self.parse_numeric(price)
+                amount = self.parse_numeric(amount)
 
                 if amount > 0:
                     side = BID
@@ -187,18 +185,6 @@ class Bitfinex(Feed):
         """
         For L3 book updates
         """
-        def add_to_book(pair, side, price, order_id, amount):
-            if price in self.l3_book[pair][side]:
-                self.l3_book[pair][side][price][order_id] = amount
-            else:
-                self.l3_book[pair][side][price] = {order_id: amount}
-
-        def remove_from_book(pair, side, order_id):
-            price = self.order_map[pair][side][order_id]['price']
-            del self.l3_book[pair][side][price][order_id]
-            if len(self.l3_book[pair][side][price]) == 0:
-                del self.l3_book[pair][side][price]
-
         delta = {BID: [], ASK: []}
         forced = False
         chan_id = msg[0]
@@ -208,13 +194,12 @@ class Bitfinex(Feed):
         if isinstance(msg[1], list):
             if isinstance(msg[1][0], list):
                 # snapshot so clear orders
-                self.order_map[pair] = {BID: {}, ASK: {}}
-                self.l3_book[pair] = {BID: sd(), ASK: sd()}
+                self.l3_book[pair] = book = L3Book()
 
                 for update in msg[1]:
                     order_id, price, amount = update
-                    price = Decimal(price)
-                    amount = Decimal(amount)
+                    price = self.parse_numeric(price)
+                    amount = self.parse_numeric(amount)
 
                     if amount > 0:
                         side = BID
@@ -222,14 +207,13 @@ class Bitfinex(Feed):
                         side = ASK
                         amount = abs(amount)
 
-                    self.order_map[pair][side][order_id] = {'price': price, 'amount': amount}
-                    add_to_book(pair, side, price, order_id, amount)
+                    book.add(side, order_id, price, amount)
                 forced = True
             else:
                 # book update
                 order_id, price, amount = msg[1]
-                price = Decimal(price)
-                amount = Decimal(amount)
+                price = self.parse_numeric(price)
+                amount = self.parse_numeric(amount)
 
                 if amount > 0:
                     side = BID
@@ -238,21 +222,10 @@ class Bitfinex(Feed):
                     amount = abs(amount)
 
                 if price == 0:
-                    price = self.order_map[pair][side][order_id]['price']
-                    remove_from_book(pair, side, order_id)
-                    del self.order_map[pair][side][order_id]
-                    delta[side].append((order_id, price, 0))
+                    self.l3_book[pair].cancel(order_id, delta)
                 else:
-                    if order_id in self.order_map[pair][side]:
-                        del_price = self.order_map[pair][side][order_id]['price']
-                        delta[side].append((order_id, del_price, 0))
-                        # remove existing order before adding new one
-                        delta[side].append((order_id, price, amount))
-                        remove_from_book(pair, side, order_id)
-                    else:
-                        delta[side].append((order_id, price, amount))
-                    add_to_book(pair, side, price, order_id, amount)
-                    self.order_map[pair][side][order_id] = {'price': price, 'amount': amount}
+                    # an existing order is removed before the new one is added
+                    self.l3_book[pair].add(side, order_id, price, amount, delta)
 
         elif msg[1] == 'hb':
             return
@@ -263,7 +236,7 @@ class Bitfinex(Feed):
         await self.book_callback(self.l3_book[pair], L3_BOOK, pair, forced, delta, timestamp, timestamp)
 
     async def message_handler(self, msg: str, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = self.decode(msg)
 
         if isinstance(msg, list):
             chan_id = msg[0]
@@ -5,7 +5,6 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import logging
-from decimal import Decimal
 
 from sortedcontainers import SortedDict as sd
 from yapic import json
@@ -54,8 +53,8 @@ class Bitmax(Feed):
             await self.callback(TRADES, feed=self.id,
                                 pair=pair_exchange_to_std(msg['s']),
                                 side=SELL if trade['bm'] else BUY,
-                                amount=Decimal(trade['q']),
-                                price=Decimal(trade['p']),
+                                amount=self.parse_numeric(trade['q']),
+                                price=self.parse_numeric(trade['p']),
                                 order_id=None,
                                 timestamp=timestamp_normalize(self.id, trade['t']),
                                 receipt_timestamp=timestamp)
@@ -66,8 +65,8 @@ class Bitmax(Feed):
         for side in ('bids', 'asks'):
             for price, amount in msg[side]:
                 s = BID if side == 'bids' else ASK
-                price = Decimal(price)
-                size = Decimal(amount)
+                price = self.parse_numeric(price)
+                size = self.parse_numeric(amount)
                 if size == 0:
                     delta[s].append((price, 0))
                     if price in self.l2_book[pair][s]:
@@ -78,7 +77,7 @@ class Bitmax(Feed):
         await self.book_callback(self.l2_book[pair], L2_BOOK, pair, True, delta, timestamp_normalize(self.id, msg['ts']), timestamp)
 
     async def message_handler(self, msg: str, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = self.decode(msg)
         if 'm' in msg:
             if msg['m'] == 'depth':
                 await self._book(msg, timestamp)
@@ -7,7 +7,6 @@ associated with this software.
 import logging
 from collections import defaultdict
 from datetime import datetime as dt
-from decimal import Decimal
 
 import requests
 from sortedcontainers import SortedDict as sd
@@ -16,6 +15,7 @@ from yapic import json
 from cryptofeed.defines import BID, ASK, BITMEX, BUY, FUNDING, L2_BOOK, LIQUIDATIONS, OPEN_INTEREST, SELL, TICKER, TRADES
 from cryptofeed.feed import Feed
 from cryptofeed.standards import timestamp_normalize
+from cryptofeed.util.l3_book import L3Book
 
 
 LOG = logging.getLogger('feedhandler')
@@ -44,7 +44,8 @@ class Bitmex(Feed):
         self.order_id = {}
         for pair in self.pairs:
             self.l2_book[pair] = {BID: sd(), ASK: sd()}
-            self.order_id[pair] = defaultdict(dict)
+            # BitMEX book entries are keyed by an id, one per price level
+            self.order_id[pair] = L3Book()
 
     @staticmethod
     def get_symbol_info():
@@ -76,8 +77,8 @@ class Bitmex(Feed):
             await self.callback(TRADES, feed=self.id,
                                 pair=data['symbol'],
                                 side=BUY if data['side'] == 'Buy' else SELL,
-                                amount=Decimal(data['size']),
-                                price=Decimal(data['price']),
+                                amount=self.parse_numeric(data['size']),
+                                price=self.parse_numeric(data['price']),
                                 order_id=data['trdMatchID'],
                                 timestamp=ts,
                                 receipt_timestamp=timestamp)
@@ -101,43 +102,43 @@ class Bitmex(Feed):
             forced = True
 
         if msg['action'] == 'partial':
+            levels = {BID: [], ASK: []}
             for data in msg['data']:
                 side = BID if data['side'] == 'Buy' else ASK
-                price = Decimal(data['price'])
-                size = Decimal(data['size'])
+                price = self.parse_numeric(data['price'])
+                size = self.parse_numeric(data['size'])
                 order_id = data['id']
 
-                self.l2_book[pair][side][price] = size
-                self.order_id[pair][side][order_id] = price
+                levels[side].append((price, size))
+                self.order_id[pair].add(side, order_id, price, size)
+            self.load_book(pair, levels[BID], levels[ASK])
         elif msg['action'] == 'insert':
             for data in msg['data']:
                 side = BID if data['side'] == 'Buy' else ASK
-                price = Decimal(data['price'])
-                size = Decimal(data['size'])
+                price = self.parse_numeric(data['price'])
+                size = self.parse_numeric(data['size'])
                 order_id = data['id']
 
                 self.l2_book[pair][side][price] = size
-                self.order_id[pair][side][order_id] = price
+                self.order_id[pair].add(side, order_id, price, size)
                 delta[side].append((price, size))
         elif msg['action'] == 'update':
             for data in msg['data']:
                 side = BID if data['side'] == 'Buy' else ASK
-                update_size = Decimal(data['size'])
+                update_size = self.parse_numeric(data['size'])
                 order_id = data['id']
 
-                price = self.order_id[pair][side][order_id]
+                _, price = self.order_id[pair].modify(order_id, update_size)
 
                 self.l2_book[pair][side][price] = update_size
-                self.order_id[pair][side][order_id] = price
                 delta[side].append((price, update_size))
         elif msg['action'] == 'delete':
             for data in msg['data']:
                 side = BID if data['side'] == 'Buy' else ASK
                 order_id = data['id']
 
-                delete_price = self.order_id[pair][side][order_id]
-                del self.order_id[pair][side][order_id]
-                del self.l2_book[pair][side][delete_price]
+                _, delete_price = self.order_id[pair].cancel(order_id)
+                self.l2_book[pair][side].pop(delete_price, None)
                 delta[side].append((delete_price, 0))
 
         else:
@@ -152,8 +153,8 @@ class Bitmex(Feed):
         for data in msg['data']:
             await self.callback(TICKER, feed=self.id,
                                 pair=data['symbol'],
-                                bid=Decimal(data['bidPrice']),
-                                ask=Decimal(data['askPrice']),
+                                bid=self.parse_numeric(data['bidPrice']),
+                                ask=self.parse_numeric(data['askPrice']),
                                 timestamp=timestamp_normalize(self.id, data['timestamp']),
                                 receipt_timestamp=timestamp)
 
@@ -460,14 +461,14 @@ class Bitmex(Feed):
                 await self.callback(LIQUIDATIONS, feed=self.id,
                                     pair=data['symbol'],
                                     side=BUY if data['side'] == 'Buy' else SELL,
-                                    leaves_qty=Decimal(data['leavesQty']),
-                                    price=Decimal(data['price']),
+                                    leaves_qty=self.parse_numeric(data['leavesQty']),
+                                    price=self.parse_numeric(data['price']),
                                     order_id=data['orderID'],
                                     timestamp=timestamp,
                                     receipt_timestamp=timestamp)
 
     async def message_handler(self, msg: str, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = self.decode(msg)
         if 'info' in msg:
             LOG.info("%s - info message: %s", self.id, msg)
         elif 'subscribe' in msg:
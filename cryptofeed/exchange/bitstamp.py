@@ -6,7 +6,6 @@ associated with this software.
 '''
 import asyncio
 import logging
-from decimal import Decimal
 
 import aiohttp
 from sortedcontainers import SortedDict as sd
@@ -50,8 +49,8 @@ class Bitstamp(Feed):
 
         for side in (BID, ASK):
             for update in data[side + 's']:
-                price = Decimal(update[0])
-                size = Decimal(update[1])
+                price = self.parse_numeric(update[0])
+                size = self.parse_numeric(update[1])
 
                 if size == 0:
                     if price in self.l2_book[pair][side]:
@@ -72,8 +71,8 @@ class Bitstamp(Feed):
         book = {BID: sd(), ASK: sd()}
         for side in (BID, ASK):
             for price, size, order_id in data[side + 's']:
-                price = Decimal(price)
-                size = Decimal(size)
+                price = self.parse_numeric(price)
+                size = self.parse_numeric(size)
                 book[side].get(price, sd())[order_id] = size
         self.l3_book[pair] = book
         await self.book_callback(self.l3_book[pair], L3_BOOK, pair, False, False, timestamp_normalize(self.id, ts), timestamp)
@@ -102,8 +101,8 @@ class Bitstamp(Feed):
         pair = pair_exchange_to_std(chan.split('_')[-1])
 
         side = BUY if data['type'] == 0 else SELL
-        amount = Decimal(data['amount'])
-        price = Decimal(data['price'])
+        amount = self.parse_numeric(data['amount'])
+        price = self.parse_numeric(data['price'])
         ts = int(data['microtimestamp'])
         order_id = data['id']
         await self.callback(TRADES, feed=self.id,
@@ -116,7 +115,7 @@ class Bitstamp(Feed):
                             order_id=order_id)
 
     async def message_handler(self, msg: str, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = self.decode(msg)
         if 'bts' in msg['event']:
             if msg['event'] == 'bts:connection_established':
                 pass
@@ -152,8 +151,8 @@ class Bitstamp(Feed):
             self.l2_book[std_pair] = {BID: sd(), ASK: sd()}
             for s, side in (('bids', BID), ('asks', ASK)):
                 for update in r[s]:
-                    price = Decimal(update[0])
-                    amount = Decimal(update[1])
+                    price = self.parse_numeric(update[0])
+                    amount = self.parse_numeric(update[1])
                     self.l2_book[std_pair][side][price] = amount
 
     async def subscribe(self, websocket):
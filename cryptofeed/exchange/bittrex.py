@@ -1,7 +1,6 @@
 import base64
 import logging
 import zlib
-from decimal import Decimal
 
 import requests
 from sortedcontainers import SortedDict as sd
@@ -32,7 +31,7 @@ class Bittrex(Feed):
     async def ticker(self, msg: dict, timestamp: float):
         for t in msg['D']:
             if (not self.config and t['M'] in self.pairs) or ('SubscribeToSummaryDeltas' in self.config and t['M'] in self.config['SubscribeToSummaryDeltas']):
-                await self.callback(TICKER, feed=self.id, pair=pair_exchange_to_std(t['M']), bid=Decimal(t['B']), ask=Decimal(t['A']), timestamp=timestamp_normalize(self.id, t['T']), receipt_timestamp=timestamp)
+                await self.callback(TICKER, feed=self.id, pair=pair_exchange_to_std(t['M']), bid=self.parse_numeric(t['B']), ask=self.parse_numeric(t['A']), timestamp=timestamp_normalize(self.id, t['T']), receipt_timestamp=timestamp)
 
     async def _snapshot(self, msg: dict, timestamp: float):
         pair = pair_exchange_to_std(msg['M'])
@@ -83,17 +82,17 @@ class Bittrex(Feed):
                 if update['M'] == 'uE':
                     # Book deltas + Trades
                     for message in update['A']:
-                        data = json.loads(zlib.decompress(base64.b64decode(message), -zlib.MAX_WBITS).decode(), parse_float=Decimal)
+                        data = json.loads(zlib.decompress(base64.b64decode(message), -zlib.MAX_WBITS).decode(), parse_float=self.parse_numeric)
                         await self.book(data, timestamp)
                         if 'f' in data and data['f']:
                             await self.trades(data['M'], data['f'], timestamp)
                 if update['M'] == 'uS':
                     # Tickers
                     for message in update['A']:
-                        data = json.loads(zlib.decompress(base64.b64decode(message), -zlib.MAX_WBITS).decode(), parse_float=Decimal)
+                        data = json.loads(zlib.decompress(base64.b64decode(message), -zlib.MAX_WBITS).decode(), parse_float=self.parse_numeric)
                         await self.ticker(data, timestamp)
         elif 'R' in msg and isinstance(msg['R'], str):
-            data = json.loads(zlib.decompress(base64.b64decode(msg['R']), -zlib.MAX_WBITS).decode(), parse_float=Decimal)
+            data = json.loads(zlib.decompress(base64.b64decode(msg['R']), -zlib.MAX_WBITS).decode(), parse_float=self.parse_numeric)
             await self._snapshot(data, timestamp)
         elif 'E' in msg:
             LOG.error("%s: Error from exchange %s", self.id, msg)
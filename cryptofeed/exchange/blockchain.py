@@ -6,7 +6,6 @@ associated with this software.
 '''
 import json
 import logging
-from decimal import Decimal
 from itertools import product
 
 from sortedcontainers import SortedDict as sd
@@ -152,7 +151,7 @@ class Blockchain(Feed):
             LOG.warning("%s: Invalid message type %s", self.id, msg)
 
     async def message_handler(self, msg: str, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = self.decode(msg)
         if self.seq_no is not None and msg['seqnum'] != self.seq_no + 1:
             LOG.warning("%s: Missing sequence number detected!", self.id)
             raise MissingSequenceNumber("Missing sequence number, restarting")
@@ -5,7 +5,6 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import logging
-from decimal import Decimal
 
 from sortedcontainers import SortedDict as sd
 from yapic import json
@@ -21,6 +20,7 @@ LOG = logging.getLogger('feedhandler')
 
 class Bybit(Feed):
     id = BYBIT
+    splittable = True
 
     def __init__(self, pairs=None, channels=None, callbacks=None, **kwargs):
         super().__init__('wss://stream.bybit.com/realtime', pairs=pairs, channels=channels, callbacks=callbacks, **kwargs)
@@ -29,7 +29,7 @@ class Bybit(Feed):
         self.l2_book = {}
 
     async def message_handler(self, msg: str, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = self.decode(msg)
 
         if "success" in msg:
             if msg['success']:
@@ -168,8 +168,8 @@ class Bybit(Feed):
                                 pair=normalize_pair(trade['symbol']),
                                 order_id=trade['trade_id'],
                                 side=BUY if trade['side'] == 'Buy' else SELL,
-                                amount=Decimal(trade['size']),
-                                price=Decimal(trade['price']),
+                                amount=self.parse_numeric(trade['size']),
+                                price=self.parse_numeric(trade['price']),
                                 timestamp=timestamp_normalize(self.id, trade['trade_time_ms']),
                                 receipt_timestamp=timestamp
                                 )
@@ -185,20 +185,20 @@ class Bybit(Feed):
             self.l2_book[pair] = {BID: sd({}), ASK: sd({})}
             for update in data:
                 side = BID if update['side'] == 'Buy' else ASK
-                self.l2_book[pair][side][Decimal(update['price'])] = Decimal(update['size'])
+                self.l2_book[pair][side][self.parse_numeric(update['price'])] = self.parse_numeric(update['size'])
             forced = True
         else:
             for delete in data['delete']:
                 side = BID if delete['side'] == 'Buy' else ASK
-                price = Decimal(delete['price'])
+                price = self.parse_numeric(delete['price'])
                 delta[side].append((price, 0))
-                del self.l2_book[pair][side][price]
+                self.l2_book[pair][side].pop(price, None)
 
             for utype in ('update', 'insert'):
                 for update in data[utype]:
                     side = BID if update['side'] == 'Buy' else ASK
-                    price = Decimal(update['price'])
-                    amount = Decimal(update['size'])
+                    price = self.parse_numeric(update['price'])
+                    amount = self.parse_numeric(update['size'])
                     delta[side].append((price, amount))
                     self.l2_book[pair][side][price] = amount
 
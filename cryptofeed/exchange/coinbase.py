@@ -5,17 +5,19 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import asyncio
+import functools
 import logging
 import time
-from decimal import Decimal
+from collections import defaultdict
 
-import requests
 from sortedcontainers import SortedDict as sd
 from yapic import json
 
 from cryptofeed.defines import BID, ASK, BUY, COINBASE, L2_BOOK, L3_BOOK, SELL, TICKER, TRADES
 from cryptofeed.feed import Feed
 from cryptofeed.standards import pair_exchange_to_std, timestamp_normalize
+from cryptofeed.util import http
+from cryptofeed.util.l3_book import L3Book
 
 
 LOG = logging.getLogger('feedhandler')
@@ -23,6 +25,9 @@ LOG = logging.getLogger('feedhandler')
 
 class Coinbase(Feed):
     id = COINBASE
+    redundant = True
+    string_numbers = True
+    rest_endpoint = 'https://api.pro.coinbase.com'
 
     def __init__(self, pairs=None, channels=None, callbacks=None, **kwargs):
         super().__init__('wss://ws-feed.pro.coinbase.com', pairs=pairs, channels=channels, callbacks=callbacks, **kwargs)
@@ -32,10 +37,13 @@ class Coinbase(Feed):
         self.keep_l3_book = False
         if callbacks and L3_BOOK in callbacks:
             self.keep_l3_book = True
+        # without an L3 book, open and change messages from the full channel are not used and can be dropped
+        # undecoded (with the json parser, see message_handler)
+        self.skip_unused = not self.keep_l3_book and ('full' in self.channels or 'full' in self.config)
         self.__reset()
 
     def __reset(self):
-        self.order_map = {}
+        self.clear_resyncs()
         self.order_type_map = {}
         self.seq_no = {}
         self.l3_book = {}
@@ -77,8 +85,8 @@ class Coinbase(Feed):
         '''
         await self.callback(TICKER, feed=self.id,
                             pair=pair_exchange_to_std(msg['product_id']),
-                            bid=Decimal(msg['best_bid']),
-                            ask=Decimal(msg['best_ask']),
+                            bid=self.parse_numeric(msg['best_bid']),
+                            ask=self.parse_numeric(msg['best_ask']),
                             timestamp=timestamp_normalize(self.id, msg['time']),
                             receipt_timestamp=timestamp)
 
@@ -101,25 +109,15 @@ class Coinbase(Feed):
 
         if self.keep_l3_book and ('full' in self.channels or ('full' in self.config and pair in self.config['full'])):
             delta = {BID: [], ASK: []}
-            price = Decimal(msg['price'])
-            side = ASK if msg['side'] == 'sell' else BID
-            size = Decimal(msg['size'])
+            size = self.parse_numeric(msg['size'])
             maker_order_id = msg['maker_order_id']
             ts = timestamp_normalize(self.id, msg['time'])
 
-            _, new_size = self.order_map[maker_order_id]
+            _, _, new_size = self.l3_book[pair].order(maker_order_id)
             new_size -= size
             if new_size <= 0:
-                del self.order_map[maker_order_id]
                 self.order_type_map.pop(maker_order_id, None)
-                delta[side].append((maker_order_id, price, 0))
-                del self.l3_book[pair][side][price][maker_order_id]
-                if len(self.l3_book[pair][side][price]) == 0:
-                    del self.l3_book[pair][side][price]
-            else:
-                self.order_map[maker_order_id] = (price, new_size)
-                self.l3_book[pair][side][price][maker_order_id] = new_size
-                delta[side].append((maker_order_id, price, new_size))
+            self.l3_book[pair].modify(maker_order_id, new_size, delta)
 
             await self.book_callback(self.l3_book[pair], L3_BOOK, pair, False, delta, ts, timestamp)
 
@@ -129,8 +127,8 @@ class Coinbase(Feed):
                             pair=pair_exchange_to_std(msg['product_id']),
                             order_id=msg['trade_id'],
                             side=SELL if msg['side'] == 'buy' else BUY,
-                            amount=Decimal(msg['size']),
-                            price=Decimal(msg['price']),
+                            amount=self.parse_numeric(msg['size']),
+                            price=self.parse_numeric(msg['price']),
                             timestamp=timestamp_normalize(self.id, msg['time']),
                             receipt_timestamp=timestamp,
                             order_type=order_type
@@ -140,11 +138,11 @@ class Coinbase(Feed):
         pair = pair_exchange_to_std(msg['product_id'])
         self.l2_book[pair] = {
             BID: sd({
-                Decimal(price): Decimal(amount)
+                self.parse_numeric(price): self.parse_numeric(amount)
                 for price, amount in msg['bids']
             }),
             ASK: sd({
-                Decimal(price): Decimal(amount)
+                self.parse_numeric(price): self.parse_numeric(amount)
                 for price, amount in msg['asks']
             })
         }
@@ -156,12 +154,12 @@ class Coinbase(Feed):
         delta = {BID: [], ASK: []}
         for side, price, amount in msg['changes']:
             side = BID if side == 'buy' else ASK
-            price = Decimal(price)
-            amount = Decimal(amount)
+            price = self.parse_numeric(price)
+            amount = self.parse_numeric(amount)
             bidask = self.l2_book[pair][side]
 
             if amount == 0:
-                del bidask[price]
+                bidask.pop(price, None)
                 delta[side].append((price, 0))
             else:
                 bidask[price] = amount
@@ -177,51 +175,48 @@ class Coinbase(Feed):
         # the subsequent messages, causing a seq no mismatch.
         await asyncio.sleep(2)
 
-        url = 'https://api.pro.coinbase.com/products/{}/book?level=3'
-        urls = [url.format(pair) for pair in pairs]
-
+        # requests are spaced by the shared rate limiter (3 per second)
         results = []
-        for url in urls:
-            ret = requests.get(url)
-            results.append(ret)
-            # rate limit - 3 per second
-            await asyncio.sleep(0.3)
+        for pair in pairs:
+            results.append(await http.get_json(self.id, f'{self.rest_endpoint}/products/{pair}/book?level=3'))
 
         timestamp = time.time()
-        for res, pair in zip(results, pairs):
-            orders = res.json()
-            npair = pair_exchange_to_std(pair)
-            self.l3_book[npair] = {BID: sd(), ASK: sd()}
-            self.seq_no[npair] = orders['sequence']
-            for side in (BID, ASK):
-                for price, size, order_id in orders[side + 's']:
-                    price = Decimal(price)
-                    size = Decimal(size)
-                    if price in self.l3_book[npair][side]:
-                        self.l3_book[npair][side][price][order_id] = size
-                    else:
-                        self.l3_book[npair][side][price] = {order_id: size}
-                    self.order_map[order_id] = (price, size)
+        for orders, pair in zip(results, pairs):
+            npair = self._load_book(pair, orders)
             await self.book_callback(self.l3_book[npair], L3_BOOK, npair, True, None, timestamp, timestamp)
 
+    async def _pair_book_snapshot(self, pair: str):
+        """
+        Snapshot a single pair, when resyncing it after a sequence gap
+        """
+        # same delay as _book_snapshot, so the snapshot is not older than the buffered messages
+        await asyncio.sleep(2)
+        orders = await http.get_json(self.id, f'{self.rest_endpoint}/products/{pair}/book?level=3')
+        timestamp = time.time()
+        npair = self._load_book(pair, orders)
+        await self.book_callback(self.l3_book[npair], L3_BOOK, npair, True, None, timestamp, timestamp)
+
+    def _load_book(self, pair: str, orders: dict) -> str:
+        npair = pair_exchange_to_std(pair)
+        self.l3_book[npair] = book = L3Book()
+        self.seq_no[npair] = orders['sequence']
+        for side in (BID, ASK):
+            for price, size, order_id in orders[side + 's']:
+                book.add(side, order_id, self.parse_numeric(price), self.parse_numeric(size))
+        return npair
+
     async def _open(self, msg: dict, timestamp: float):
         if not self.keep_l3_book:
             return
         delta = {BID: [], ASK: []}
-        price = Decimal(msg['price'])
+        price = self.parse_numeric(msg['price'])
         side = ASK if msg['side'] == 'sell' else BID
-        size = Decimal(msg['remaining_size'])
+        size = self.parse_numeric(msg['remaining_size'])
         pair = pair_exchange_to_std(msg['product_id'])
         order_id = msg['order_id']
         ts = timestamp_normalize(self.id, msg['time'])
 
-        if price in self.l3_book[pair][side]:
-            self.l3_book[pair][side][price][order_id] = size
-        else:
-            self.l3_book[pair][side][price] = {order_id: size}
-        self.order_map[order_id] = (price, size)
-
-        delta[side].append((order_id, price, size))
+        self.l3_book[pair].add(side, order_id, price, size, delta)
 
         await self.book_callback(self.l3_book[pair], L3_BOOK, pair, False, delta, ts, timestamp)
 
@@ -238,23 +233,16 @@ class Coinbase(Feed):
 
         order_id = msg['order_id']
         self.order_type_map.pop(order_id, None)
-        if order_id not in self.order_map:
+        pair = pair_exchange_to_std(msg['product_id'])
+        if pair not in self.l3_book:
             return
 
-        del self.order_map[order_id]
-        if self.keep_l3_book:
-            delta = {BID: [], ASK: []}
+        delta = {BID: [], ASK: []}
+        if self.l3_book[pair].cancel(order_id, delta) is None:
+            return
 
-            price = Decimal(msg['price'])
-            side = ASK if msg['side'] == 'sell' else BID
-            pair = pair_exchange_to_std(msg['product_id'])
+        if self.keep_l3_book:
             ts = timestamp_normalize(self.id, msg['time'])
-
-            del self.l3_book[pair][side][price][order_id]
-            if len(self.l3_book[pair][side][price]) == 0:
-                del self.l3_book[pair][side][price]
-            delta[side].append((order_id, price, 0))
-
             await self.book_callback(self.l3_book[pair], L3_BOOK, pair, False, delta, ts, timestamp)
 
     async def _received(self, msg: dict, timestamp: float):
@@ -287,37 +275,45 @@ class Coinbase(Feed):
             return
 
         order_id = msg['order_id']
-        if order_id not in self.order_map:
+        pair = pair_exchange_to_std(msg['product_id'])
+        if pair not in self.l3_book or self.l3_book[pair].order(order_id) is None:
             return
 
         ts = timestamp_normalize(self.id, msg['time'])
-        price = Decimal(msg['price'])
-        side = ASK if msg['side'] == 'sell' else BID
-        new_size = Decimal(msg['new_size'])
-        pair = pair_exchange_to_std(msg['product_id'])
-
-        self.l3_book[pair][side][price][order_id] = new_size
-        self.order_map[order_id] = (price, new_size)
+        new_size = self.parse_numeric(msg['new_size'])
+        self.l3_book[pair].modify(order_id, new_size, delta)
 
-        delta[side].append((order_id, price, new_size))
-
-        await self.book_callback(self.l3_book, L3_BOOK, pair, False, delta, ts, timestamp)
+        await self.book_callback(self.l3_book[pair], L3_BOOK, pair, False, delta, ts, timestamp)
 
     async def message_handler(self, msg: str, timestamp: float):
         # PERF perf_start(self.id, 'msg')
-        msg = json.loads(msg, parse_float=Decimal)
+        # the prefilter only pays for itself against the stdlib parser, orjson/yapic decode about as fast
+        if self.skip_unused and self.decoder.parser == 'json' and self.decoder.field(msg, 'type') in ('open', 'change'):
+            return
+        msg = self.decode(msg)
+        await self._handle(msg, timestamp)
 
+    async def _handle(self, msg: dict, timestamp: float, replay=False):
         if 'product_id' in msg and 'sequence' in msg and ('full' in self.channels or ('full' in self.config and msg['product_id'] in self.config['full'])):
             pair = pair_exchange_to_std(msg['product_id'])
+            if not replay and self.buffer_update(pair, msg, timestamp):
+                return
+            if pair not in self.seq_no:
+                # a redundant connection can deliver messages before the primary has a snapshot
+                return
             if msg['sequence'] <= self.seq_no[pair]:
                 return
             elif (self.keep_l3_book and ('full' in self.channels or 'full' in self.config)) and msg['sequence'] != self.seq_no[pair] + 1:
                 LOG.warning("%s: Missing sequence number detected for %s", self.id, pair)
-                LOG.warning("%s: Requesting book snapshot", self.id)
-                await self._book_snapshot(self.pairs or self.book_pairs)
+                self.resync(pair, functools.partial(self._pair_book_snapshot, msg['product_id']),
+                            functools.partial(self._handle, replay=True), (msg, timestamp))
                 return
 
             self.seq_no[pair] = msg['sequence']
+        elif self.redundancy > 1 and 'product_id' in msg and 'sequence' in msg:
+            # tickers are numbered with the sequence of the match that triggered them
+            if not self.first_copy((msg['product_id'], msg['type'] == 'ticker'), msg['sequence']):
+                return
 
         if 'type' in msg:
             if msg['type'] == 'ticker':
@@ -366,3 +362,17 @@ class Coinbase(Feed):
                                              }))
         if 'full' in self.channels or snapshot:
             await self._book_snapshot(self.pairs or self.book_pairs)
+
+    def replica_streams(self) -> list:
+        # level2 messages are not sequenced, only the primary connection receives them
+        return [(chan, pair) for chan, pair in self.streams() if chan != 'level2']
+
+    async def subscribe_replica(self, websocket):
+        channels = defaultdict(list)
+        for chan, pair in self.replica_streams():
+            channels[chan].append(pair)
+        for chan, pairs in channels.items():
+            await websocket.send(json.dumps({"type": "subscribe",
+                                             "product_ids": pairs,
+                                             "channels": [chan]
+                                             }))
@@ -5,7 +5,6 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import asyncio
-from decimal import Decimal
 
 import aiohttp
 from sortedcontainers import SortedDict as sd
@@ -59,8 +58,8 @@ class Coinbene(RestFeed):
                 for trade in data['trades']:
                     if timestamp_normalize(self.id, trade['time']) <= self.last_trade_update[pair]:
                         continue
-                    price = Decimal(trade['price'])
-                    amount = Decimal(trade['quantity'])
+                    price = self.parse_numeric(trade['price'])
+                    amount = self.parse_numeric(trade['quantity'])
                     side = BUY if trade['take'] == 'buy' else SELL
 
                     await self.callback(TRADES, feed=self.id,
@@ -93,8 +92,8 @@ class Coinbene(RestFeed):
         """
         async with session.get(f"{self.address}ticker?symbol={pair}") as response:
             data = await response.json()
-            bid = Decimal(data['ticker'][0]['bid'])
-            ask = Decimal(data['ticker'][0]['ask'])
+            bid = self.parse_numeric(data['ticker'][0]['bid'])
+            ask = self.parse_numeric(data['ticker'][0]['ask'])
             await self.callback(TICKER, feed=self.id,
                                 pair=pair_exchange_to_std(pair),
                                 bid=bid,
@@ -106,9 +105,9 @@ class Coinbene(RestFeed):
             data = await response.json()
 
             book = {ASK: sd({
-                Decimal(entry['price']): Decimal(entry['quantity']) for entry in data['orderbook']['asks']
+                self.parse_numeric(entry['price']): self.parse_numeric(entry['quantity']) for entry in data['orderbook']['asks']
             }), BID: sd({
-                Decimal(entry['price']): Decimal(entry['quantity']) for entry in data['orderbook']['bids']
+                self.parse_numeric(entry['price']): self.parse_numeric(entry['quantity']) for entry in data['orderbook']['bids']
             })}
 
             await self.callback(L2_BOOK, feed=self.id,
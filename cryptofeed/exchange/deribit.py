@@ -1,8 +1,6 @@
 import logging
-from decimal import Decimal
 
 import requests
-from sortedcontainers import SortedDict as sd
 from yapic import json
 
 from cryptofeed.defines import BID, ASK, BUY, DERIBIT, FUNDING, L2_BOOK, LIQUIDATIONS, OPEN_INTEREST, SELL, TICKER, TRADES
@@ -81,8 +79,8 @@ class Deribit(Feed):
                                 pair=trade["instrument_name"],
                                 order_id=trade['trade_id'],
                                 side=BUY if trade['direction'] == 'buy' else SELL,
-                                amount=Decimal(trade['amount']),
-                                price=Decimal(trade['price']),
+                                amount=self.parse_numeric(trade['amount']),
+                                price=self.parse_numeric(trade['price']),
                                 timestamp=timestamp_normalize(self.id, trade['timestamp']),
                                 receipt_timestamp=timestamp,
                                 )
@@ -91,8 +89,8 @@ class Deribit(Feed):
                                     feed=self.id,
                                     pair=trade["instrument_name"],
                                     side=BUY if trade['direction'] == 'buy' else SELL,
-                                    leaves_qty=Decimal(trade['amount']),
-                                    price=Decimal(trade['price']),
+                                    leaves_qty=self.parse_numeric(trade['amount']),
+                                    price=self.parse_numeric(trade['price']),
                                     order_id=trade['trade_id'],
                                     timestamp=timestamp_normalize(self.id, trade['timestamp']),
                                     receipt_timestamp=timestamp
@@ -134,8 +132,8 @@ class Deribit(Feed):
         ts = timestamp_normalize(self.id, msg['params']['data']['timestamp'])
         await self.callback(TICKER, feed=self.id,
                             pair=pair,
-                            bid=Decimal(msg["params"]["data"]['best_bid_price']),
-                            ask=Decimal(msg["params"]["data"]['best_ask_price']),
+                            bid=self.parse_numeric(msg["params"]["data"]['best_bid_price']),
+                            ask=self.parse_numeric(msg["params"]["data"]['best_ask_price']),
                             timestamp=ts,
                             receipt_timestamp=timestamp)
 
@@ -196,17 +194,8 @@ class Deribit(Feed):
         """
         ts = msg["params"]["data"]["timestamp"]
         pair = msg["params"]["data"]["instrument_name"]
-        self.l2_book[pair] = {
-            BID: sd({
-                Decimal(price): Decimal(amount)
-                # _ is always 'new' for snapshot
-                for _, price, amount in msg["params"]["data"]["bids"]
-            }),
-            ASK: sd({
-                Decimal(price): Decimal(amount)
-                for _, price, amount in msg["params"]["data"]["asks"]
-            })
-        }
+        # levels are [action, price, amount], action is always 'new' for snapshot
+        self.load_book(pair, msg["params"]["data"]["bids"], msg["params"]["data"]["asks"], price=1, size=2)
 
         self.seq_no[pair] = msg["params"]["data"]["change_id"]
 
@@ -228,24 +217,24 @@ class Deribit(Feed):
         for action, price, amount in msg["params"]["data"]["bids"]:
             bidask = self.l2_book[pair][BID]
             if action != "delete":
-                bidask[price] = Decimal(amount)
-                delta[BID].append((Decimal(price), Decimal(amount)))
+                bidask[price] = self.parse_numeric(amount)
+                delta[BID].append((self.parse_numeric(price), self.parse_numeric(amount)))
             else:
-                del bidask[price]
-                delta[BID].append((Decimal(price), Decimal(amount)))
+                bidask.pop(price, None)
+                delta[BID].append((self.parse_numeric(price), self.parse_numeric(amount)))
 
         for action, price, amount in msg["params"]["data"]["asks"]:
             bidask = self.l2_book[pair][ASK]
             if action != "delete":
                 bidask[price] = amount
-                delta[ASK].append((Decimal(price), Decimal(amount)))
+                delta[ASK].append((self.parse_numeric(price), self.parse_numeric(amount)))
             else:
-                del bidask[price]
-                delta[ASK].append((Decimal(price), Decimal(amount)))
+                bidask.pop(price, None)
+                delta[ASK].append((self.parse_numeric(price), self.parse_numeric(amount)))
         await self.book_callback(self.l2_book[pair], L2_BOOK, pair, False, delta, timestamp_normalize(self.id, ts), timestamp)
 
     async def message_handler(self, msg: str, timestamp: float):
-        msg_dict = json.loads(msg, parse_float=Decimal)
+        msg_dict = self.decode(msg)
 
         # As a first update after subscription, Deribit sends a notification with no data
         if "testnet" in msg_dict.keys():
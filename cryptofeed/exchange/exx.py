@@ -5,7 +5,6 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import logging
-from decimal import Decimal
 
 from sortedcontainers import SortedDict as sd
 from yapic import json
@@ -93,11 +92,11 @@ class EXX(Feed):
             bids = msg[5]['bids'] if 'bids' in msg[5] else msg[4]['bids']
             self.l2_book[pair] = {
                 BID: sd({
-                    Decimal(price): Decimal(amount)
+                    self.parse_numeric(price): self.parse_numeric(amount)
                     for price, amount in bids
                 }),
                 ASK: sd({
-                    Decimal(price): Decimal(amount)
+                    self.parse_numeric(price): self.parse_numeric(amount)
                     for price, amount in asks
                 })
             }
@@ -106,8 +105,8 @@ class EXX(Feed):
             ts = msg[2]
             pair = pair_exchange_to_std(msg[3])
             side = ASK if msg[4] == 'ASK' else BID
-            price = Decimal(msg[5])
-            amount = Decimal(msg[6])
+            price = self.parse_numeric(msg[5])
+            amount = self.parse_numeric(msg[6])
 
             if amount == 0:
                 if price in self.l2_book[pair][side]:
@@ -128,8 +127,8 @@ class EXX(Feed):
         ts = float(msg[2])
         pair = pair_exchange_to_std(msg[3])
         side = BUY if msg[4] == 'bid' else SELL
-        price = Decimal(msg[5])
-        amount = Decimal(msg[6])
+        price = self.parse_numeric(msg[5])
+        amount = self.parse_numeric(msg[6])
         trade_id = msg[7]
 
         await self.callback(TRADES,
@@ -144,7 +143,7 @@ class EXX(Feed):
                             )
 
     async def message_handler(self, msg: str, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = self.decode(msg)
 
         if isinstance(msg[0], list):
             msg = msg[0]
@@ -7,20 +7,18 @@ associated with this software.
 
 import asyncio
 import logging
-from decimal import Decimal
 from time import time
 import zlib
 
 import aiohttp
-from sortedcontainers import SortedDict as sd
 from yapic import json
 
 from cryptofeed.defines import BID, ASK, BUY
 from cryptofeed.defines import FTX as FTX_id
 from cryptofeed.defines import FUNDING, L2_BOOK, LIQUIDATIONS, OPEN_INTEREST, SELL, TICKER, TRADES
-from cryptofeed.exceptions import BadChecksum
 from cryptofeed.feed import Feed
 from cryptofeed.standards import pair_exchange_to_std, timestamp_normalize
+from cryptofeed.util.checksum import BookChecksum
 
 
 LOG = logging.getLogger('feedhandler')
@@ -31,6 +29,7 @@ class FTX(Feed):
 
     def __init__(self, pairs=None, channels=None, callbacks=None, **kwargs):
         super().__init__('wss://ftexchange.com/ws/', pairs=pairs, channels=channels, callbacks=callbacks, **kwargs)
+        self.checksum = BookChecksum(self.id, self.__format_level, interval=self.checksum_interval, interval_ms=self.checksum_interval_ms)
 
     def __reset(self):
         self.l2_book = {}
@@ -56,12 +55,12 @@ class FTX(Feed):
                     }
                 ))
 
-    def __calc_checksum(self, pair):
-        bid_it = reversed(self.l2_book[pair][BID])
-        ask_it = iter(self.l2_book[pair][ASK])
+    @staticmethod
+    def __format_level(price, size):
+        return f"{price}:{size}"
 
-        bids = [f"{bid}:{self.l2_book[pair][BID][bid]}" for bid in bid_it]
-        asks = [f"{ask}:{self.l2_book[pair][ASK][ask]}" for ask in ask_it]
+    def __calc_checksum(self, pair):
+        bids, asks = self.checksum.levels(pair, self.l2_book[pair])
 
         if len(bids) == len(asks):
             combined = [val for pair in zip(bids, asks) for val in pair]
@@ -101,7 +100,7 @@ class FTX(Feed):
                     end_point = f"https://ftx.com/api/futures/{pair}/stats"
                     async with session.get(end_point) as response:
                         data = await response.text()
-                        data = json.loads(data, parse_float=Decimal)
+                        data = json.loads(data, parse_float=self.parse_numeric)
                         if 'result' in data:
                             oi = data['result']['openInterest']
                             if oi != self.open_interest.get(pair, None):
@@ -141,7 +140,7 @@ class FTX(Feed):
                         continue
                     async with session.get(f"https://ftx.com/api/funding_rates?future={pair}") as response:
                         data = await response.text()
-                        data = json.loads(data, parse_float=Decimal)
+                        data = json.loads(data, parse_float=self.parse_numeric)
 
                         last_update = self.funding.get(pair, None)
                         update = str(data['result'][0]['rate']) + str(data['result'][0]['time'])
@@ -168,8 +167,8 @@ class FTX(Feed):
             await self.callback(TRADES, feed=self.id,
                                 pair=pair_exchange_to_std(msg['market']),
                                 side=BUY if trade['side'] == 'buy' else SELL,
-                                amount=Decimal(trade['size']),
-                                price=Decimal(trade['price']),
+                                amount=self.parse_numeric(trade['size']),
+                                price=self.parse_numeric(trade['price']),
                                 order_id=None,
                                 timestamp=float(timestamp_normalize(self.id, trade['time'])),
                                 receipt_timestamp=timestamp)
@@ -178,8 +177,8 @@ class FTX(Feed):
                                     feed=self.id,
                                     pair=pair_exchange_to_std(msg['market']),
                                     side=BUY if trade['side'] == 'buy' else SELL,
-                                    leaves_qty=Decimal(trade['size']),
-                                    price=Decimal(trade['price']),
+                                    leaves_qty=self.parse_numeric(trade['size']),
+                                    price=self.parse_numeric(trade['price']),
                                     order_id=None,
                                     timestamp=float(timestamp_normalize(self.id, trade['time'])),
                                     receipt_timestamp=timestamp
@@ -194,8 +193,8 @@ class FTX(Feed):
         """
         await self.callback(TICKER, feed=self.id,
                             pair=pair_exchange_to_std(msg['market']),
-                            bid=Decimal(msg['data']['bid'] if msg['data']['bid'] else 0.0),
-                            ask=Decimal(msg['data']['ask'] if msg['data']['ask'] else 0.0),
+                            bid=self.parse_numeric(msg['data']['bid'] if msg['data']['bid'] else 0.0),
+                            ask=self.parse_numeric(msg['data']['ask'] if msg['data']['ask'] else 0.0),
                             timestamp=float(msg['data']['time']),
                             receipt_timestamp=timestamp)
 
@@ -215,16 +214,9 @@ class FTX(Feed):
         if msg['type'] == 'partial':
             # snapshot
             pair = pair_exchange_to_std(msg['market'])
-            self.l2_book[pair] = {
-                BID: sd({
-                    Decimal(price): Decimal(amount) for price, amount in msg['data']['bids']
-                }),
-                ASK: sd({
-                    Decimal(price): Decimal(amount) for price, amount in msg['data']['asks']
-                })
-            }
-            if self.checksum_validation and self.__calc_checksum(pair) != check:
-                raise BadChecksum
+            self.load_book(pair, msg['data']['bids'], msg['data']['asks'])
+            if self.checksum_validation and self.checksum.due(pair, force=True):
+                self.checksum.validate(pair, self.__calc_checksum(pair), check)
             await self.book_callback(self.l2_book[pair], L2_BOOK, pair, True, None, float(msg['data']['time']), timestamp)
         else:
             # update
@@ -233,20 +225,20 @@ class FTX(Feed):
             for side in ('bids', 'asks'):
                 s = BID if side == 'bids' else ASK
                 for price, amount in msg['data'][side]:
-                    price = Decimal(price)
-                    amount = Decimal(amount)
+                    price = self.parse_numeric(price)
+                    amount = self.parse_numeric(amount)
                     if amount == 0:
                         delta[s].append((price, 0))
-                        del self.l2_book[pair][s][price]
+                        self.l2_book[pair][s].pop(price, None)
                     else:
                         delta[s].append((price, amount))
                         self.l2_book[pair][s][price] = amount
-            if self.checksum_validation and self.__calc_checksum(pair) != check:
-                raise BadChecksum
+            if self.checksum_validation and self.checksum.due(pair):
+                self.checksum.validate(pair, self.__calc_checksum(pair), check)
             await self.book_callback(self.l2_book[pair], L2_BOOK, pair, False, delta, float(msg['data']['time']), timestamp)
 
     async def message_handler(self, msg: str, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = self.decode(msg)
         if 'type' in msg and msg['type'] == 'subscribed':
             return
         elif 'channel' in msg:
@@ -5,7 +5,6 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import logging
-from decimal import Decimal
 
 from sortedcontainers import SortedDict as sd
 from yapic import json
@@ -83,8 +82,8 @@ class Gateio(Feed):
         # list of trades appears to be in most recent to oldest, to reverse to deliver them in chronological order
         for trade in reversed(trades):
             side = BUY if trade['type'] == 'buy' else SELL
-            amount = Decimal(trade['amount'])
-            price = Decimal(trade['price'])
+            amount = self.parse_numeric(trade['amount'])
+            price = self.parse_numeric(trade['price'])
             ts = float(trade['time'])
             order_id = trade['id']
             await self.callback(TRADES, feed=self.id,
@@ -122,11 +121,11 @@ class Gateio(Feed):
         for side, exchange_key in [(BID, 'bids'), (ASK, 'asks')]:
             if exchange_key in data:
                 for entry in data[exchange_key]:
-                    price = Decimal(entry[0])
-                    amount = Decimal(entry[1])
+                    price = self.parse_numeric(entry[0])
+                    amount = self.parse_numeric(entry[1])
 
                     if amount == 0:
-                        del self.l2_book[symbol][side][price]
+                        self.l2_book[symbol][side].pop(price, None)
                     else:
                         self.l2_book[symbol][side][price] = amount
 
@@ -134,7 +133,7 @@ class Gateio(Feed):
         await self.book_callback(self.l2_book[symbol], L2_BOOK, symbol, forced, delta, timestamp, timestamp)
 
     async def message_handler(self, msg: str, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = self.decode(msg)
 
         if "error" in msg:
             if msg['error'] is None:
@@ -5,7 +5,6 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import logging
-from decimal import Decimal
 
 from sortedcontainers import SortedDict as sd
 from yapic import json
@@ -46,8 +45,8 @@ class Gemini(Feed):
         delta = {BID: [], ASK: []}
         for entry in data:
             side = ASK if entry[0] == 'sell' else BID
-            price = Decimal(entry[1])
-            amount = Decimal(entry[2])
+            price = self.parse_numeric(entry[1])
+            amount = self.parse_numeric(entry[2])
             if amount == 0:
                 if price in self.l2_book[pair][side]:
                     del self.l2_book[pair][side][price]
@@ -60,9 +59,9 @@ class Gemini(Feed):
 
     async def _trade(self, msg: dict, timestamp: float):
         pair = pair_exchange_to_std(msg['symbol'])
-        price = Decimal(msg['price'])
+        price = self.parse_numeric(msg['price'])
         side = SELL if msg['side'] == 'sell' else BUY
-        amount = Decimal(msg['quantity'])
+        amount = self.parse_numeric(msg['quantity'])
         await self.callback(TRADES, feed=self.id,
                             order_id=msg['event_id'],
                             pair=pair,
@@ -73,7 +72,7 @@ class Gemini(Feed):
                             receipt_timestamp=timestamp)
 
     async def message_handler(self, msg: str, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = self.decode(msg)
 
         if msg['type'] == 'l2_updates':
             await self._book(msg, timestamp)
@@ -5,7 +5,6 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import logging
-from decimal import Decimal
 
 from sortedcontainers import SortedDict as sd
 from yapic import json
@@ -33,8 +32,8 @@ class HitBTC(Feed):
     async def _ticker(self, msg: dict, timestamp: float):
         await self.callback(TICKER, feed=self.id,
                             pair=pair_exchange_to_std(msg['symbol']),
-                            bid=Decimal(msg['bid']),
-                            ask=Decimal(msg['ask']),
+                            bid=self.parse_numeric(msg['bid']),
+                            ask=self.parse_numeric(msg['ask']),
                             timestamp=timestamp_normalize(self.id, msg['timestamp']),
                             receipt_timestamp=timestamp)
 
@@ -43,8 +42,8 @@ class HitBTC(Feed):
         pair = pair_exchange_to_std(msg['symbol'])
         for side in (BID, ASK):
             for entry in msg[side]:
-                price = Decimal(entry['price'])
-                size = Decimal(entry['size'])
+                price = self.parse_numeric(entry['price'])
+                size = self.parse_numeric(entry['size'])
                 if size == 0:
                     if price in self.l2_book[pair][side]:
                         del self.l2_book[pair][side][price]
@@ -59,16 +58,16 @@ class HitBTC(Feed):
         self.l2_book[pair] = {ASK: sd(), BID: sd()}
         for side in (BID, ASK):
             for entry in msg[side]:
-                price = Decimal(entry['price'])
-                size = Decimal(entry['size'])
+                price = self.parse_numeric(entry['price'])
+                size = self.parse_numeric(entry['size'])
                 self.l2_book[pair][side][price] = size
         await self.book_callback(self.l2_book[pair], L2_BOOK, pair, True, None, timestamp, timestamp)
 
     async def _trades(self, msg: dict, timestamp: float):
         pair = pair_exchange_to_std(msg['symbol'])
         for update in msg['data']:
-            price = Decimal(update['price'])
-            quantity = Decimal(update['quantity'])
+            price = self.parse_numeric(update['price'])
+            quantity = self.parse_numeric(update['quantity'])
             side = BUY if update['side'] == 'buy' else SELL
             order_id = update['id']
             timestamp = timestamp_normalize(self.id, update['timestamp'])
@@ -82,7 +81,7 @@ class HitBTC(Feed):
                                 receipt_timestamp=timestamp)
 
     async def message_handler(self, msg: str, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = self.decode(msg)
         if 'params' in msg and 'sequence' in msg['params']:
             pair = msg['params']['symbol']
             if pair in self.seq_no:
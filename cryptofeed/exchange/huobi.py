@@ -5,15 +5,13 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import logging
-import zlib
-from decimal import Decimal
 
-from sortedcontainers import SortedDict as sd
 from yapic import json
 
 from cryptofeed.defines import BID, ASK, BUY, HUOBI, L2_BOOK, SELL, TRADES
 from cryptofeed.feed import Feed
 from cryptofeed.standards import pair_exchange_to_std, timestamp_normalize
+from cryptofeed.util.compression import GZIP
 
 
 LOG = logging.getLogger('feedhandler')
@@ -21,6 +19,8 @@ LOG = logging.getLogger('feedhandler')
 
 class Huobi(Feed):
     id = HUOBI
+    splittable = True
+    compression = GZIP
 
     def __init__(self, pairs=None, channels=None, callbacks=None, config=None, **kwargs):
         super().__init__('wss://api.huobi.pro/ws', pairs=pairs, channels=channels, config=config, callbacks=callbacks, **kwargs)
@@ -34,20 +34,11 @@ class Huobi(Feed):
         data = msg['tick']
         forced = pair not in self.l2_book
 
-        update = {
-            BID: sd({
-                Decimal(price): Decimal(amount)
-                for price, amount in data['bids']
-            }),
-            ASK: sd({
-                Decimal(price): Decimal(amount)
-                for price, amount in data['asks']
-            })
-        }
-
-        if not forced:
-            self.previous_book[pair] = self.l2_book[pair]
-        self.l2_book[pair] = update
+        if forced:
+            self.l2_book[pair] = self.new_book(pair)
+        tracker = self.book_tracker(pair)
+        tracker.replace(BID, {self.parse_numeric(price): self.parse_numeric(amount) for price, amount in data['bids']})
+        tracker.replace(ASK, {self.parse_numeric(price): self.parse_numeric(amount) for price, amount in data['asks']})
 
         await self.book_callback(self.l2_book[pair], L2_BOOK, pair, forced, False, timestamp_normalize(self.id, msg['ts']), timestamp)
 
@@ -78,15 +69,13 @@ class Huobi(Feed):
                                 pair=pair_exchange_to_std(msg['ch'].split('.')[1]),
                                 order_id=trade['tradeId'],
                                 side=BUY if trade['direction'] == 'buy' else SELL,
-                                amount=Decimal(trade['amount']),
-                                price=Decimal(trade['price']),
+                                amount=self.parse_numeric(trade['amount']),
+                                price=self.parse_numeric(trade['price']),
                                 timestamp=timestamp_normalize(self.id, trade['ts']),
                                 receipt_timestamp=timestamp)
 
     async def message_handler(self, msg: str, timestamp: float):
-        # unzip message
-        msg = zlib.decompress(msg, 16 + zlib.MAX_WBITS)
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = await self.inflate_decode(msg)
 
         # Huobi sends a ping evert 5 seconds and will disconnect us if we do not respond to it
         if 'ping' in msg:
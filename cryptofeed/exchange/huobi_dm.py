@@ -26,15 +26,13 @@ So we return BTC190927 as the pair name for the BTC quarterly future.
 
 '''
 import logging
-import zlib
-from decimal import Decimal
 
-from sortedcontainers import SortedDict as sd
 from yapic import json
 
 from cryptofeed.defines import BID, ASK, BUY, HUOBI_DM, L2_BOOK, SELL, TRADES
 from cryptofeed.feed import Feed
 from cryptofeed.standards import pair_exchange_to_std, pair_std_to_exchange, timestamp_normalize
+from cryptofeed.util.compression import GZIP
 
 
 LOG = logging.getLogger('feedhandler')
@@ -42,6 +40,8 @@ LOG = logging.getLogger('feedhandler')
 
 class HuobiDM(Feed):
     id = HUOBI_DM
+    splittable = True
+    compression = GZIP
 
     def __init__(self, pairs=None, channels=None, callbacks=None, config=None, **kwargs):
         super().__init__('wss://www.hbdm.com/ws', pairs=pairs, channels=channels, callbacks=callbacks, config=config, **kwargs)
@@ -77,20 +77,11 @@ class HuobiDM(Feed):
         # {'ch': 'market.AKRO-USD.depth.step0', 'ts': 1606951241196, 'tick': {'mrid': 50651100044, 'id': 1606951241, 'ts': 1606951241195, 'version': 1606951241, 'ch': 'market.AKRO-USD.depth.step0'}}
         # {'ch': 'market.AKRO-USD.depth.step0', 'ts': 1606951242297, 'tick': {'mrid': 50651100044, 'id': 1606951242, 'ts': 1606951242295, 'version': 1606951242, 'ch': 'market.AKRO-USD.depth.step0'}}
         if 'bids' in data and 'asks' in data:
-            update = {
-                BID: sd({
-                    Decimal(price): Decimal(amount)
-                    for price, amount in data['bids']
-                }),
-                ASK: sd({
-                    Decimal(price): Decimal(amount)
-                    for price, amount in data['asks']
-                })
-            }
-
-            if not forced:
-                self.previous_book[pair] = self.l2_book[pair]
-            self.l2_book[pair] = update
+            if forced:
+                self.l2_book[pair] = self.new_book(pair)
+            tracker = self.book_tracker(pair)
+            tracker.replace(BID, {self.parse_numeric(price): self.parse_numeric(amount) for price, amount in data['bids']})
+            tracker.replace(ASK, {self.parse_numeric(price): self.parse_numeric(amount) for price, amount in data['asks']})
 
             await self.book_callback(self.l2_book[pair], L2_BOOK, pair, forced, False, timestamp_normalize(self.id, msg['ts']), timestamp)
 
@@ -111,16 +102,14 @@ class HuobiDM(Feed):
                                 pair=pair_std_to_exchange(msg['ch'].split('.')[1], self.id),
                                 order_id=trade['id'],
                                 side=BUY if trade['direction'] == 'buy' else SELL,
-                                amount=Decimal(trade['amount']),
-                                price=Decimal(trade['price']),
+                                amount=self.parse_numeric(trade['amount']),
+                                price=self.parse_numeric(trade['price']),
                                 timestamp=timestamp_normalize(self.id, trade['ts']),
                                 receipt_timestamp=timestamp
                                 )
 
     async def message_handler(self, msg: str, timestamp: float):
-        # unzip message
-        msg = zlib.decompress(msg, 16 + zlib.MAX_WBITS)
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = await self.inflate_decode(msg)
 
         # Huobi sends a ping evert 5 seconds and will disconnect us if we do not respond to it
         if 'ping' in msg:
@@ -1,7 +1,6 @@
 import logging
 import asyncio
 import time
-from decimal import Decimal
 
 import aiohttp
 from yapic import json
@@ -28,7 +27,7 @@ class HuobiSwap(HuobiDM):
                 for pair in pairs:
                     async with session.get(f'https://api.hbdm.com/swap-api/v1/swap_funding_rate?contract_code={pair}') as response:
                         data = await response.text()
-                        data = json.loads(data, parse_float=Decimal)
+                        data = json.loads(data, parse_float=self.parse_numeric)
 
                         received = time.time()
                         update = (data['data']['funding_rate'], timestamp_normalize(self.id, int(data['data']['next_funding_time'])))
@@ -41,7 +40,7 @@ class HuobiSwap(HuobiDM):
                                             pair=pair,
                                             timestamp=timestamp_normalize(self.id, data['ts']),
                                             receipt_timestamp=received,
-                                            rate=Decimal(update[0]),
+                                            rate=self.parse_numeric(update[0]),
                                             next_funding_time=update[1]
                                             )
 
@@ -5,16 +5,15 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import logging
-from decimal import Decimal
 import zlib
 
 from sortedcontainers import SortedDict as sd
 from yapic import json
 
 from cryptofeed.defines import BID, ASK, BUY, KRAKEN, L2_BOOK, SELL, TICKER, TRADES
-from cryptofeed.exceptions import BadChecksum
 from cryptofeed.feed import Feed
 from cryptofeed.standards import pair_exchange_to_std
+from cryptofeed.util.checksum import BookChecksum
 
 
 LOG = logging.getLogger('feedhandler')
@@ -26,22 +25,19 @@ class Kraken(Feed):
     def __init__(self, pairs=None, channels=None, callbacks=None, depth=1000, **kwargs):
         super().__init__('wss://ws.kraken.com', pairs=pairs, channels=channels, callbacks=callbacks, **kwargs)
         self.book_depth = depth
+        self.checksum = BookChecksum(self.id, self.__format_level, depth=10, interval=self.checksum_interval, interval_ms=self.checksum_interval_ms)
 
     def __reset(self):
         self.l2_book = {}
         self.channel_map = {}
 
-    def __calc_checksum(self, pair):
-        bid_prices = list(reversed(self.l2_book[pair][BID].keys()))[:10]
-        ask_prices = list(self.l2_book[pair][ASK].keys())[:10]
-
-        combined = ""
-        for data, side in ((ask_prices, ASK), (bid_prices, BID)):
-            sizes = [str(self.l2_book[pair][side][price]).replace('.', '').lstrip('0') for price in data]
-            prices = [str(price).replace('.', '').lstrip('0') for price in data]
-            combined += ''.join([b for a in zip(prices, sizes) for b in a])
+    @staticmethod
+    def __format_level(price, size):
+        return str(price).replace('.', '').lstrip('0') + str(size).replace('.', '').lstrip('0')
 
-        return str(zlib.crc32(combined.encode()))
+    def __calc_checksum(self, pair):
+        bids, asks = self.checksum.levels(pair, self.l2_book[pair])
+        return str(zlib.crc32((''.join(asks) + ''.join(bids)).encode()))
 
     async def subscribe(self, websocket):
         self.__reset()
@@ -79,8 +75,8 @@ class Kraken(Feed):
             await self.callback(TRADES, feed=self.id,
                                 pair=pair,
                                 side=BUY if side == 'b' else SELL,
-                                amount=Decimal(amount),
-                                price=Decimal(price),
+                                amount=self.parse_numeric(amount),
+                                price=self.parse_numeric(price),
                                 order_id=None,
                                 timestamp=float(server_timestamp),
                                 receipt_timestamp=timestamp,
@@ -93,8 +89,8 @@ class Kraken(Feed):
         """
         await self.callback(TICKER, feed=self.id,
                             pair=pair,
-                            bid=Decimal(msg[1]['b'][0]),
-                            ask=Decimal(msg[1]['a'][0]),
+                            bid=self.parse_numeric(msg[1]['b'][0]),
+                            ask=self.parse_numeric(msg[1]['a'][0]),
                             timestamp=timestamp,
                             receipt_timestamp=timestamp)
 
@@ -105,9 +101,9 @@ class Kraken(Feed):
         if 'as' in msg[0]:
             # Snapshot
             self.l2_book[pair] = {BID: sd({
-                Decimal(update[0]): Decimal(update[1]) for update in msg[0]['bs']
+                self.parse_numeric(update[0]): self.parse_numeric(update[1]) for update in msg[0]['bs']
             }), ASK: sd({
-                Decimal(update[0]): Decimal(update[1]) for update in msg[0]['as']
+                self.parse_numeric(update[0]): self.parse_numeric(update[1]) for update in msg[0]['as']
             })}
             await self.book_callback(self.l2_book[pair], L2_BOOK, pair, True, delta, timestamp, timestamp)
         else:
@@ -121,8 +117,8 @@ class Kraken(Feed):
                     if side:
                         for update in updates:
                             price, size, *_ = update
-                            price = Decimal(price)
-                            size = Decimal(size)
+                            price = self.parse_numeric(price)
+                            size = self.parse_numeric(size)
                             if size == 0:
                                 # Per Kraken's technical support
                                 # they deliver erroneous deletion messages
@@ -139,12 +135,12 @@ class Kraken(Feed):
                     del self.l2_book[pair][side][del_price]
                     delta[side].append((del_price, 0))
 
-            if self.checksum_validation and 'c' in msg[0] and self.__calc_checksum(pair) != msg[0]['c']:
-                raise BadChecksum("Checksum validation on orderbook failed")
+            if self.checksum_validation and 'c' in msg[0] and self.checksum.due(pair):
+                self.checksum.validate(pair, self.__calc_checksum(pair), msg[0]['c'])
             await self.book_callback(self.l2_book[pair], L2_BOOK, pair, False, delta, timestamp, timestamp)
 
     async def message_handler(self, msg: str, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = self.decode(msg)
 
         if isinstance(msg, list):
             channel_id = msg[0]
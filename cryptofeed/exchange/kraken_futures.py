@@ -5,7 +5,6 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import logging
-from decimal import Decimal
 
 import requests
 from sortedcontainers import SortedDict as sd
@@ -76,8 +75,8 @@ class KrakenFutures(Feed):
         await self.callback(TRADES, feed=self.id,
                             pair=pair,
                             side=BUY if msg['side'] == 'buy' else SELL,
-                            amount=Decimal(msg['qty']),
-                            price=Decimal(msg['price']),
+                            amount=self.parse_numeric(msg['qty']),
+                            price=self.parse_numeric(msg['price']),
                             order_id=msg['uid'],
                             timestamp=timestamp_normalize(self.id, msg['time']),
                             receipt_timestamp=timestamp)
@@ -125,8 +124,8 @@ class KrakenFutures(Feed):
         }
         """
         self.l2_book[pair] = {
-            BID: sd({Decimal(update['price']): Decimal(update['qty']) for update in msg['bids']}),
-            ASK: sd({Decimal(update['price']): Decimal(update['qty']) for update in msg['asks']})
+            BID: sd({self.parse_numeric(update['price']): self.parse_numeric(update['qty']) for update in msg['bids']}),
+            ASK: sd({self.parse_numeric(update['price']): self.parse_numeric(update['qty']) for update in msg['asks']})
         }
         await self.book_callback(self.l2_book[pair], L2_BOOK, pair, True, None, timestamp, timestamp)
 
@@ -149,12 +148,12 @@ class KrakenFutures(Feed):
 
         delta = {BID: [], ASK: []}
         s = BID if msg['side'] == 'buy' else ASK
-        price = Decimal(msg['price'])
-        amount = Decimal(msg['qty'])
+        price = self.parse_numeric(msg['price'])
+        amount = self.parse_numeric(msg['qty'])
 
         if amount == 0:
             delta[s].append((price, 0))
-            del self.l2_book[pair][s][price]
+            self.l2_book[pair][s].pop(price, None)
         else:
             delta[s].append((price, amount))
             self.l2_book[pair][s][price] = amount
@@ -197,7 +196,7 @@ class KrakenFutures(Feed):
                             )
 
     async def message_handler(self, msg: str, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = self.decode(msg)
 
         if 'event' in msg:
             if msg['event'] == 'info':
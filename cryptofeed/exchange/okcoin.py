@@ -4,8 +4,6 @@ Copyright (C) 2017-2020  Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
-from decimal import Decimal
-from itertools import islice
 import logging
 import zlib
 
@@ -14,9 +12,10 @@ from yapic import json
 
 from cryptofeed.defines import ASK, BID, BUY, FUNDING, L2_BOOK, OKCOIN, OPEN_INTEREST, SELL, TICKER, TRADES, \
     LIQUIDATIONS, BOOK_TICKER
-from cryptofeed.exceptions import BadChecksum
 from cryptofeed.feed import Feed
 from cryptofeed.standards import pair_exchange_to_std, timestamp_normalize
+from cryptofeed.util.checksum import BookChecksum
+from cryptofeed.util.compression import DEFLATE
 
 
 LOG = logging.getLogger('feedhandler')
@@ -24,24 +23,25 @@ LOG = logging.getLogger('feedhandler')
 
 class OKCoin(Feed):
     id = OKCOIN
+    splittable = True
+    compression = DEFLATE
 
     def __init__(self, pairs=None, channels=None, callbacks=None, **kwargs):
         super().__init__('wss://real.okcoin.com:8443/ws/v3', pairs=pairs, channels=channels, callbacks=callbacks, **kwargs)
         self.book_depth = 100
         self.open_interest = {}
+        self.checksum = BookChecksum(self.id, self.__format_level, depth=25, interval=self.checksum_interval, interval_ms=self.checksum_interval_ms)
 
     def __reset(self):
         self.l2_book = {}
         self.open_interest = {}
 
-    def __calc_checksum(self, pair):
-        bid_it = reversed(self.l2_book[pair][BID])
-        ask_it = iter(self.l2_book[pair][ASK])
+    @staticmethod
+    def __format_level(price, size):
+        return f"{price}:{size}"
 
-        bids = (f"{bid}:{self.l2_book[pair][BID][bid]}" for bid in bid_it)
-        bids = list(islice(bids, 25))
-        asks = (f"{ask}:{self.l2_book[pair][ASK][ask]}" for ask in ask_it)
-        asks = list(islice(asks, 25))
+    def __calc_checksum(self, pair):
+        bids, asks = self.checksum.levels(pair, self.l2_book[pair])
 
         if len(bids) == len(asks):
             combined = [val for pair in zip(bids, asks) for val in pair]
@@ -107,9 +107,9 @@ class OKCoin(Feed):
             update_timestamp = timestamp_normalize(self.id, update['timestamp'])
             await self.callback(BOOK_TICKER, feed=self.id,
                                 pair=pair,
-                                last_price=Decimal(update['last']),
-                                first_bid=Decimal(update['best_bid']),
-                                first_ask=Decimal(update['best_ask']),
+                                last_price=self.parse_numeric(update['last']),
+                                first_bid=self.parse_numeric(update['best_bid']),
+                                first_ask=self.parse_numeric(update['best_ask']),
                                 timestamp=update_timestamp,
                                 receipt_timestamp=timestamp)
             if 'open_interest' in update:
@@ -133,8 +133,8 @@ class OKCoin(Feed):
                                 pair=pair_exchange_to_std(trade['instrument_id']),
                                 order_id=trade['trade_id'],
                                 side=BUY if trade['side'] == 'buy' else SELL,
-                                amount=Decimal(trade[amount_sym]),
-                                price=Decimal(trade['price']),
+                                amount=self.parse_numeric(trade[amount_sym]),
+                                price=self.parse_numeric(trade['price']),
                                 timestamp=timestamp_normalize(self.id, trade['timestamp']),
                                 receipt_timestamp=timestamp
                                 )
@@ -157,15 +157,15 @@ class OKCoin(Feed):
                 pair = pair_exchange_to_std(update['instrument_id'])
                 self.l2_book[pair] = {
                     BID: sd({
-                        Decimal(price): Decimal(amount) for price, amount, *_ in update['bids']
+                        self.parse_numeric(price): self.parse_numeric(amount) for price, amount, *_ in update['bids']
                     }),
                     ASK: sd({
-                        Decimal(price): Decimal(amount) for price, amount, *_ in update['asks']
+                        self.parse_numeric(price): self.parse_numeric(amount) for price, amount, *_ in update['asks']
                     })
                 }
 
-                if self.checksum_validation and self.__calc_checksum(pair) != (update['checksum'] & 0xFFFFFFFF):
-                    raise BadChecksum
+                if self.checksum_validation and self.checksum.due(pair, force=True):
+                    self.checksum.validate(pair, self.__calc_checksum(pair), update['checksum'] & 0xFFFFFFFF)
                 await self.book_callback(self.l2_book[pair], L2_BOOK, pair, True, None, timestamp_normalize(self.id, update['timestamp']), timestamp)
         else:
             # update
@@ -175,8 +175,8 @@ class OKCoin(Feed):
                 for side in ('bids', 'asks'):
                     s = BID if side == 'bids' else ASK
                     for price, amount, *_ in update[side]:
-                        price = Decimal(price)
-                        amount = Decimal(amount)
+                        price = self.parse_numeric(price)
+                        amount = self.parse_numeric(amount)
                         if amount == 0:
                             if price in self.l2_book[pair][s]:
                                 delta[s].append((price, 0))
@@ -184,14 +184,12 @@ class OKCoin(Feed):
                         else:
                             delta[s].append((price, amount))
                             self.l2_book[pair][s][price] = amount
-                if self.checksum_validation and self.__calc_checksum(pair) != (update['checksum'] & 0xFFFFFFFF):
-                    raise BadChecksum
+                if self.checksum_validation and self.checksum.due(pair):
+                    self.checksum.validate(pair, self.__calc_checksum(pair), update['checksum'] & 0xFFFFFFFF)
                 await self.book_callback(self.l2_book[pair], L2_BOOK, pair, False, delta, timestamp_normalize(self.id, update['timestamp']), timestamp)
 
     async def message_handler(self, msg: str, timestamp: float):
-        # DEFLATE compression, no header
-        msg = zlib.decompress(msg, -15)
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = await self.inflate_decode(msg)
 
         if 'event' in msg:
             if msg['event'] == 'error':
@@ -5,7 +5,6 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import asyncio
-from decimal import Decimal
 import time
 
 import aiohttp
@@ -64,7 +63,7 @@ class OKEx(OKCoin):
                         end_point = f"{self.api}{instrument_type}/v3/instruments/{pair}/liquidation?status={status}&limit=100"
                         async with session.get(end_point) as response:
                             data = await response.text()
-                            data = json.loads(data, parse_float=Decimal)
+                            data = json.loads(data, parse_float=self.parse_numeric)
                             timestamp = time.time()
 
                             if len(data) == 0 or (len(data) > 0 and last_update.get(pair) == data[0]):
@@ -77,8 +76,8 @@ class OKEx(OKCoin):
                                                     feed=self.id,
                                                     pair=entry['instrument_id'],
                                                     side=BUY if entry['type'] == '3' else SELL,
-                                                    leaves_qty=Decimal(entry['size']),
-                                                    price=Decimal(entry['price']),
+                                                    leaves_qty=self.parse_numeric(entry['size']),
+                                                    price=self.parse_numeric(entry['price']),
                                                     order_id=None,
                                                     status='filled' if status == 1 else 'unfilled',
                                                     timestamp=timestamp,
@@ -7,7 +7,6 @@ associated with this software.
 import calendar
 import logging
 import time
-from decimal import Decimal
 
 from sortedcontainers import SortedDict as sd
 from yapic import json
@@ -82,8 +81,8 @@ class Poloniex(Feed):
         if self.__do_callback(TICKER, pair):
             await self.callback(TICKER, feed=self.id,
                                 pair=pair,
-                                bid=Decimal(bid),
-                                ask=Decimal(ask),
+                                bid=self.parse_numeric(bid),
+                                ask=self.parse_numeric(ask),
                                 timestamp=timestamp,
                                 receipt_timestamp=timestamp)
 
@@ -93,7 +92,7 @@ class Poloniex(Feed):
         server_timestamp, exchange_vol, top_vols = msg
         server_timestamp = calendar.timegm(time.strptime(server_timestamp, '%Y-%m-%d %H:%M'))
         for pair in top_vols:
-            top_vols[pair] = Decimal(top_vols[pair])
+            top_vols[pair] = self.parse_numeric(top_vols[pair])
 
         await self.callback(VOLUME, feed=self.id, exchange_volume=exchange_vol, timestamp=server_timestamp, receipt_timestamp=timestamp, **top_vols)
 
@@ -111,13 +110,13 @@ class Poloniex(Feed):
             # 0 is asks, 1 is bids
             order_book = msg[0][1]['orderBook']
             for key in order_book[0]:
-                amount = Decimal(order_book[0][key])
-                price = Decimal(key)
+                amount = self.parse_numeric(order_book[0][key])
+                price = self.parse_numeric(key)
                 self.l2_book[pair][ASK][price] = amount
 
             for key in order_book[1]:
-                amount = Decimal(order_book[1][key])
-                price = Decimal(key)
+                amount = self.parse_numeric(order_book[1][key])
+                price = self.parse_numeric(key)
                 self.l2_book[pair][BID][price] = amount
         else:
             pair = self.pair_mapping[chan_id]
@@ -127,19 +126,19 @@ class Poloniex(Feed):
                 # order book update
                 if msg_type == 'o':
                     side = ASK if update[1] == 0 else BID
-                    price = Decimal(update[2])
-                    amount = Decimal(update[3])
+                    price = self.parse_numeric(update[2])
+                    amount = self.parse_numeric(update[3])
                     if amount == 0:
                         delta[side].append((price, 0))
-                        del self.l2_book[pair][side][price]
+                        self.l2_book[pair][side].pop(price, None)
                     else:
                         delta[side].append((price, amount))
                         self.l2_book[pair][side][price] = amount
                 elif msg_type == 't':
                     # index 1 is trade id, 2 is side, 3 is price, 4 is amount, 5 is timestamp
                     _, order_id, _, price, amount, server_ts = update
-                    price = Decimal(price)
-                    amount = Decimal(amount)
+                    price = self.parse_numeric(price)
+                    amount = self.parse_numeric(amount)
                     side = BUY if update[2] == 1 else SELL
                     if self.__do_callback(TRADES, pair):
                         await self.callback(TRADES, feed=self.id,
@@ -157,7 +156,7 @@ class Poloniex(Feed):
             await self.book_callback(self.l2_book[pair], L2_BOOK, pair, forced, delta, timestamp, timestamp)
 
     async def message_handler(self, msg: str, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = self.decode(msg)
         if 'error' in msg:
             LOG.error("%s: Error from exchange: %s", self.id, msg)
             return
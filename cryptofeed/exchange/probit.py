@@ -5,7 +5,6 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import logging
-from decimal import Decimal
 
 from sortedcontainers import SortedDict as sd
 from yapic import json
@@ -70,8 +69,8 @@ class Probit(Feed):
         '''
         pair = pair_exchange_to_std(msg['market_id'])
         for update in msg['recent_trades']:
-            price = Decimal(update['price'])
-            quantity = Decimal(update['quantity'])
+            price = self.parse_numeric(update['price'])
+            quantity = self.parse_numeric(update['quantity'])
             side = BUY if update['side'] == 'buy' else SELL
             order_id = update['id']
             timestamp = timestamp_normalize(self.id, update['time'])
@@ -132,8 +131,8 @@ class Probit(Feed):
             self.l2_book[pair] = {ASK: sd(), BID: sd()}
 
             for entry in msg["order_books"]:
-                price = Decimal(entry['price'])
-                quantity = Decimal(entry['quantity'])
+                price = self.parse_numeric(entry['price'])
+                quantity = self.parse_numeric(entry['quantity'])
                 side = BID if entry['side'] == "buy" else ASK
                 self.l2_book[pair][side][price] = quantity
 
@@ -142,8 +141,8 @@ class Probit(Feed):
             delta = {BID: [], ASK: []}
 
             for entry in msg["order_books"]:
-                price = Decimal(entry['price'])
-                quantity = Decimal(entry['quantity'])
+                price = self.parse_numeric(entry['price'])
+                quantity = self.parse_numeric(entry['quantity'])
                 side = BID if entry['side'] == "buy" else ASK
                 if quantity == 0:
                     if price in self.l2_book[pair][side]:
@@ -156,7 +155,7 @@ class Probit(Feed):
             await self.book_callback(self.l2_book[pair], L2_BOOK, pair, False, delta, timestamp, timestamp)
 
     async def message_handler(self, msg: str, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = self.decode(msg)
 
         # Probit can send multiple type updates in one message so we avoid the use of elif
         if 'recent_trades' in msg:
@@ -1,9 +1,7 @@
 import logging
-from decimal import Decimal
 import uuid
 
 import requests
-from sortedcontainers import SortedDict as sd
 from yapic import json
 
 from cryptofeed.defines import BID, ASK, BUY, L2_BOOK, SELL, TICKER, TRADES, UPBIT
@@ -59,8 +57,8 @@ class Upbit(Feed):
         }
         """
 
-        price = Decimal(msg['tp'])
-        amount = Decimal(msg['tv'])
+        price = self.parse_numeric(msg['tp'])
+        amount = self.parse_numeric(msg['tv'])
         await self.callback(TRADES, feed=self.id,
                             order_id=msg['sid'],
                             pair=pair_exchange_to_std(msg['cd']),
@@ -104,20 +102,11 @@ class Upbit(Feed):
         orderbook_timestamp = timestamp_normalize(self.id, msg['tms'])
         forced = pair not in self.l2_book
 
-        update = {
-            BID: sd({
-                Decimal(unit['bp']): Decimal(unit['bs'])
-                for unit in msg['obu'] if unit['bp'] > 0
-            }),
-            ASK: sd({
-                Decimal(unit['ap']): Decimal(unit['as'])
-                for unit in msg['obu'] if unit['ap'] > 0
-            })
-        }
-
-        if not forced:
-            self.previous_book[pair] = self.l2_book[pair]
-        self.l2_book[pair] = update
+        if forced:
+            self.l2_book[pair] = self.new_book(pair)
+        tracker = self.book_tracker(pair)
+        tracker.replace(BID, {self.parse_numeric(unit['bp']): self.parse_numeric(unit['bs']) for unit in msg['obu'] if unit['bp'] > 0})
+        tracker.replace(ASK, {self.parse_numeric(unit['ap']): self.parse_numeric(unit['as']) for unit in msg['obu'] if unit['ap'] > 0})
 
         await self.book_callback(self.l2_book[pair], L2_BOOK, pair, forced, False, orderbook_timestamp, timestamp)
 
@@ -170,7 +159,7 @@ class Upbit(Feed):
         raise NotImplementedError
 
     async def message_handler(self, msg: str, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = self.decode(msg)
 
         if msg['ty'] == "trade":
             await self._trade(msg, timestamp)
@@ -4,24 +4,114 @@ Copyright (C) 2017-2020  Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
+import asyncio
+import copy
+import functools
+import json
 import logging
+import math
+import re
 import uuid
-from collections import defaultdict
+from collections import defaultdict, deque
+from decimal import Decimal
 
-from cryptofeed.callback import Callback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    from yapic import json as yapic_json
+except ImportError:
+    yapic_json = None
+
+from cryptofeed.callback import BatchCallback, Callback
 from cryptofeed.defines import (ASK, BID, BOOK_DELTA, FUNDING, FUTURES_INDEX, L2_BOOK, L3_BOOK, LIQUIDATIONS,
-                                OPEN_INTEREST, MARKET_INFO, TICKER, TRADES, TRANSACTIONS, VOLUME, BOOK_TICKER, KLINE)
-from cryptofeed.exceptions import BidAskOverlapping, UnsupportedDataFeed
+                                OPEN_INTEREST, MARKET_INFO, TICKER, TRADES, TRANSACTIONS, VOLUME, BOOK_TICKER, KLINE,
+                                TOP_OF_BOOK)
+from cryptofeed.exceptions import BidAskOverlapping, IncompleteBook, UnsupportedDataFeed
+from cryptofeed.pairs import _exchange_info
+from cryptofeed.shard import stream_rate
 from cryptofeed.standards import feed_to_exchange, get_exchange_info, load_exchange_pair_mapping, pair_std_to_exchange
-from cryptofeed.util.book import book_delta, depth
+from cryptofeed.util.book import (DeltaTracker, DepthView, TopOfBook, book_delta, book_snapshot, load_levels, new_book,
+                                  prune_levels)
+from cryptofeed.util.compression import Inflater
 
 LOG = logging.getLogger(__name__)
 
+
+class Decoder:
+    """
+    Decodes JSON messages with the fastest parser installed: orjson, then yapic, then the
+    standard library. orjson has no parse_float hook, so with parse_numeric=Decimal it is only
+    used for exchanges that send prices and sizes as strings (numbers are then never floats).
+
+    field() reads a single string field from the raw message without decoding it, so handlers
+    can drop messages they have no use for before paying for a full decode. It costs about as
+    much as an orjson decode, so it only pays off with the stdlib parser.
+    """
+    PARSERS = ('orjson', 'yapic', 'json')
+
+    def __init__(self, parse_numeric=Decimal, string_numbers: bool = False, parser: str = None):
+        if parser is not None and parser not in self.PARSERS:
+            raise ValueError(f"Invalid JSON parser {parser}, must be one of {', '.join(self.PARSERS)}")
+        exact = parse_numeric is float or string_numbers
+        if parser is None:
+            if orjson is not None and exact:
+                parser = 'orjson'
+            elif yapic_json is not None:
+                parser = 'yapic'
+            else:
+                parser = 'json'
+        elif parser == 'orjson' and not exact:
+            raise ValueError("orjson cannot parse floats as Decimal, use parse_numeric=float or another parser")
+        if parser == 'orjson' and orjson is None or parser == 'yapic' and yapic_json is None:
+            raise ValueError(f"JSON parser {parser} is not installed")
+
+        self.parser = parser
+        self.parse_numeric = parse_numeric
+        self.fields = {}
+        if parser == 'orjson':
+            self.loads = orjson.loads
+        else:
+            module = yapic_json if parser == 'yapic' else json
+            if parse_numeric is float:
+                self.loads = module.loads
+            else:
+                self.loads = functools.partial(module.loads, parse_float=parse_numeric)
+
+    def field(self, msg, key: str):
+        """
+        The first string value of `key` in the raw message (str or bytes-like), or None. Only meant
+        for keys that appear once, or first at the top level (eg a message type)
+        """
+        text = isinstance(msg, str)
+        pattern = self.fields.get((key, text))
+        if pattern is None:
+            pattern = r'"%s"\s*:\s*"([^"]*)"' % re.escape(key)
+            pattern = self.fields[(key, text)] = re.compile(pattern if text else pattern.encode())
+        match = pattern.search(msg)
+        if match is None:
+            return None
+        return match.group(1) if text else match.group(1).decode()
+
+
 class Feed:
     id = 'NotImplemented'
+    # True if the exchange's subscriptions can be spread over several connections (see split)
+    splittable = False
+    # True if messages carry sequence numbers that let redundant connections be arbitrated (see first_copy)
+    redundant = False
+    # True if the exchange sends all prices and sizes as JSON strings, the fastest parser is then usable with Decimal
+    string_numbers = False
+    # compression of every websocket frame, cryptofeed.util.compression.GZIP or DEFLATE
+    compression = None
+    # number of batches that can wait for their callbacks before the message handler waits for them (see batch)
+    max_pending_batches = 4
 
     def __init__(self, address, pairs=None, channels=None, config=None, callbacks=None, max_depth=None, book_interval=1000, snapshot_interval=False, checksum_validation=False, cross_check=False, origin=None,
-                 key_id=None):
+                 key_id=None, tick_book=False, parse_numeric=Decimal, checksum_interval=None, checksum_interval_ms=None,
+                 retain_levels=None, connections=None, max_streams=None, batch=False, json_parser=None,
+                 inflate_offload=None):
         """
         max_depth: int
             Maximum number of levels per side to return in book updates
@@ -33,6 +123,12 @@ class Feed:
             Updates between snapshots are not delivered to the client
         checksum_validation: bool
             Toggle checksum validation, when supported by an exchange.
+        checksum_interval: int
+            Sample checksum validation, validating every `checksum_interval` book updates per pair.
+            Snapshots are always validated. Defaults to every update.
+        checksum_interval_ms: int
+            Sample checksum validation, validating a pair at most every `checksum_interval_ms` milliseconds
+            (or when checksum_interval is reached, if both are set).
         cross_check: bool
             Toggle a check for a crossed book. Should not be needed on exchanges that support
             checksums or provide message sequence numbers.
@@ -40,6 +136,37 @@ class Feed:
             Passed into websocket connect. Sets the origin header.
         key_id: str
             API key to query the feed, required when requesting supported coins/pairs.
+        tick_book: bool
+            Store L2 books in the array backed, fixed point book engine (see cryptofeed.util.book.BookSide)
+            rather than SortedDicts, on exchanges that support it. Requires the exchange to publish tick sizes.
+            Not compatible with checksum validation, tick books hand prices back rebuilt from ticks, not in
+            the exchange's formatting that checksums are computed over.
+        parse_numeric: type
+            Type prices and sizes are parsed into, Decimal (default) or float. With float, no Decimals
+            are created while parsing, and books and callbacks carry floats. Checksum validation requires Decimal.
+        retain_levels: int
+            Keep at most this many levels per side of L2 books, levels further from the touch are dropped
+            to bound memory use. If dropped levels are later needed to fill the visible band (max_depth,
+            or half of retain_levels without max_depth) the connection is restarted to get a fresh snapshot.
+            Must be larger than max_depth, and at least the exchange's checksum depth when validating checksums.
+        connections: int
+            Spread the feed's subscriptions over this many websocket connections, on exchanges that support it.
+            Callbacks still see a single feed. See split()
+        max_streams: int
+            Spread the feed's subscriptions over as many connections as needed to have at most this many
+            (channel, pair) streams per connection, on exchanges that support it.
+        batch: bool or int
+            Collect callback events and deliver them in batches: with True, when the feed's handler yields to the
+            event loop (normally once per wire message), with an int, every `batch` milliseconds. BatchCallbacks
+            get each batch in one call, other callbacks are called once per event. Events are delivered grouped by
+            data type, and full L2 books that are not BookSnapshots (tick_book) show the book at delivery time.
+            When callbacks fall more than max_pending_batches batches behind, the handler waits for them.
+        json_parser: str
+            Parser for websocket messages, 'orjson', 'yapic' or 'json'. Defaults to the fastest one installed that
+            can honour parse_numeric (see Decoder).
+        inflate_offload: int
+            On exchanges that compress their messages, decompress frames of at least this many bytes in a
+            worker thread rather than on the event loop. See cryptofeed.util.compression.Inflater
         """
         self.hash = str(uuid.uuid4())
         self.uuid = f"{self.id}-{self.hash}"
@@ -49,13 +176,53 @@ class Feed:
         self.snapshot_interval = snapshot_interval
         self.cross_check = cross_check
         self.updates = defaultdict(int)
+        self.book_versions = defaultdict(int)
         self.do_deltas = False
         self.pairs = []
         self.channels = []
         self.max_depth = max_depth
         self.previous_book = defaultdict(dict)
+        self.depth_views = {}
+        self.top_of_book = {}
+        self.delta_trackers = {}
         self.origin = origin
         self.checksum_validation = checksum_validation
+        self.checksum_interval = checksum_interval
+        self.checksum_interval_ms = checksum_interval_ms
+        self.tick_book = tick_book
+        if parse_numeric not in (Decimal, float):
+            raise ValueError("parse_numeric must be Decimal or float")
+        if checksum_validation and parse_numeric is not Decimal:
+            raise ValueError("Checksum validation requires parse_numeric=Decimal")
+        if checksum_validation and tick_book:
+            raise ValueError("Checksum validation is not supported with tick_book")
+        self.parse_numeric = parse_numeric
+        self.json_parser = json_parser
+        self.decoder = Decoder(parse_numeric, self.string_numbers, json_parser)
+        self.inflater = Inflater(self.compression, inflate_offload) if self.compression else None
+        if retain_levels is not None and max_depth and retain_levels <= max_depth:
+            raise ValueError("retain_levels must be larger than max_depth")
+        self.retain_levels = retain_levels
+        self.retained_bounds = defaultdict(dict)
+        if (connections or max_streams) and not self.splittable:
+            raise ValueError(f"{self.id} does not support splitting subscriptions over several connections")
+        self.connections = connections
+        self.max_streams = max_streams
+        # number of connections receiving the same streams, set by FeedHandler.add_feed
+        self.redundancy = 1
+        self.sequences = {}
+        self.duplicates = 0
+        self.resync_buffers = {}
+        self.resync_tasks = {}
+        self.resync_restarts = set()
+        # data received per data type, counted when FeedHandler watches the feed's channels
+        self.activity = None
+        self.batch = batch
+        self.pending_events = defaultdict(list)
+        self.batch_lock = None
+        self.batch_tasks = deque()
+        # callback errors of batches delivered in the background, raised from the next callback
+        self.batch_errors = []
         load_exchange_pair_mapping(self.id, key_id=key_id)
 
         if config is not None and (pairs is not None or channels is not None):
@@ -86,7 +253,8 @@ class Feed:
                           TRADES: Callback(None),
                           TRANSACTIONS: Callback(None),
                           VOLUME: Callback(None),
-                          KLINE: Callback(None)
+                          KLINE: Callback(None),
+                          TOP_OF_BOOK: Callback(None)
                           }
 
         if callbacks:
@@ -119,6 +287,204 @@ class Feed:
         data.update(info)
         return data
 
+    def streams(self) -> list:
+        """
+        The feed's subscriptions, as (exchange channel, exchange pair) tuples
+        """
+        if self.config:
+            return [(chan, pair) for chan, pairs in self.config.items() for pair in pairs]
+        return [(chan, pair) for chan in self.channels for pair in self.pairs]
+
+    def replica_streams(self) -> list:
+        """
+        The streams a redundant connection subscribes to, the streams whose messages can be arbitrated
+        """
+        return self.streams()
+
+    def split(self) -> list:
+        """
+        Partition the feed's subscriptions over `connections` connections, or as many as are needed
+        for at most `max_streams` streams per connection. All channels of a pair share a connection,
+        and pairs are balanced by estimated message rate.
+
+        Returns one feed per connection: shallow copies of this feed with their own uuid, address
+        and subscription config, sharing its callbacks and pair keyed state, so callbacks see one
+        logical feed. Returns [self] if no split is needed.
+        """
+        by_pair = defaultdict(list)
+        for chan, pair in self.streams():
+            by_pair[pair].append(chan)
+        count = self.connections or 1
+        if self.max_streams:
+            count = max(count, math.ceil(sum(len(chans) for chans in by_pair.values()) / self.max_streams))
+        count = min(count, len(by_pair))
+        if count <= 1:
+            return [self]
+
+        parts = [{'rate': 0, 'streams': 0, 'config': defaultdict(set)} for _ in range(count)]
+        rates = {pair: sum(stream_rate(self.id, chan) for chan in chans) for pair, chans in by_pair.items()}
+        for pair in sorted(by_pair, key=rates.get, reverse=True):
+            room = [part for part in parts if not self.max_streams or part['streams'] + len(by_pair[pair]) <= self.max_streams]
+            part = min(room or parts, key=lambda part: part['rate'])
+            part['rate'] += rates[pair]
+            part['streams'] += len(by_pair[pair])
+            for chan in by_pair[pair]:
+                part['config'][chan].add(pair)
+
+        feeds = []
+        for part in parts:
+            if not part['config']:
+                continue
+            feed = copy.copy(self)
+            feed.hash = str(uuid.uuid4())
+            feed.uuid = f"{self.id}-{feed.hash}"
+            feed.config = part['config']
+            feed.pairs = []
+            feed.channels = []
+            feed.connections = feed.max_streams = None
+            feed.pending_events = defaultdict(list)
+            feed.batch_lock = None
+            feed.batch_tasks = deque()
+            feed.batch_errors = []
+            # resyncs are per connection, a part (re)subscribing only clears its own
+            feed.resync_buffers = {}
+            feed.resync_tasks = {}
+            feed.resync_restarts = set()
+            if self.inflater:
+                feed.inflater = Inflater(self.compression, self.inflater.offload)
+            feed.address = feed._split_address()
+            feeds.append(feed)
+        return feeds
+
+    def _split_address(self):
+        """
+        Websocket address of a feed created by split(), for exchanges that encode subscriptions in the address
+        """
+        return self.address
+
+    def first_copy(self, stream, sequence) -> bool:
+        """
+        With redundant connections, returns True for the first copy of a message on a stream
+        (a pair's channel) and False for copies already delivered by another connection,
+        by comparing the message's sequence number or update id with the highest seen so far.
+        """
+        last = self.sequences.get(stream)
+        if last is not None and sequence <= last:
+            self.duplicates += 1
+            return False
+        self.sequences[stream] = sequence
+        return True
+
+    def resync(self, pair: str, snapshot, replay, update: tuple = None):
+        """
+        Rebuild one pair's book from a new snapshot while the feed's other pairs carry on,
+        rather than resetting the whole feed when a gap is found. Also used to fetch the
+        initial snapshots concurrently.
+
+        snapshot: coroutine function
+            fetches and loads the pair's book
+        replay: coroutine function
+            applies one buffered update, called with the arguments given to buffer_update.
+            It must not call buffer_update itself
+        update: tuple
+            arguments of the update that revealed the gap, replayed first
+
+        While the snapshot is fetched, the pair's updates passed to buffer_update are held and
+        then replayed in order. A gap found while replaying starts over with a new snapshot.
+        """
+        buffer = self.resync_buffers.get(pair)
+        if buffer is not None:
+            self.resync_restarts.add(pair)
+            if update is not None:
+                buffer.appendleft(update)
+            return
+        buffer = self.resync_buffers[pair] = deque()
+        if update is not None:
+            buffer.append(update)
+        self.resync_tasks[pair] = asyncio.ensure_future(self._resync(pair, buffer, snapshot, replay))
+
+    def buffer_update(self, pair: str, *args) -> bool:
+        """
+        Returns True if the pair is being resynced, in which case the update is held for replay
+        """
+        buffer = self.resync_buffers.get(pair)
+        if buffer is None:
+            return False
+        buffer.append(args)
+        return True
+
+    async def _resync(self, pair: str, buffer: deque, snapshot, replay):
+        delay = 1
+        try:
+            while True:
+                self.resync_restarts.discard(pair)
+                try:
+                    await snapshot()
+                except Exception:
+                    LOG.warning("%s: %s snapshot failed, retrying in %d seconds", self.id, pair, delay, exc_info=True)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 60)
+                    continue
+
+                while buffer and pair not in self.resync_restarts:
+                    update = buffer.popleft()
+                    try:
+                        await replay(*update)
+                    except Exception:
+                        LOG.error("%s: error replaying %s update, resyncing", self.id, pair, exc_info=True)
+                        self.resync_restarts.add(pair)
+                if pair not in self.resync_restarts:
+                    return
+        finally:
+            # a reset may have replaced this resync already
+            if self.resync_buffers.get(pair) is buffer:
+                del self.resync_buffers[pair]
+                del self.resync_tasks[pair]
+
+    def clear_resyncs(self):
+        """
+        Cancel resyncs in progress, on reconnect the connection's pairs are resnapshotted anyway.
+        Parts of a split feed each have their own resyncs (see split)
+        """
+        for task in self.resync_tasks.values():
+            task.cancel()
+        self.resync_buffers.clear()
+        self.resync_tasks.clear()
+        self.resync_restarts.clear()
+
+    def new_book(self, pair: str) -> dict:
+        """
+        Return an empty L2 book for the (standardized) pair. When tick_book is enabled
+        and the exchange publishes a tick size for the pair, the sides are array backed
+        BookSides, otherwise SortedDicts.
+        """
+        tick_size = _exchange_info[self.id]['tick_size'].get(pair) if self.tick_book else None
+        return new_book(tick_size, numeric=self.parse_numeric)
+
+    def load_book(self, pair: str, bids: list, asks: list, price=0, size=1) -> dict:
+        """
+        Build a new L2 book for the pair from snapshot levels in one bulk load per side
+        and store it in self.l2_book. price and size are the index (or key) of the
+        price and size in each level.
+        """
+        book = self.new_book(pair)
+        load_levels(book[BID], bids, self.parse_numeric, price, size)
+        load_levels(book[ASK], asks, self.parse_numeric, price, size)
+        self.l2_book[pair] = book
+        return book
+
+    def book_tracker(self, pair: str) -> DeltaTracker:
+        """
+        Return a DeltaTracker for the pair's L2 book. Exchanges that receive full books
+        apply them through the tracker so book_callback can emit deltas without
+        diffing against the previous book.
+        """
+        tracker = self.delta_trackers.get(pair)
+        if tracker is None or tracker.book is not self.l2_book[pair]:
+            tracker = DeltaTracker(self.l2_book[pair])
+            self.delta_trackers[pair] = tracker
+        return tracker
+
     async def book_callback(self, book: dict, book_type: str, pair: str, forced: bool, delta: dict, timestamp: float, receipt_timestamp: float):
         """
         Three cases we need to handle here
@@ -134,31 +500,54 @@ class Feed:
 
         For 1, need to handle separate cases where a full book is returned vs a delta
         """
+        if self.activity is not None:
+            self.activity[book_type] += 1
+        if not delta and book_type == L2_BOOK and pair in self.delta_trackers:
+            # always drain the tracker, even when deltas are not enabled
+            delta = self.delta_trackers[pair].delta()
+
+        # books replaced through a DeltaTracker are full exchange snapshots, already bounded
+        if self.retain_levels and book_type == L2_BOOK and pair not in self.delta_trackers:
+            self.retain_book(book, pair, forced)
+
+        top = None
+        if book_type == L2_BOOK:
+            top = self.top_of_book.get(pair)
+            if top is None:
+                top = self.top_of_book[pair] = TopOfBook()
+            changed = top.update(book, delta) if delta and not forced else top.reset(book)
+            if changed:
+                await self.callback(TOP_OF_BOOK, feed=self.id, pair=pair, best_bid=top.bid, best_bid_size=top.bid_size,
+                                    best_ask=top.ask, best_ask_size=top.ask_size, timestamp=timestamp, receipt_timestamp=receipt_timestamp)
+
         if self.do_deltas:
             if not forced and self.updates[pair] < self.book_update_interval:
                 if self.max_depth:
-                    delta, book = await self.apply_depth(book, True, pair)
+                    delta, book = await self.apply_depth(book, True, pair, delta, book_type)
                     if not (delta[BID] or delta[ASK]):
                         return
-                elif not delta:
-                    # this will only happen in cases where an exchange does not support deltas and max depth is not enabled.
-                    # this is an uncommon situation. Exchanges that do not support deltas will need
-                    # to populate self.previous internally to avoid the unncesessary book copy on all other exchanges
-                    delta = book_delta(self.previous_book[pair], book, book_type=book_type)
+                else:
+                    if not delta:
+                        # this will only happen in cases where an exchange does not support deltas, does not
+                        # use a DeltaTracker and max depth is not enabled. Exchanges that do not support deltas
+                        # will need to populate self.previous internally to avoid the unncesessary book
+                        # copy on all other exchanges
+                        delta = book_delta(self.previous_book[pair], book, book_type=book_type)
                     if not (delta[BID] or delta[ASK]):
                         return
                 self.updates[pair] += 1
                 if self.cross_check:
-                    self.check_bid_ask_overlapping(book, pair)
+                    self.check_bid_ask_overlapping(book, pair, top)
                 await self.callback(BOOK_DELTA, feed=self.id, pair=pair, delta=delta, timestamp=timestamp, receipt_timestamp=receipt_timestamp)
                 if self.updates[pair] != self.book_update_interval:
                     return
-            elif forced and self.max_depth:
-                # We want to send a full book update but need to apply max depth first
-                _, book = await self.apply_depth(book, False, pair)
+            elif self.max_depth:
+                # We want to send a full book update but need to apply max depth first. The view
+                # must see every delta, so this also covers the periodic (non forced) full book update
+                _, book = await self.apply_depth(book, False, pair, None if forced else delta, book_type)
         elif self.max_depth:
             if not self.snapshot_interval or (self.snapshot_interval and self.updates[pair] >= self.snapshot_interval):
-                changed, book = await self.apply_depth(book, False, pair)
+                changed, book = await self.apply_depth(book, False, pair, None if forced else delta, book_type)
                 if not changed:
                     return
         # case 4 - incremement skiped update, and exit
@@ -167,39 +556,161 @@ class Feed:
             return
 
         if self.cross_check:
-            self.check_bid_ask_overlapping(book, pair)
+            self.check_bid_ask_overlapping(book, pair, top)
         if book_type == L2_BOOK:
+            # books built from BookSides are handed out as read only, zero copy snapshots
+            self.book_versions[pair] += 1
+            book = book_snapshot(book, self.book_versions[pair])
             await self.callback(L2_BOOK, feed=self.id, pair=pair, book=book, timestamp=timestamp, receipt_timestamp=receipt_timestamp)
         else:
             await self.callback(L3_BOOK, feed=self.id, pair=pair, book=book, timestamp=timestamp, receipt_timestamp=receipt_timestamp)
         self.updates[pair] = 0
 
-    def check_bid_ask_overlapping(self, book, pair):
-        bid, ask = book[BID], book[ASK]
-        if len(bid) > 0 and len(ask) > 0:
-            best_bid, best_ask = bid.keys()[-1], ask.keys()[0]
-            if best_bid >= best_ask:
-                raise BidAskOverlapping(f"{self.id} {pair} best bid {best_bid} >= best ask {best_ask}")
+    def retain_book(self, book: dict, pair: str, forced: bool):
+        """
+        Drop levels beyond retain_levels from the pair's book. Raises IncompleteBook when
+        a side has dropped levels and no longer fills the visible band, so the connection
+        is restarted and the book rebuilt from a snapshot.
+        """
+        bounds = self.retained_bounds[pair]
+        if forced:
+            bounds.clear()
+        visible = self.max_depth or self.retain_levels // 2
+        for side in (BID, ASK):
+            bound = prune_levels(book[side], self.retain_levels, side == ASK, bounds.get(side))
+            if bound is None:
+                continue
+            bounds[side] = bound
+            if len(book[side]) < visible:
+                bounds.clear()
+                raise IncompleteBook(f"{self.id} {pair} {side} side has {len(book[side])} levels after dropping levels beyond {bound}")
+
+    def check_bid_ask_overlapping(self, book, pair, top: TopOfBook = None):
+        """
+        top: the cached best bid/ask of an L2 book. L3 books are not cached, so it is read from the book
+        """
+        if top is None:
+            top = TopOfBook()
+            top.reset(book)
+        if top.bid is not None and top.ask is not None and top.bid >= top.ask:
+            raise BidAskOverlapping(f"{self.id} {pair} best bid {top.bid} >= best ask {top.ask}")
 
     async def callback(self, data_type, **kwargs):
+        if self.activity is not None:
+            self.activity[data_type] += 1
+        if self.batch:
+            # slow callbacks push back on the handler, rather than batches piling up
+            while self.batch_tasks and (self.batch_tasks[0].done() or len(self.batch_tasks) > self.max_pending_batches):
+                await self.batch_tasks.popleft()
+            if self.batch_errors:
+                # as without batching, a failing callback ends up in the connection's handler
+                error = self.batch_errors[0]
+                self.batch_errors.clear()
+                raise error
+            if not self.pending_events:
+                loop = asyncio.get_event_loop()
+                if self.batch is True:
+                    loop.call_soon(self._schedule_flush)
+                else:
+                    loop.call_later(self.batch / 1000, self._schedule_flush)
+            self.pending_events[data_type].append(kwargs)
+            return
         for cb in self.callbacks[data_type]:
             await cb(**kwargs)
 
-    async def apply_depth(self, book: dict, do_delta: bool, pair: str):
-        ret = depth(book, self.max_depth)
+    def _schedule_flush(self):
+        # the batch is cut now, delivery may run later
+        pending, self.pending_events = self.pending_events, defaultdict(list)
+        self.batch_tasks.append(asyncio.ensure_future(self._deliver(pending, background=True)))
+
+    async def flush_events(self):
+        """
+        Deliver the pending batch of events now, after the batches already cut. Raises the first
+        error of a callback, once every callback has had its events
+        """
+        pending, self.pending_events = self.pending_events, defaultdict(list)
+        while self.batch_tasks:
+            await self.batch_tasks.popleft()
+        await self._deliver(pending)
+
+    async def _deliver(self, pending: dict, background: bool = False):
+        if self.batch_lock is None:
+            self.batch_lock = asyncio.Lock()
+        errors = []
+        # batches are delivered in order
+        async with self.batch_lock:
+            for data_type, events in pending.items():
+                for cb in self.callbacks[data_type]:
+                    # a failing callback does not keep the other callbacks from their events
+                    try:
+                        if isinstance(cb, BatchCallback):
+                            await cb.batch(events)
+                        else:
+                            for event in events:
+                                await cb(**event)
+                    except Exception as e:
+                        LOG.error("%s: error delivering a batch of %s callbacks", self.id, data_type, exc_info=True)
+                        errors.append(e)
+        if errors:
+            if background:
+                self.batch_errors.append(errors[0])
+            else:
+                raise errors[0]
+
+    async def apply_depth(self, book: dict, do_delta: bool, pair: str, delta: dict = None, book_type=L2_BOOK):
+        """
+        Returns a copy of the top max_depth levels of the book, along with the delta for those levels
+        (do_delta) or a flag indicating if they changed. When the exchange supplied delta is
+        available the view is updated incrementally, otherwise it is rebuilt from the full book.
+        """
+        if pair not in self.depth_views:
+            self.depth_views[pair] = DepthView(self.max_depth)
+        view = self.depth_views[pair]
+
+        # with snapshot intervals, updates in between snapshots never reach here,
+        # so the view cannot be maintained incrementally. L3 deltas are per order,
+        # so L3 views are always rebuilt
+        if delta and not self.snapshot_interval and book_type == L2_BOOK:
+            changes = view.update(book, delta)
+        else:
+            changes = view.reset(book, book_type)
+        # callbacks can hold on to the book, the view itself changes with the next update
+        book = view.levels()
+        self.previous_book[pair] = book
+
         if not do_delta:
-            delta = self.previous_book[pair] != ret
-            self.previous_book[pair] = ret
-            return delta, ret
+            return bool(changes[BID] or changes[ASK]), book
+        return changes, book
 
-        delta = book_delta(self.previous_book[pair], ret)
-        self.previous_book[pair] = ret
-        return delta, ret
+    def decode(self, msg: str):
+        return self.decoder.loads(msg)
+
+    async def inflate_decode(self, msg: bytes):
+        """
+        Decompress and decode a compressed message, see Feed.compression
+        """
+        return await self.inflater.decode(msg, self.decoder.loads)
 
     async def message_handler(self, msg: str, timestamp: float):
         raise NotImplementedError
 
+    async def subscribe_replica(self, websocket):
+        """
+        Subscribe a redundant connection. Unlike subscribe, books and other state are
+        left alone, they are shared with the primary connection
+        """
+        raise NotImplementedError
+
     async def stop(self):
+        self.clear_resyncs()
+        if self.inflater:
+            self.inflater.stop()
+        if self.pending_events or self.batch_tasks:
+            try:
+                await self.flush_events()
+            except Exception:
+                # already logged by _deliver, shutting down regardless
+                pass
         for callbacks in self.callbacks.values():
             for callback in callbacks:
                 if hasattr(callback, 'stop'):
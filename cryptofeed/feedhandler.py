@@ -6,10 +6,13 @@ associated with this software.
 '''
 import asyncio
 import logging
+import multiprocessing
+from multiprocessing.connection import wait
+import signal
 from signal import SIGTERM
-import zlib
 from collections import defaultdict
 from copy import deepcopy
+from decimal import Decimal
 from socket import error as socket_error
 from time import time
 import functools
@@ -17,6 +20,7 @@ import functools
 import websockets
 from websockets import ConnectionClosed
 
+from cryptofeed.callback import Callback, shutdown_process_pool
 from cryptofeed.config import Config
 from cryptofeed.defines import (BINANCE, BINANCE_DELIVERY, BINANCE_FUTURES, BINANCE_US, BITCOINCOM, BITFINEX,
                                 BITMAX, BITMEX, BITSTAMP, BITTREX, BLOCKCHAIN, BYBIT,
@@ -25,13 +29,20 @@ from cryptofeed.defines import (BINANCE, BINANCE_DELIVERY, BINANCE_FUTURES, BINA
                                 KRAKEN, KRAKEN_FUTURES, OKCOIN, OKEX, POLONIEX, PROBIT, UPBIT, WHALE_ALERT)
 from cryptofeed.defines import EXX as EXX_str
 from cryptofeed.defines import FTX as FTX_str
-from cryptofeed.defines import L2_BOOK
-from cryptofeed.exceptions import ExhaustedRetries
+from cryptofeed.defines import L2_BOOK, TOP_OF_BOOK
+from cryptofeed.exceptions import ExhaustedRetries, UnsupportedDataFeed
 from cryptofeed.exchanges import *
 from cryptofeed.providers import *
-from cryptofeed.feed import RestFeed
+from cryptofeed.feed import Decoder, RestFeed
 from cryptofeed.log import get_logger
 from cryptofeed.nbbo import NBBO
+from cryptofeed.replay import Replay
+from cryptofeed.shard import ForwardCallback, shard_feeds
+from cryptofeed.standards import feed_to_exchange
+from cryptofeed.util import http
+from cryptofeed.util.ingress import BLOCK, IngressQueue
+from cryptofeed.util.liveness import LivenessMonitor
+from cryptofeed.util.perf import LoopLagMonitor
 
 LOG = logging.getLogger('feedhandler')
 
@@ -74,66 +85,92 @@ _EXCHANGES = {
 
 
 class FeedHandler:
-    def __init__(self, retries=10, timeout_interval=10, log_messages_on_error=False, raw_message_capture=None,
-                 handler_enabled=True, config=None):
+    def __init__(self, retries=10, timeout_interval=1, log_messages_on_error=False, raw_message_capture=None,
+                 handler_enabled=True, config=None, parse_numeric=None, workers=None,
+                 loop=None, loop_lag=None, ingress_size=None, ingress_policy=BLOCK):
         """
         retries: int
             number of times the connection will be retried (in the event of a disconnect or other failure)
-        timeout_interval: int
-            number of seconds between checks to see if a feed has timed out
+        timeout_interval: float
+            resolution, in seconds, of the liveness watchdog that checks connections and channels
+            for timeouts (see cryptofeed.util.liveness), and of the worker supervisor
         log_messages_on_error: boolean
             if true, log the message from the exchange on exceptions
         raw_message_capture: callback
-            if defined, callback to save/process/handle raw message (primarily for debugging purposes)
+            if defined, callback to save/process/handle raw message (primarily for debugging purposes), called with
+            the message, its receipt timestamp and the connection's id. cryptofeed.util.capture.CaptureWriter writes
+            compressed, indexed capture files. A capture callback with a stop coroutine is stopped on shutdown.
         handler_enabled: boolean
             run message handlers (and any registered callbacks) when raw message capture is enabled
         config: str
             absolute path (including file name) of the config file. If not provided env var checked first, then local config.yaml
+        parse_numeric: type
+            if defined (Decimal or float), the type every feed added to the handler parses prices and sizes into.
+            See Feed
+        workers: int
+            if greater than 1, run the feeds in this many worker processes, spread by estimated
+            message rate (see cryptofeed.shard). A worker that exits is restarted, up to `retries` times.
+            Callbacks run in the workers, unless wrapped in a ForwardCallback, which runs them in
+            this process. Requires the fork start method (Linux/macOS).
+        loop: str or asyncio.AbstractEventLoopPolicy
+            event loop to run on. 'uvloop' installs uvloop's policy if uvloop is installed (falling back to
+            asyncio's default loop with a warning), 'asyncio' or None keeps the default, or pass a policy instance.
+        loop_lag: bool or LoopLagMonitor
+            sample event loop lag in every process that runs feeds and periodically log p50/p99/max.
+            True uses a LoopLagMonitor with default settings. See cryptofeed.util.perf.LoopLagMonitor
+        ingress_size: int
+            if set, each websocket connection gets a bounded queue of this many messages between the
+            socket reader and the message handler, so slow parsing/callbacks do not stall the socket.
+            Receipt timestamps are taken when messages are read. See ingress_stats()
+        ingress_policy: str
+            what to do when the ingress queue is full: 'block' (wait for the handler), 'drop_oldest',
+            or 'resync' (drop the queued messages and restart the connection, so books are resnapshotted)
         """
         self.feeds = []
         self.retries = retries
         self.timeout = {}
-        self.last_msg = {}
+        self.channel_timeouts = {}
+        self.messages = defaultdict(int)
+        self.connects = defaultdict(int)
         self.timeout_interval = timeout_interval
+        self.liveness = LivenessMonitor(resolution=timeout_interval)
+        self.watches = {}
+        self.reconnect_reasons = defaultdict(lambda: defaultdict(int))
         self.log_messages_on_error = log_messages_on_error
         self.raw_message_capture = raw_message_capture
         self.handler_enabled = handler_enabled
+        self.parse_numeric = parse_numeric
+        self.workers = workers
+        if loop not in (None, 'asyncio', 'uvloop') and not isinstance(loop, asyncio.AbstractEventLoopPolicy):
+            raise ValueError("loop must be 'asyncio', 'uvloop' or an event loop policy")
+        self.loop = loop
+        self.loop_lag = LoopLagMonitor() if loop_lag is True else loop_lag or None
+        if ingress_size is not None:
+            # validate the size and policy up front
+            IngressQueue(ingress_size, ingress_policy)
+        self.ingress_size = ingress_size
+        self.ingress_policy = ingress_policy
+        self.ingress = {}
+        self.locks = {}
         self.config = Config(file_name=config)
 
         lfile = '/data/logs/mustang/info.log' if not self.config or not self.config.log.filename else self.config.log.filename
         level = logging.INFO if not self.config or not self.config.log.level else self.config.log.level
         get_logger('feedhandler', lfile, level)
 
-    def playback(self, feed, filenames):
+    def playback(self, feed, filenames, speed=None):
+        """
+        Replay captures (text or binary, see cryptofeed.replay) through `feed`, as fast as possible
+        or at `speed` times the pace they were received. Every message in the files goes to the feed.
+        """
         loop = asyncio.get_event_loop()
-        return loop.run_until_complete(self._playback(feed, filenames))
-
-    async def _playback(self, feed, filenames):
-        counter = 0
-        callbacks = defaultdict(int)
-
-        class FakeWS:
-            async def send(self, *args, **kwargs):
-                pass
+        return loop.run_until_complete(self._playback(feed, filenames, speed))
 
-        async def internal_cb(*args, **kwargs):
-            callbacks[kwargs['cb_type']] += 1
+    async def _playback(self, feed, filenames, speed=None):
+        stats = await Replay(feed, filenames, speed=speed, route=lambda conn_id: feed.id).replay()
+        return {'messages_processed': stats['messages'], 'callbacks': stats['callbacks']}
 
-        for cb_type, handler in feed.callbacks.items():
-            f = functools.partial(internal_cb, cb_type=cb_type)
-            handler.append(f)
-
-        await feed.subscribe(FakeWS())
-
-        for filename in filenames if isinstance(filenames, list) else [filenames]:
-            with open(filename, 'r') as fp:
-                for line in fp:
-                    timestamp, message = line.split(":", 1)
-                    counter += 1
-                    await feed.message_handler(message, timestamp)
-            return {'messages_processed': counter, 'callbacks': dict(callbacks)}
-
-    def add_feed(self, feed, timeout=120, **kwargs):
+    def add_feed(self, feed, timeout=120, redundancy=1, channel_timeouts=None, **kwargs):
         """
         feed: str or class
             the feed (exchange) to add to the handler
@@ -142,6 +179,14 @@ class FeedHandler:
             to be timed out. The connection will be closed, and if retries
             have not been exhausted, the connection will be restablished.
             If set to -1, no timeout will occur.
+        redundancy: int
+            number of independent connections to open to the feed's streams. Messages are arbitrated
+            by sequence number or update id, only the first copy of each reaches the books and callbacks.
+            Supported by exchanges that sequence their messages (Binance, Coinbase).
+        channel_timeouts: dict
+            data type (eg L2_BOOK, TRADES) to number of seconds without data of that type before
+            the connection is restarted, to catch a channel that stalls while others keep flowing.
+            Only data types the feed subscribes to are watched, others are ignored
         kwargs: dict
             if a string is used for the feed, kwargs will be passed to the
             newly instantiated object
@@ -149,21 +194,123 @@ class FeedHandler:
         if isinstance(feed, str):
             if feed in _EXCHANGES:
                 if feed == BITMAX:
-                    self._do_bitmax_subscribe(feed, timeout, **kwargs)
+                    parts = self._bitmax_feeds(feed, **kwargs)
                 else:
-                    self.feeds.append(_EXCHANGES[feed](**kwargs))
-                    feed = self.feeds[-1]
-                    self.last_msg[feed.uuid] = None
-                    self.timeout[feed.uuid] = timeout
+                    parts = self._split_feed(_EXCHANGES[feed](**kwargs))
             else:
                 raise ValueError("Invalid feed specified")
         else:
             if isinstance(feed, Bitmax):
-                self._do_bitmax_subscribe(feed, timeout)
+                parts = self._bitmax_feeds(feed)
             else:
-                self.feeds.append(feed)
-                self.last_msg[feed.uuid] = None
-                self.timeout[feed.uuid] = timeout
+                parts = self._split_feed(feed)
+
+        # check every part before adding any, so an invalid feed is not left half configured
+        decoders = {}
+        for part in parts:
+            if redundancy > 1 and (not part.redundant or not part.replica_streams()):
+                raise ValueError(f"{part.id} does not support redundant connections")
+            if self.parse_numeric is not None:
+                if part.checksum_validation and self.parse_numeric is not Decimal:
+                    raise ValueError("Checksum validation requires parse_numeric=Decimal")
+                # pick the parser again, orjson cannot produce Decimals
+                decoders[part.uuid] = Decoder(self.parse_numeric, part.string_numbers, part.json_parser)
+
+        for part in parts:
+            self.feeds.append(part)
+            self.timeout[part.uuid] = timeout
+            if redundancy > 1:
+                part.redundancy = redundancy
+                for replica in range(1, redundancy):
+                    self.timeout[self._connection_id(part, replica)] = timeout
+
+            if channel_timeouts:
+                timeouts = self._channel_timeouts(part, channel_timeouts)
+                if timeouts:
+                    part.activity = defaultdict(int)
+                    self.channel_timeouts[part.uuid] = timeouts
+
+            if self.parse_numeric is not None:
+                part.parse_numeric = self.parse_numeric
+                part.decoder = decoders[part.uuid]
+
+    @staticmethod
+    def _channel_timeouts(feed, channel_timeouts: dict) -> dict:
+        """
+        The channel timeouts of the data types the feed subscribes to. TOP_OF_BOOK is derived
+        from L2 books, so it is watched if the feed subscribes to L2_BOOK
+        """
+        subscribed = set(feed.channels) | set(feed.config)
+        ret = {}
+        for data_type, seconds in channel_timeouts.items():
+            try:
+                channel = feed_to_exchange(feed.id, L2_BOOK if data_type == TOP_OF_BOOK else data_type, silent=True)
+            except UnsupportedDataFeed:
+                continue
+            if channel in subscribed:
+                ret[data_type] = seconds
+        return ret
+
+    @staticmethod
+    def _split_feed(feed) -> list:
+        """
+        Feeds configured with connections/max_streams are added as one feed per connection
+        """
+        return feed.split() if feed.connections or feed.max_streams else [feed]
+
+    @staticmethod
+    def _connection_id(feed, replica: int = 0) -> str:
+        return feed.uuid if not replica else f"{feed.uuid}-{replica}"
+
+    def connection_stats(self) -> dict:
+        """
+        Per connection stats, by feed uuid (with a -N suffix for redundant connections): feed id,
+        replica number, number of streams, messages received, number of (re)connects, seconds since
+        the last message (to within the watchdog's sampling period), the number of duplicate messages
+        dropped for the feed and the reasons for reconnects (see reconnect_stats)
+        """
+        ret = {}
+        for feed in self.feeds:
+            for replica in range(feed.redundancy):
+                conn_id = self._connection_id(feed, replica)
+                ret[conn_id] = {'feed': feed.id,
+                                'replica': replica,
+                                'streams': len(feed.replica_streams() if replica else feed.streams()),
+                                'messages': self.messages[conn_id],
+                                'connects': self.connects[conn_id],
+                                'idle': self.watches[conn_id].idle if conn_id in self.watches else None,
+                                'duplicates': feed.duplicates,
+                                'reconnects': dict(self.reconnect_reasons[conn_id])}
+        return ret
+
+    def callback_stats(self) -> dict:
+        """
+        Execution policy, number of calls and time spent (see Callback.stats) of each
+        registered Callback, by feed id and data type
+        """
+        ret = defaultdict(lambda: defaultdict(list))
+        seen = set()
+        for feed in self.feeds:
+            for data_type, callbacks in feed.callbacks.items():
+                for cb in callbacks:
+                    if isinstance(cb, Callback) and cb.callback is not None and id(cb) not in seen:
+                        seen.add(id(cb))
+                        ret[feed.id][data_type].append(cb.stats())
+        return {feed_id: dict(stats) for feed_id, stats in ret.items()}
+
+    def inflate_stats(self) -> dict:
+        """
+        Decompression and parse times (see cryptofeed.util.compression.Inflater.stats) of each
+        connection of feeds that receive compressed messages, by feed uuid
+        """
+        return {feed.uuid: feed.inflater.stats() for feed in self.feeds if feed.inflater is not None}
+
+    def reconnect_stats(self) -> dict:
+        """
+        Number of reconnects by reason, by connection: 'timeout' (no messages), '<data type> timeout'
+        (a channel timeout), 'ingress overflow', or the name of the exception that ended the connection
+        """
+        return {conn_id: dict(reasons) for conn_id, reasons in self.reconnect_reasons.items()}
 
     def add_nbbo(self, feeds, pairs, callback, timeout=120):
         """
@@ -179,15 +326,23 @@ class FeedHandler:
         """
         cb = NBBO(callback, pairs)
         for feed in feeds:
-            self.add_feed(feed(channels=[L2_BOOK], pairs=pairs, callbacks={L2_BOOK: cb}), timeout=timeout)
+            self.add_feed(feed(channels=[L2_BOOK], pairs=pairs, callbacks={TOP_OF_BOOK: cb}), timeout=timeout)
 
     def run(self, start_loop=True):
         if len(self.feeds) == 0:
             LOG.error('No feeds specified')
             raise ValueError("No feeds specified")
 
+        if self.workers and self.workers > 1:
+            self._run_workers()
+            return
+
         try:
+            self._install_loop_policy()
             loop = asyncio.get_event_loop()
+            if self.loop_lag:
+                self.loop_lag.start(loop)
+            self.liveness.start(loop)
 
             # Good to enable when debugging
             # loop.set_debug(True)
@@ -195,14 +350,15 @@ class FeedHandler:
             def handle_stop_signals():
                 raise SystemExit
 
-            for signal in [SIGTERM]:
-                loop.add_signal_handler(signal, handle_stop_signals)
+            for sig in [SIGTERM]:
+                loop.add_signal_handler(sig, handle_stop_signals)
 
             for feed in self.feeds:
                 if isinstance(feed, RestFeed):
                     loop.create_task(self._rest_connect(feed))
                 else:
-                    loop.create_task(self._connect(feed))
+                    for replica in range(feed.redundancy):
+                        loop.create_task(self._connect(feed, replica))
             if start_loop:
                 loop.run_forever()
         except KeyboardInterrupt:
@@ -212,20 +368,132 @@ class FeedHandler:
         except Exception:
             LOG.error("Unhandled exception", exc_info=True)
         finally:
+            if self.loop_lag:
+                self.loop_lag.stop()
+            self.liveness.stop()
             for feed in self.feeds:
                 loop.run_until_complete(feed.stop())
+            if hasattr(self.raw_message_capture, 'stop'):
+                loop.run_until_complete(self.raw_message_capture.stop())
+            loop.run_until_complete(http.close_session())
+            shutdown_process_pool()
 
-    async def _watch(self, feed_id, websocket):
-        if self.timeout[feed_id] == -1:
-            return
+    def _install_loop_policy(self):
+        if self.loop == 'uvloop':
+            try:
+                import uvloop
+            except ImportError:
+                LOG.warning("uvloop is not installed, using the default asyncio event loop")
+                return
+            if not isinstance(asyncio.get_event_loop_policy(), uvloop.EventLoopPolicy):
+                asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        elif isinstance(self.loop, asyncio.AbstractEventLoopPolicy) and asyncio.get_event_loop_policy() is not self.loop:
+            asyncio.set_event_loop_policy(self.loop)
+
+    def _run_workers(self):
+        """
+        Run the feeds sharded over worker processes. The parent process only restarts workers
+        that exit and runs forwarded callbacks. Workers are forked while no event loop is running.
+        """
+        try:
+            ctx = multiprocessing.get_context('fork')
+        except ValueError:
+            raise ValueError("workers requires the fork start method")
 
-        while websocket.open:
-            if self.last_msg[feed_id]:
-                if time() - self.last_msg[feed_id] > self.timeout[feed_id]:
-                    LOG.warning("%s: received no messages within timeout, restarting connection", feed_id)
-                    await websocket.close()
-                    break
-            await asyncio.sleep(self.timeout_interval)
+        shards = shard_feeds(self.feeds, self.workers)
+        loop = asyncio.get_event_loop()
+        procs = {}
+        readers = {}
+        restarts = defaultdict(int)
+
+        def start(index):
+            reader, writer = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=self._worker, args=(shards[index], writer), name=f'cryptofeed-worker-{index}', daemon=True)
+            proc.start()
+            writer.close()
+            procs[index] = proc
+            readers[reader] = index
+            LOG.info("worker %d (pid %d) started with feeds %s", index, proc.pid, ', '.join(feed.id for feed in shards[index]))
+
+        def handle_stop_signals(*args):
+            raise SystemExit
+
+        signal.signal(SIGTERM, handle_stop_signals)
+        try:
+            for index in range(len(shards)):
+                start(index)
+
+            while procs:
+                for reader in wait(list(readers), timeout=self.timeout_interval):
+                    try:
+                        data = reader.recv_bytes()
+                    except EOFError:
+                        del readers[reader]
+                        reader.close()
+                        continue
+                    loop.run_until_complete(ForwardCallback.dispatch(data))
+
+                for index, proc in list(procs.items()):
+                    if proc.is_alive():
+                        continue
+                    for reader in [reader for reader, idx in readers.items() if idx == index]:
+                        del readers[reader]
+                        reader.close()
+                    del procs[index]
+                    if self.retries != -1 and restarts[index] >= self.retries:
+                        LOG.error("worker %d exited with code %s, failed after %d restarts", index, proc.exitcode, restarts[index])
+                        continue
+                    LOG.warning("worker %d exited with code %s, restarting", index, proc.exitcode)
+                    restarts[index] += 1
+                    start(index)
+            LOG.error("All workers exited")
+        except KeyboardInterrupt:
+            LOG.info("Keyboard Interrupt received - shutting down")
+        except SystemExit:
+            LOG.info("System Exit received - shutting down")
+        finally:
+            for proc in procs.values():
+                proc.terminate()
+            for proc in procs.values():
+                proc.join()
+            for callback in ForwardCallback._registry:
+                loop.run_until_complete(callback.stop())
+            shutdown_process_pool()
+
+    def _worker(self, feeds, connection):
+        """
+        Entry point of a worker process, runs its share of the feeds on a new event loop
+        """
+        ForwardCallback.attach(connection)
+        self.feeds = feeds
+        self.workers = None
+        self._install_loop_policy()
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        self.run()
+
+    def _watch(self, feed, replica: int, conn_id: str, websocket) -> list:
+        """
+        Register the connection, and for the primary connection the feed's channels, with the
+        liveness monitor. A timeout closes the websocket, so the connection is restarted
+        """
+        def restart(reason):
+            def on_silence(watch):
+                LOG.warning("%s: %s, restarting connection", conn_id, reason)
+                self.reconnect_reasons[conn_id][reason] += 1
+                asyncio.ensure_future(websocket.close())
+            return on_silence
+
+        watches = []
+        if self.timeout[conn_id] != -1:
+            self.watches[conn_id] = self.liveness.watch(conn_id, self.timeout[conn_id], lambda: self.messages[conn_id],
+                                                        restart('timeout'))
+            watches.append(self.watches[conn_id])
+        if not replica:
+            for data_type, timeout in self.channel_timeouts.get(feed.uuid, {}).items():
+                watches.append(self.liveness.watch(f"{conn_id} {data_type}", timeout,
+                                                   lambda data_type=data_type: feed.activity[data_type],
+                                                   restart(f"{data_type} timeout")))
+        return watches
 
     async def _rest_connect(self, feed):
         """
@@ -250,14 +518,21 @@ class FeedHandler:
         LOG.error("%s: failed to reconnect after %d retries - exiting", feed.id, retries)
         raise ExhaustedRetries()
 
-    async def _connect(self, feed):
+    async def _connect(self, feed, replica: int = 0):
         """
-        Connect to websocket feeds
+        Connect to websocket feeds. Redundant connections (replica > 0) share the feed's
+        state with the primary connection, their messages are handled one at a time
         """
+        conn_id = self._connection_id(feed, replica)
+        handler = feed.message_handler
+        lock = None
+        if feed.redundancy > 1:
+            lock = self.locks.setdefault(feed.uuid, asyncio.Lock())
+            handler = functools.partial(self._locked_handler, lock, feed.message_handler)
+
         retries = 0
         delay = 1
         while retries <= self.retries or self.retries == -1:
-            self.last_msg[feed.uuid] = None
             try:
                 # Coinbase frequently will not respond to pings within the ping interval, so
                 # disable the interval in favor of the internal watcher, which will
@@ -267,24 +542,39 @@ class FeedHandler:
                 # address can be None for binance futures when only open interest is configured
                 # because that data is collected over a periodic REST polling task
                 if feed.address is None:
-                    await feed.subscribe(None)
+                    if not replica:
+                        await feed.subscribe(None)
                     return
 
                 async with websockets.connect(feed.address, ping_interval=10, ping_timeout=None,
                                               max_size=2 ** 23, max_queue=2 ** 5, origin=feed.origin) as websocket:
-                    asyncio.ensure_future(self._watch(feed.uuid, websocket))
+                    watches = self._watch(feed, replica, conn_id, websocket)
                     # connection was successful, reset retry count and delay
                     retries = 0
                     delay = 1
-                    await feed.subscribe(websocket)
-                    await self._handler(websocket, feed.message_handler, feed.uuid)
+                    self.connects[conn_id] += 1
+                    try:
+                        if replica:
+                            await feed.subscribe_replica(websocket)
+                        elif lock:
+                            # the primary resets shared state, replicas wait until it has resubscribed
+                            async with lock:
+                                await feed.subscribe(websocket)
+                        else:
+                            await feed.subscribe(websocket)
+                        await self._handler(websocket, handler, conn_id, feed)
+                    finally:
+                        for watch in watches:
+                            watch.cancel()
             except (ConnectionClosed, ConnectionAbortedError, ConnectionResetError, socket_error) as e:
                 LOG.warning("%s: encountered connection issue %s - reconnecting...", feed.id, str(e), exc_info=True)
+                self.reconnect_reasons[conn_id][type(e).__name__] += 1
                 await asyncio.sleep(delay)
                 retries += 1
                 delay *= 2
-            except Exception:
+            except Exception as e:
                 LOG.error("%s: encountered an exception, reconnecting", feed.id, exc_info=True)
+                self.reconnect_reasons[conn_id][type(e).__name__] += 1
                 await asyncio.sleep(delay)
                 retries += 1
                 delay *= 2
@@ -292,33 +582,98 @@ class FeedHandler:
         LOG.error("%s: failed to reconnect after %d retries - exiting", feed.id, retries)
         raise ExhaustedRetries()
 
-    async def _handler(self, websocket, handler, feed_id):
+    @staticmethod
+    async def _locked_handler(lock, handler, message, timestamp):
+        async with lock:
+            await handler(message, timestamp)
+
+    def ingress_stats(self) -> dict:
+        """
+        Ingress queue counters (depth, high water mark, received, dropped, resyncs) by feed
+        """
+        return {feed_id: queue.stats() for feed_id, queue in self.ingress.items()}
+
+    @staticmethod
+    def _log_error_message(feed, feed_id, message):
+        if feed is not None and feed.inflater is not None and message is not None:
+            try:
+                message = feed.inflater.inflate(message)
+            except Exception:
+                # log the frame as received
+                pass
+        LOG.error("%s: error handling message %s", feed_id, message)
+
+    async def _queued_handler(self, websocket, handler, feed_id, feed=None):
+        """
+        Read the websocket into the feed's ingress queue while a separate task parses it
+        """
+        queue = self.ingress.get(feed_id)
+        if queue is None:
+            queue = self.ingress[feed_id] = IngressQueue(self.ingress_size, self.ingress_policy)
+        queue.reset()
+        parser = asyncio.ensure_future(self._parse(queue, handler, feed_id, feed))
+        try:
+            async for message in websocket:
+                timestamp = time()
+                self.messages[feed_id] += 1
+                if self.raw_message_capture:
+                    await self.raw_message_capture(message, timestamp, feed_id)
+                if not await queue.put(message, timestamp):
+                    if not parser.done():
+                        LOG.warning("%s: ingress queue overflow, dropped %d messages, restarting connection", feed_id, queue.dropped)
+                        self.reconnect_reasons[feed_id]['ingress overflow'] += 1
+                        await websocket.close()
+                    break
+        finally:
+            # let the parser drain what was read before the connection went away
+            queue.close()
+            await parser
+
+    async def _parse(self, queue, handler, feed_id, feed=None):
+        message = None
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                message, timestamp = item
+                await handler(message, timestamp)
+        except Exception:
+            queue.abort()
+            if self.log_messages_on_error:
+                self._log_error_message(feed, feed_id, message)
+            raise
+
+    async def _handler(self, websocket, handler, feed_id, feed=None):
+        if self.ingress_size and self.handler_enabled:
+            await self._queued_handler(websocket, handler, feed_id, feed)
+            return
+
         try:
             if self.raw_message_capture and self.handler_enabled:
                 async for message in websocket:
-                    self.last_msg[feed_id] = time()
-                    await self.raw_message_capture(message, self.last_msg[feed_id], feed_id)
-                    await handler(message, self.last_msg[feed_id])
+                    timestamp = time()
+                    self.messages[feed_id] += 1
+                    await self.raw_message_capture(message, timestamp, feed_id)
+                    await handler(message, timestamp)
             elif self.raw_message_capture:
                 async for message in websocket:
-                    self.last_msg[feed_id] = time()
-                    await self.raw_message_capture(message, self.last_msg[feed_id], feed_id)
+                    timestamp = time()
+                    self.messages[feed_id] += 1
+                    await self.raw_message_capture(message, timestamp, feed_id)
             else:
                 async for message in websocket:
-                    self.last_msg[feed_id] = time()
-                    await handler(message, self.last_msg[feed_id])
+                    timestamp = time()
+                    self.messages[feed_id] += 1
+                    await handler(message, timestamp)
         except Exception:
             if self.log_messages_on_error:
-                if feed_id in {HUOBI, HUOBI_DM}:
-                    message = zlib.decompress(message, 16 + zlib.MAX_WBITS)
-                elif feed_id in {OKCOIN, OKEX}:
-                    message = zlib.decompress(message, -15)
-                LOG.error("%s: error handling message %s", feed_id, message)
+                self._log_error_message(feed, feed_id, message)
             # exception will be logged with traceback when connection handler
             # retries the connection
             raise
 
-    def _do_bitmax_subscribe(self, feed, timeout: int, **kwargs):
+    def _bitmax_feeds(self, feed, **kwargs) -> list:
         """
         Bitmax is a special case, a separate websocket is needed for each symbol,
         and each connection receives all data for that symbol. We allow the user
@@ -327,6 +682,7 @@ class FeedHandler:
         """
         config = {}
         pairs = []
+        feeds = []
 
         # Need to handle the two configuration cases - Feed object and Feed Name with config dict
         if 'config' in kwargs:
@@ -347,10 +703,7 @@ class FeedHandler:
 
             for symbol, cbs in new_config.items():
                 cb = {cb: deepcopy(callbacks[cb]) for cb in cbs}
-                feed = Bitmax(pairs=[symbol], callbacks=cb, **kwargs)
-                self.feeds.append(feed)
-                self.last_msg[feed.uuid] = None
-                self.timeout[feed.uuid] = timeout
+                feeds.append(Bitmax(pairs=[symbol], callbacks=cb, **kwargs))
         else:
             if 'pairs' in kwargs:
                 pairs = kwargs.pop('pairs')
@@ -358,7 +711,5 @@ class FeedHandler:
                 pairs = feed.pairs
 
             for pair in pairs:
-                feed = Bitmax(pairs=[pair], callbacks=callbacks, **kwargs)
-                self.feeds.append(feed)
-                self.last_msg[feed.uuid] = None
-                self.timeout[feed.uuid] = timeout
+                feeds.append(Bitmax(pairs=[pair], callbacks=callbacks, **kwargs))
+        return feeds
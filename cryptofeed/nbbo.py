@@ -4,37 +4,45 @@ Copyright (C) 2017-2020  Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
-import asyncio
 from decimal import Decimal
 
-from cryptofeed.callback import Callback
-from cryptofeed.defines import BID, ASK
+from cryptofeed.callback import THREAD, Callback
 
 
 class NBBO(Callback):
-    def __init__(self, callback, pairs):
+    """
+    Subscribed to the TOP_OF_BOOK updates of each feed, which carry the best bid/ask
+    cached by the feed, so no book side is read or copied here
+    """
+    def __init__(self, callback, pairs, policy: str = THREAD):
         self.bids = {pair: {} for pair in pairs}
         self.asks = {pair: {} for pair in pairs}
 
         self.last_update = None
 
-        super(NBBO, self).__init__(callback)
+        super(NBBO, self).__init__(callback, policy=policy)
 
-    def _update(self, feed, pair, book):
-        bid = Decimal(list(book[BID].keys())[-1])
-        size = book[BID][bid]
-        self.bids[pair][feed] = {'price': bid, 'size': size}
-        ask = Decimal(list(book[ASK].keys())[0])
-        size = book[ASK][ask]
-        self.asks[pair][feed] = {'price': ask, 'size': size}
+    def _update(self, feed, pair, best_bid, best_bid_size, best_ask, best_ask_size):
+        if best_bid is None:
+            self.bids[pair].pop(feed, None)
+        else:
+            self.bids[pair][feed] = {'price': best_bid, 'size': best_bid_size}
+        if best_ask is None:
+            self.asks[pair].pop(feed, None)
+        else:
+            self.asks[pair][feed] = {'price': best_ask, 'size': best_ask_size}
+
+        if not self.bids[pair] or not self.asks[pair]:
+            return None, None, None, None
 
         min_ask = min(self.asks[pair], key=lambda x: self.asks[pair][x]['price'])
         max_bid = max(self.bids[pair], key=lambda x: self.bids[pair][x]['price'])
 
         return self.bids[pair][max_bid], self.asks[pair][min_ask], max_bid, min_ask
 
-    async def __call__(self, *, feed: str, pair: str, book: dict, timestamp: float, receipt_timestamp: float):
-        update = self._update(feed, pair, book)
+    async def __call__(self, *, feed: str, pair: str, best_bid: Decimal, best_bid_size: Decimal, best_ask: Decimal, best_ask_size: Decimal,
+                       timestamp: float, receipt_timestamp: float):
+        update = self._update(feed, pair, best_bid, best_bid_size, best_ask, best_ask_size)
 
         # only write updates when a best bid / best aks changes
         if self.last_update == update:
@@ -44,8 +52,4 @@ class NBBO(Callback):
         bid, ask, bid_feed, ask_feed = update
         if bid is None:
             return
-        if self.is_async:
-            await self.callback(pair, bid['price'], bid['size'], ask['price'], ask['size'], bid_feed, ask_feed)
-        else:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, self.callback, pair, bid['price'], bid['size'], ask['price'], ask['size'], bid_feed, ask_feed)
+        await super().__call__(pair, bid['price'], bid['size'], ask['price'], ask['size'], bid_feed, ask_feed)
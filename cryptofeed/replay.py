@@ -0,0 +1,287 @@
+'''
+Copyright (C) 2017-2020  Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+
+
+Replay of raw message captures through feeds
+'''
+import asyncio
+import heapq
+import logging
+import mmap
+import multiprocessing
+import os
+import pickle
+from collections import defaultdict
+from multiprocessing.connection import wait
+from operator import itemgetter
+from time import monotonic
+
+from cryptofeed.callback import Callback
+from cryptofeed.shard import ForwardCallback, shard_feeds
+from cryptofeed.util.capture import CaptureReader, is_capture
+
+
+LOG = logging.getLogger('feedhandler')
+
+
+class _NullWebsocket:
+    async def send(self, *args, **kwargs):
+        pass
+
+
+def _count_callbacks(feed, counts: defaultdict):
+    # only data types with a registered callback are counted, the feed's placeholders wrap None
+    registered = {data_type for data_type, callbacks in feed.callbacks.items()
+                  if any(not isinstance(cb, Callback) or cb.callback is not None for cb in callbacks)}
+    callback = feed.callback
+
+    async def counted(data_type, **kwargs):
+        if data_type in registered:
+            counts[data_type] += 1
+        await callback(data_type, **kwargs)
+    feed.callback = counted
+
+
+def exchange_id(conn_id: str) -> str:
+    """
+    Exchange id of a connection id (<exchange>-<uuid>, with a -N suffix for redundant connections)
+    """
+    return conn_id.split('-', 1)[0]
+
+
+def text_records(filename: str, start: float = None, end: float = None, zero_copy: bool = False):
+    """
+    (receipt timestamp, connection id, message) of a text capture (see AsyncFileCallback), which
+    are named <connection id>.<n>. The file is memory mapped and messages are bytes, or with
+    zero_copy memoryviews of the mapped file.
+    """
+    conn_id = os.path.basename(filename).rsplit('.', 1)[0]
+    with open(filename, 'rb') as fp:
+        if not os.fstat(fp.fileno()).st_size:
+            return
+        data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(data)
+    pos = 0
+    size = len(data)
+    while pos < size:
+        newline = data.find(b'\n', pos)
+        if newline == -1:
+            newline = size
+        colon = data.find(b':', pos, newline)
+        if colon != -1:
+            timestamp = float(data[pos:colon])
+            if (start is None or timestamp >= start) and (end is None or timestamp <= end):
+                # lines are "<timestamp>: <message>"
+                begin = colon + 2 if colon + 1 < newline and view[colon + 1] == 32 else colon + 1
+                stop = newline - 1 if newline > begin and view[newline - 1] == 13 else newline
+                yield timestamp, conn_id, view[begin:stop] if zero_copy else data[begin:stop]
+        pos = newline + 1
+
+
+def capture_records(filename: str, start: float = None, end: float = None, zero_copy: bool = False):
+    """
+    (receipt timestamp, connection id, message) of a binary capture (see cryptofeed.util.capture).
+    Messages are bytes, or with zero_copy memoryviews of the mapped file or decompressed block.
+    """
+    start = None if start is None else round(start * 1_000_000_000)
+    end = None if end is None else round(end * 1_000_000_000)
+    for timestamp, conn_id, message in CaptureReader(filename).records(start, end, raw=True):
+        yield timestamp / 1_000_000_000, conn_id, message if zero_copy else bytes(message)
+
+
+def records(filename: str, start: float = None, end: float = None, zero_copy: bool = False):
+    if is_capture(filename):
+        return capture_records(filename, start, end, zero_copy)
+    return text_records(filename, start, end, zero_copy)
+
+
+class Replay:
+    """
+    Replays captured messages through feeds' message handlers, so books are rebuilt and callbacks
+    (and backends) run as they did live. Captures can be text (AsyncFileCallback) or binary
+    (cryptofeed.util.capture.CaptureWriter) files, their messages are interleaved by receipt
+    timestamp, and each is handed to the feed of the exchange that received it.
+
+    Capture files are memory mapped and messages are handed to the feeds as bytes, not decoded
+    to str, or with zero_copy as memoryviews of the mapped files.
+
+    Feeds are subscribed with a dummy websocket before the replay starts, and stopped after.
+    """
+    def __init__(self, feeds, captures, speed: float = None, workers: int = None, start: float = None,
+                 end: float = None, route=None, zero_copy: bool = False):
+        """
+        feeds: Feed or list of Feeds
+            at most one feed per exchange
+        captures: str or list of str
+            capture file names
+        speed: float
+            None replays as fast as possible, 1 at the pace messages were received, other values
+            scale that pace (2 is twice as fast)
+        workers: int
+            if greater than 1, replay in this many worker processes, with the feeds spread over them
+            by estimated message rate (see cryptofeed.shard). Every worker reads the captures and
+            replays its feeds' messages. Callbacks run in the workers, unless wrapped in a ForwardCallback.
+            Requires the fork start method (Linux/macOS).
+        start, end: float
+            only replay messages received in this time window (timestamps in seconds)
+        route: function
+            maps the connection id a message was captured from to a feed id, defaults to the exchange id
+        zero_copy: bool
+            hand messages to the feeds as memoryviews, without copying them out of the capture files.
+            Requires feeds that decode with orjson (see cryptofeed.feed.Decoder) or that receive compressed messages.
+        """
+        self.feeds = feeds if isinstance(feeds, list) else [feeds]
+        if len({feed.id for feed in self.feeds}) != len(self.feeds):
+            raise ValueError("Replay takes at most one feed per exchange")
+        self.captures = captures if isinstance(captures, list) else [captures]
+        if speed is not None and speed <= 0:
+            raise ValueError("Replay speed must be positive")
+        self.speed = speed
+        self.workers = workers
+        self.start = start
+        self.end = end
+        self.route = route or exchange_id
+        if zero_copy:
+            for feed in self.feeds:
+                if feed.inflater is None and feed.decoder.parser != 'orjson':
+                    raise ValueError(f"{feed.id}: zero_copy replays require the orjson parser")
+        self.zero_copy = zero_copy
+
+    def run(self) -> dict:
+        """
+        Replay the captures and return stats: messages replayed, messages without a feed (unrouted),
+        elapsed seconds, messages per second, and callback counts by data type, in total and by feed
+        """
+        if self.workers and self.workers > 1:
+            return self._run_workers()
+        loop = asyncio.get_event_loop()
+        return loop.run_until_complete(self.replay())
+
+    async def replay(self, feeds: list = None) -> dict:
+        """
+        Replay the captures' messages of `feeds` (defaults to all the feeds) on the running loop
+        """
+        feeds = self.feeds if feeds is None else feeds
+        routed = {feed.id: feed for feed in feeds}
+        known = {feed.id for feed in self.feeds}
+        callbacks = {}
+        for feed in feeds:
+            callbacks[feed.id] = defaultdict(int)
+            _count_callbacks(feed, callbacks[feed.id])
+            await feed.subscribe(_NullWebsocket())
+
+        messages = defaultdict(int)
+        unrouted = 0
+        sources = [records(filename, self.start, self.end, self.zero_copy) for filename in self.captures]
+        started = monotonic()
+        first = None
+        for timestamp, conn_id, message in heapq.merge(*sources, key=itemgetter(0)):
+            feed_id = self.route(conn_id)
+            feed = routed.get(feed_id)
+            if feed is None:
+                if feed_id not in known:
+                    unrouted += 1
+                continue
+            if self.speed:
+                if first is None:
+                    first = timestamp
+                delay = started + (timestamp - first) / self.speed - monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await feed.message_handler(message, timestamp)
+            messages[feed.id] += 1
+
+        for feed in feeds:
+            await feed.stop()
+        return self._stats({feed.id: {'messages': messages[feed.id], 'callbacks': dict(callbacks[feed.id])} for feed in feeds},
+                           unrouted, monotonic() - started)
+
+    @staticmethod
+    def _stats(by_feed: dict, unrouted: int, elapsed: float) -> dict:
+        callbacks = defaultdict(int)
+        for stats in by_feed.values():
+            for data_type, count in stats['callbacks'].items():
+                callbacks[data_type] += count
+        total = sum(stats['messages'] for stats in by_feed.values())
+        return {
+            'messages': total,
+            'unrouted': unrouted,
+            'elapsed': elapsed,
+            'messages_per_second': total / elapsed if elapsed else 0.0,
+            'callbacks': dict(callbacks),
+            'feeds': by_feed
+        }
+
+    def _run_workers(self) -> dict:
+        try:
+            ctx = multiprocessing.get_context('fork')
+        except ValueError:
+            raise ValueError("workers requires the fork start method")
+
+        loop = asyncio.get_event_loop()
+        started = monotonic()
+        procs = []
+        forwarded = []
+        results = {}
+        for index, shard in enumerate(shard_feeds(self.feeds, self.workers)):
+            forward_reader, forward_writer = ctx.Pipe(duplex=False)
+            result_reader, result_writer = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=self._worker, args=(shard, forward_writer, result_writer), name=f'cryptofeed-replay-{index}', daemon=True)
+            proc.start()
+            forward_writer.close()
+            result_writer.close()
+            procs.append(proc)
+            forwarded.append(forward_reader)
+            results[result_reader] = None
+
+        try:
+            readers = forwarded + list(results)
+            while readers:
+                for reader in wait(readers):
+                    try:
+                        data = reader.recv_bytes()
+                    except EOFError:
+                        readers.remove(reader)
+                        continue
+                    if reader in results:
+                        results[reader] = pickle.loads(data)
+                    else:
+                        loop.run_until_complete(ForwardCallback.dispatch(data))
+        finally:
+            for proc in procs:
+                proc.join()
+            for reader in forwarded + list(results):
+                reader.close()
+            for callback in ForwardCallback._registry:
+                loop.run_until_complete(callback.stop())
+
+        by_feed = {}
+        unrouted = 0
+        for index, (stats, proc) in enumerate(zip(results.values(), procs)):
+            if stats is None:
+                raise RuntimeError(f"Replay worker {index} exited with code {proc.exitcode}")
+            by_feed.update(stats['feeds'])
+            # every worker sees the unrouted messages
+            unrouted = stats['unrouted']
+        return self._stats(by_feed, unrouted, monotonic() - started)
+
+    def _worker(self, feeds, forward, result):
+        """
+        Entry point of a replay worker process
+        """
+        ForwardCallback.attach(forward)
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            stats = loop.run_until_complete(self.replay(feeds))
+            for callback in ForwardCallback._registry:
+                loop.run_until_complete(callback.stop())
+            result.send_bytes(pickle.dumps(stats, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            LOG.error("Replay worker: unhandled exception", exc_info=True)
+        finally:
+            forward.close()
+            result.close()
@@ -0,0 +1,137 @@
+'''
+Copyright (C) 2017-2020  Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+
+
+Helpers for running a FeedHandler's feeds in several worker processes
+'''
+import asyncio
+from collections.abc import Mapping
+import heapq
+import inspect
+import pickle
+
+from cryptofeed.callback import THREAD, Callback
+from cryptofeed.defines import BOOK_DELTA, BOOK_TICKER, L2_BOOK, L3_BOOK, TICKER, TOP_OF_BOOK, TRADES
+from cryptofeed.standards import _feed_to_exchange_map
+
+
+# relative message rate of a single pair subscription, by data type
+_RATE_WEIGHTS = {
+    L3_BOOK: 20,
+    L2_BOOK: 10,
+    BOOK_DELTA: 10,
+    TOP_OF_BOOK: 10,
+    BOOK_TICKER: 5,
+    TRADES: 4,
+    TICKER: 2
+}
+
+
+def stream_rate(feed_id: str, channel: str) -> int:
+    """
+    Rough relative message rate of one pair's subscription to an exchange channel
+    """
+    for std, exchanges in _feed_to_exchange_map.items():
+        if exchanges.get(feed_id) == channel:
+            return _RATE_WEIGHTS.get(std, 1)
+    return 1
+
+
+def estimate_rate(feed) -> int:
+    """
+    Rough relative message rate of a feed, from the channels and number of pairs it subscribes to
+    """
+    if feed.config:
+        subscriptions = [(channel, len(pairs)) for channel, pairs in feed.config.items()]
+    else:
+        subscriptions = [(channel, len(feed.pairs)) for channel in feed.channels]
+    return sum(stream_rate(feed.id, channel) * max(pairs, 1) for channel, pairs in subscriptions) or 1
+
+
+def shard_feeds(feeds: list, workers: int) -> list:
+    """
+    Spread feeds over `workers` shards, balancing the estimated message rate. Feeds
+    are placed heaviest first on the least loaded shard. Returns a list of feed lists,
+    empty shards are dropped
+    """
+    shards = [(0, index, []) for index in range(workers)]
+    for feed in sorted(feeds, key=estimate_rate, reverse=True):
+        load, index, assigned = heapq.heappop(shards)
+        assigned.append(feed)
+        heapq.heappush(shards, (load + estimate_rate(feed), index, assigned))
+    return [assigned for _, _, assigned in sorted(shards, key=lambda shard: shard[1]) if assigned]
+
+
+def _plain_book(book) -> dict:
+    ret = {}
+    for side, levels in book.items():
+        ret[side] = {price: dict(level) if isinstance(level, Mapping) else level for price, level in levels.items()}
+    return ret
+
+
+class ForwardCallback(Callback):
+    """
+    Runs the wrapped callback in the parent process when the FeedHandler runs with
+    workers. In a worker, calls are pickled in batches (one write per event loop
+    iteration) onto the worker's pipe. Without workers the callback is invoked directly.
+
+    Forwarded callbacks must be created before FeedHandler.run, and their arguments
+    must be picklable (books are sent as plain dicts).
+    """
+    _registry = []
+    _connection = None
+    _pending = []
+
+    def __init__(self, callback, policy: str = THREAD):
+        self.index = len(ForwardCallback._registry)
+        ForwardCallback._registry.append(self)
+        super().__init__(callback, policy=policy)
+        # Callback subclasses (eg TradeCallback) are coroutines
+        self.is_async = self.is_async or inspect.iscoroutinefunction(getattr(callback, '__call__', None))
+
+    async def __call__(self, *args, **kwargs):
+        if ForwardCallback._connection is None:
+            await self.run(args, kwargs)
+            return
+        if 'book' in kwargs:
+            kwargs['book'] = _plain_book(kwargs['book'])
+        if not ForwardCallback._pending:
+            asyncio.get_event_loop().call_soon(ForwardCallback._flush)
+        ForwardCallback._pending.append((self.index, args, kwargs))
+
+    async def run(self, args, kwargs):
+        # run under the callback's execution policy, and counted in its stats
+        await super().__call__(*args, **kwargs)
+
+    async def stop(self):
+        if ForwardCallback._connection is not None:
+            ForwardCallback._flush()
+            return
+        await super().stop()
+        if hasattr(self.callback, 'stop'):
+            await self.callback.stop()
+
+    @classmethod
+    def _flush(cls):
+        batch, cls._pending = cls._pending, []
+        if batch:
+            cls._connection.send_bytes(pickle.dumps(batch, protocol=pickle.HIGHEST_PROTOCOL))
+
+    @classmethod
+    def attach(cls, connection):
+        """
+        Called in a worker process, forward calls over `connection`
+        """
+        cls._connection = connection
+        cls._pending = []
+
+    @classmethod
+    async def dispatch(cls, data: bytes):
+        """
+        Called in the parent process with a batch received from a worker
+        """
+        for index, args, kwargs in pickle.loads(data):
+            await cls._registry[index].run(args, kwargs)
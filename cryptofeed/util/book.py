@@ -5,46 +5,706 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 
 
-A set of helper functions for regulating book depth
+A set of helper functions for regulating book depth, and
+an array backed, fixed point implementation of a book side
 '''
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping, MutableMapping
+from decimal import Decimal
+import weakref
+
 from sortedcontainers import SortedDict as sd
 
 from cryptofeed.defines import BID, ASK, L2_BOOK
 
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def normalize_tick_size(tick_size) -> Decimal:
+    """
+    Convert an exchange supplied tick size (str, float or Decimal) to a Decimal
+    without trailing zeros, so prices rebuilt from ticks format cleanly
+    """
+    tick = Decimal(str(tick_size))
+    if tick <= 0:
+        raise ValueError(f"Invalid tick size {tick_size}")
+    if tick == tick.to_integral_value():
+        return tick.quantize(Decimal(1))
+    return tick.normalize()
+
+
+class _BookSideView:
+    """
+    Indexable, sliceable and reversible view over a BookSide, mirroring
+    the parts of the SortedDict views API used across cryptofeed
+    (eg. book[BID].keys()[-1])
+    """
+    __slots__ = ('_side',)
+
+    def __init__(self, side):
+        self._side = side
+
+    def __len__(self):
+        return len(self._side._ticks)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._get(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("book side index out of range")
+        return self._get(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._get(i)
+
+    def __reversed__(self):
+        for i in range(len(self) - 1, -1, -1):
+            yield self._get(i)
+
+    def _get(self, index):
+        raise NotImplementedError
+
+
+class _BookSideKeys(_BookSideView):
+    __slots__ = ()
+
+    def _get(self, index):
+        return self._side.to_price(self._side._ticks[index])
+
+    def __contains__(self, price):
+        return price in self._side
+
+
+class _BookSideValues(_BookSideView):
+    __slots__ = ()
+
+    def _get(self, index):
+        return self._side._sizes[index]
+
+
+class _BookSideItems(_BookSideView):
+    __slots__ = ()
+
+    def _get(self, index):
+        return self._side.to_price(self._side._ticks[index]), self._side._sizes[index]
+
+
+class _BookSideBase(Mapping):
+    """
+    Read only operations shared by BookSide and BookSideSnapshot. Prices are stored
+    as integer multiples of the tick size in a sorted array, sizes in a parallel list.
+
+    The tick size is held as step / scale, with scale a power of 10, so prices of
+    either numeric type convert to ticks with integer arithmetic.
+    """
+    __slots__ = ('tick_size', 'numeric', '_scale', '_step', '_ticks', '_sizes')
+
+    def _set_tick_size(self, tick_size, numeric):
+        self.tick_size = normalize_tick_size(tick_size)
+        self.numeric = numeric
+        exponent = self.tick_size.as_tuple().exponent
+        self._scale = 10 ** -exponent if exponent < 0 else 1
+        self._step = int(self.tick_size * self._scale)
+
+    def to_ticks(self, price) -> int:
+        """
+        Convert a price (Decimal, float, int or str) to an integer number of ticks.
+        Raises ValueError if the price is not a multiple of the tick size
+        """
+        if isinstance(price, float):
+            scaled = price * self._scale
+            units = round(scaled)
+            # tolerate float representation error, but not prices off the tick grid
+            if abs(scaled - units) > 1e-6 + 1e-9 * abs(scaled):
+                raise ValueError(f"Price {price} is not a multiple of tick size {self.tick_size}")
+        elif isinstance(price, int):
+            units = price * self._scale
+        else:
+            if not isinstance(price, Decimal):
+                price = Decimal(price)
+            scaled = price * self._scale
+            units = int(scaled)
+            if units != scaled:
+                raise ValueError(f"Price {price} is not a multiple of tick size {self.tick_size}")
+        ticks, remainder = divmod(units, self._step)
+        if remainder:
+            raise ValueError(f"Price {price} is not a multiple of tick size {self.tick_size}")
+        return ticks
+
+    def to_price(self, ticks: int):
+        """
+        Convert ticks to a price of the side's numeric type (Decimal or float)
+        """
+        if self.numeric is float:
+            return ticks * self._step / self._scale
+        return self.tick_size * ticks
+
+    def _find(self, ticks: int) -> int:
+        index = bisect_left(self._ticks, ticks)
+        if index < len(self._ticks) and self._ticks[index] == ticks:
+            return index
+        return -1
+
+    def get_ticks(self, ticks: int, default=None):
+        index = self._find(ticks)
+        return default if index < 0 else self._sizes[index]
+
+    def __getitem__(self, price):
+        index = self._find(self.to_ticks(price))
+        if index < 0:
+            raise KeyError(price)
+        return self._sizes[index]
+
+    def __contains__(self, price):
+        try:
+            return self._find(self.to_ticks(price)) >= 0
+        except (ValueError, TypeError, ArithmeticError):
+            return False
+
+    def __len__(self):
+        return len(self._ticks)
+
+    def __iter__(self):
+        to_price = self.to_price
+        for ticks in self._ticks:
+            yield to_price(ticks)
+
+    def __reversed__(self):
+        to_price = self.to_price
+        for index in range(len(self._ticks) - 1, -1, -1):
+            yield to_price(self._ticks[index])
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.tick_size}, {dict(self.items())})"
+
+    def keys(self):
+        return _BookSideKeys(self)
+
+    def values(self):
+        return _BookSideValues(self)
+
+    def items(self):
+        return _BookSideItems(self)
+
+    def peekitem(self, index=-1):
+        return self.items()[index]
+
+    def bisect_left(self, price) -> int:
+        return bisect_left(self._ticks, self.to_ticks(price))
+
+    def bisect_right(self, price) -> int:
+        return bisect_right(self._ticks, self.to_ticks(price))
+
+    def index(self, price) -> int:
+        index = self._find(self.to_ticks(price))
+        if index < 0:
+            raise ValueError(f"{price} is not in book side")
+        return index
+
+
+class BookSideSnapshot(_BookSideBase):
+    """
+    Read only view of a BookSide at a given version. It shares storage with the
+    BookSide it was taken from, the BookSide copies its storage before the next
+    mutation only if the snapshot is still referenced.
+    """
+    __slots__ = ('version', '__weakref__')
+
+    def __init__(self, side: 'BookSide'):
+        self.tick_size = side.tick_size
+        self.numeric = side.numeric
+        self._scale = side._scale
+        self._step = side._step
+        self._ticks = side._ticks
+        self._sizes = side._sizes
+        self.version = side.version
+
+
+class BookSide(_BookSideBase, MutableMapping):
+    """
+    One side of an L2 book, keyed by price.
+
+    Prices are stored as integer multiples of the pair's tick size in a contiguous
+    array, sorted ascending, with sizes held in a parallel list. Lookups are O(log n),
+    and inserts/deletes are a single memmove in the underlying array. Keys are handed
+    back as Decimals, so the object can be used anywhere a SortedDict book side is
+    used today (iteration order, keys()[index], peekitem, reversed, etc).
+
+    numeric selects the type prices are handed back as, Decimal or float.
+    """
+    __slots__ = ('version', '_snapshot')
+
+    def __init__(self, tick_size, *args, numeric=Decimal, **kwargs):
+        self._set_tick_size(tick_size, numeric)
+        self._ticks = array('q')
+        self._sizes = []
+        self.version = 0
+        self._snapshot = None
+        if args or kwargs:
+            self.update(*args, **kwargs)
+
+    def _modify(self):
+        self.version += 1
+        if self._snapshot is not None:
+            # copy on write, only needed if a snapshot of the current storage is still alive
+            if self._snapshot() is not None:
+                self._ticks = array('q', self._ticks)
+                self._sizes = list(self._sizes)
+            self._snapshot = None
+
+    def snapshot(self) -> BookSideSnapshot:
+        """
+        Return a read only snapshot of the side. This does not copy the levels
+        """
+        snap = self._snapshot() if self._snapshot is not None else None
+        if snap is None:
+            snap = BookSideSnapshot(self)
+            self._snapshot = weakref.ref(snap)
+        return snap
+
+    def set_ticks(self, ticks: int, size):
+        self._modify()
+        index = bisect_left(self._ticks, ticks)
+        if index < len(self._ticks) and self._ticks[index] == ticks:
+            self._sizes[index] = size
+        else:
+            self._ticks.insert(index, ticks)
+            self._sizes.insert(index, size)
+
+    def del_ticks(self, ticks: int) -> bool:
+        """
+        Remove the level at `ticks`, returns False if the level did not exist
+        """
+        index = self._find(ticks)
+        if index < 0:
+            return False
+        self._modify()
+        del self._ticks[index]
+        del self._sizes[index]
+        return True
+
+    def __setitem__(self, price, size):
+        self.set_ticks(self.to_ticks(price), size)
+
+    def __delitem__(self, price):
+        if not self.del_ticks(self.to_ticks(price)):
+            raise KeyError(price)
+
+    def clear(self):
+        self.version += 1
+        self._snapshot = None
+        self._ticks = array('q')
+        self._sizes = []
+
+    def load(self, prices: list, sizes: list):
+        """
+        Replace all levels of the side in one pass. prices are str or of the side's
+        numeric type, sizes are already converted. Ticks are computed up front
+        (vectorized with NumPy for float sides, when available) and sorted once,
+        rather than inserting level by level. Later duplicates of a price win.
+        """
+        if np is not None and self.numeric is float and prices:
+            scaled = np.asarray(prices, dtype=float) * self._scale
+            units = np.rint(scaled)
+            if (np.abs(scaled - units) > 1e-6 + 1e-9 * np.abs(scaled)).any():
+                raise ValueError(f"Snapshot contains prices that are not multiples of tick size {self.tick_size}")
+            ticks, remainders = np.divmod(units.astype(np.int64), self._step)
+            if remainders.any():
+                raise ValueError(f"Snapshot contains prices that are not multiples of tick size {self.tick_size}")
+            ticks = ticks.tolist()
+        else:
+            ticks = map(self.to_ticks, prices)
+
+        levels = dict(zip(ticks, sizes))
+        keys = sorted(levels)
+        # new storage, so any live snapshot keeps the old levels
+        self.version += 1
+        self._snapshot = None
+        self._ticks = array('q', keys)
+        self._sizes = [levels[key] for key in keys]
+
+    def prune(self, retain: int, ask: bool, bound=None):
+        """
+        See prune_levels
+        """
+        ticks = self._ticks
+        if ask:
+            cut = min(retain, len(ticks))
+            if bound is not None:
+                cut = min(cut, bisect_left(ticks, self.to_ticks(bound)))
+            if cut == len(ticks):
+                return bound
+            self._modify()
+            dropped = self.to_price(self._ticks[cut])
+            bound = dropped if bound is None else min(bound, dropped)
+            del self._ticks[cut:]
+            del self._sizes[cut:]
+        else:
+            cut = max(len(ticks) - retain, 0)
+            if bound is not None:
+                cut = max(cut, bisect_right(ticks, self.to_ticks(bound)))
+            if cut == 0:
+                return bound
+            self._modify()
+            dropped = self.to_price(self._ticks[cut - 1])
+            bound = dropped if bound is None else max(bound, dropped)
+            del self._ticks[:cut]
+            del self._sizes[:cut]
+        return bound
+
+    def copy(self):
+        ret = BookSide(self.tick_size, numeric=self.numeric)
+        ret._ticks = array('q', self._ticks)
+        ret._sizes = list(self._sizes)
+        return ret
+
+    __copy__ = copy
+
+
+class BookSnapshot(Mapping):
+    """
+    Read only, versioned snapshot of an L2 book built from BookSides. Callbacks can
+    hold on to it safely, and levels are only materialized when they are read.
+    """
+    __slots__ = ('version', '_sides')
+
+    def __init__(self, book: dict, version: int):
+        self.version = version
+        self._sides = {BID: book[BID].snapshot(), ASK: book[ASK].snapshot()}
+
+    def __getitem__(self, side):
+        return self._sides[side]
+
+    def __iter__(self):
+        return iter(self._sides)
+
+    def __len__(self):
+        return len(self._sides)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(version={self.version}, {self._sides})"
+
+
+def book_snapshot(book: dict, version: int):
+    """
+    Return a read only BookSnapshot of the book if its sides support snapshots,
+    otherwise the book itself
+    """
+    if isinstance(book.get(BID), BookSide) and isinstance(book.get(ASK), BookSide):
+        return BookSnapshot(book, version)
+    return book
+
+
+def new_book(tick_size=None, numeric=Decimal) -> dict:
+    """
+    Return an empty L2 book. If a tick size is provided the array backed
+    BookSide is used for each side, otherwise a SortedDict
+    """
+    if tick_size is None:
+        return {BID: sd(), ASK: sd()}
+    return {BID: BookSide(tick_size, numeric=numeric), ASK: BookSide(tick_size, numeric=numeric)}
+
+
+def load_levels(side, levels: list, numeric=Decimal, price=0, size=1):
+    """
+    Bulk load a REST or websocket snapshot into a book side (SortedDict or BookSide),
+    replacing its contents. Sorting happens once for the whole snapshot instead of
+    once per inserted level.
+
+    levels: list
+        the exchange's levels, eg [[price, size], ...] as strings
+    numeric: type
+        numeric type to convert prices and sizes to
+    price, size: int
+        index of the price and size in each level
+    """
+    prices = [level[price] for level in levels]
+    sizes = [level[size] for level in levels]
+    if np is not None and numeric is float and sizes:
+        sizes = np.asarray(sizes, dtype=float).tolist()
+    else:
+        sizes = list(map(numeric, sizes))
+
+    if isinstance(side, BookSide):
+        side.load(prices, sizes)
+    else:
+        side.clear()
+        # SortedDict.update on an empty dict sorts the keys once
+        side.update(zip(map(numeric, prices), sizes))
+
+
+def prune_levels(side, retain: int, ask: bool, bound=None):
+    """
+    Drop the levels of a book side (SortedDict or BookSide) that are more than `retain`
+    levels from the touch, and any level at or beyond `bound`, the price returned by an
+    earlier prune. The side is complete for prices better than the returned bound.
+
+    Returns the best dropped price (or `bound` if it is better), or `bound` if nothing
+    was dropped
+    """
+    if isinstance(side, BookSide):
+        return side.prune(retain, ask, bound)
+
+    if ask:
+        cut = min(retain, len(side))
+        if bound is not None:
+            cut = min(cut, side.bisect_left(bound))
+        drop = len(side) - cut
+    else:
+        cut = max(len(side) - retain, 0)
+        if bound is not None:
+            cut = max(cut, side.bisect_right(bound))
+        drop = cut
+    if drop == 0:
+        return bound
+    dropped = side.peekitem(cut if ask else cut - 1)[0]
+    if bound is not None:
+        dropped = min(bound, dropped) if ask else max(bound, dropped)
+    for _ in range(drop):
+        side.popitem(-1 if ask else 0)
+    return dropped
+
+
 def depth(book: dict, depth: int, book_type=L2_BOOK) -> dict:
     """
     Take a book and return a new dict with max `depth` levels per side
     """
     ret = {BID: sd(), ASK: sd()}
     for side in (BID, ASK):
-        prices = list(book[side].keys())[:depth] if side == ASK else list(book[side].keys())[-depth:]
+        # slicing the keys view only materializes the levels we keep
+        prices = book[side].keys()[:depth] if side == ASK else book[side].keys()[-depth:]
         if book_type == L2_BOOK:
             for price in prices:
                 ret[side][price] = book[side][price]
         else:
             for price in prices:
-                ret[side][price] = {order_id: size for order_id, size in ret[side][price].items()}
+                ret[side][price] = {order_id: size for order_id, size in book[side][price].items()}
 
     return ret
 
 
+class TopOfBook:
+    """
+    Cached best bid and ask (price and size) of an L2 book.
+
+    update() only reads the book when a delta touches a price at or better than
+    the cached best, and reading the best level of a SortedDict or BookSide is O(1).
+    """
+    __slots__ = ('bid', 'bid_size', 'ask', 'ask_size')
+
+    def __init__(self):
+        self.bid = self.bid_size = self.ask = self.ask_size = None
+
+    @staticmethod
+    def _best(book: dict, side: str) -> tuple:
+        levels = book[side]
+        if not levels:
+            return None, None
+        return levels.peekitem(-1 if side == BID else 0)
+
+    def reset(self, book: dict) -> bool:
+        """
+        Read the best bid and ask from the book, returns True if either changed
+        """
+        bid = self._best(book, BID)
+        ask = self._best(book, ASK)
+        changed = bid != (self.bid, self.bid_size) or ask != (self.ask, self.ask_size)
+        self.bid, self.bid_size = bid
+        self.ask, self.ask_size = ask
+        return changed
+
+    def update(self, book: dict, delta: dict) -> bool:
+        """
+        book: the full book, with delta already applied
+        delta: the exchange delta, {BID: [(price, size), ...], ASK: [...]}
+
+        Returns True if the best bid or ask changed
+        """
+        changed = False
+        for price, _ in delta[BID]:
+            if self.bid is None or price >= self.bid:
+                bid = self._best(book, BID)
+                if bid != (self.bid, self.bid_size):
+                    self.bid, self.bid_size = bid
+                    changed = True
+                break
+        for price, _ in delta[ASK]:
+            if self.ask is None or price <= self.ask:
+                ask = self._best(book, ASK)
+                if ask != (self.ask, self.ask_size):
+                    self.ask, self.ask_size = ask
+                    changed = True
+                break
+        return changed
+
+
+class DepthView:
+    """
+    The top `max_depth` levels of a book, maintained in place from the deltas
+    an exchange applies to the full book.
+
+    update() costs O(changes) rather than O(book size) and returns the exact
+    levels of the view that changed, in book delta format. It relies on seeing every
+    delta applied to the full book; after a snapshot/reset (or any skipped delta)
+    call reset() to rebuild the view from the full book.
+
+    As the view is changed in place, hand out levels() rather than the view's book.
+    """
+    def __init__(self, max_depth: int):
+        self.max_depth = max_depth
+        self.book = {BID: sd(), ASK: sd()}
+
+    def levels(self) -> dict:
+        """
+        A copy of the view's levels (O(max_depth)), unaffected by later updates
+        """
+        return {BID: self.book[BID].copy(), ASK: self.book[ASK].copy()}
+
+    def reset(self, book: dict, book_type=L2_BOOK) -> dict:
+        """
+        Rebuild the view from the full book, returns the delta against the previous view.
+        L3 views hold copies of the levels, as L3 levels are updated in place
+        """
+        ret = depth(book, self.max_depth, book_type)
+        delta = book_delta(self.book, ret)
+        self.book = ret
+        return delta
+
+    def update(self, book: dict, delta: dict) -> dict:
+        """
+        book: the full book, with delta already applied
+        delta: the exchange delta, {BID: [(price, size), ...], ASK: [...]}, size 0 for removed levels
+        """
+        ret = {BID: [], ASK: []}
+        for side in (BID, ASK):
+            if not delta[side]:
+                continue
+            full = book[side]
+            view = self.book[side]
+            ask = side == ASK
+            target = min(self.max_depth, len(full))
+            # worst visible price in the full book, and in the view before this update
+            bound = None
+            if len(full) > self.max_depth:
+                bound = full.keys()[self.max_depth - 1] if ask else full.keys()[-self.max_depth]
+            old_bound = None
+            if view:
+                old_bound = view.keys()[-1] if ask else view.keys()[0]
+
+            before = {}
+            for price, size in delta[side]:
+                visible = size != 0 and (bound is None or (price <= bound if ask else price >= bound))
+                if visible:
+                    if price not in before:
+                        before[price] = view.get(price, 0)
+                    view[price] = size
+                elif price in view:
+                    if price not in before:
+                        before[price] = view[price]
+                    del view[price]
+
+            # levels pushed out of the view by inserts
+            while len(view) > target:
+                price, size = view.popitem(-1 if ask else 0)
+                if price not in before:
+                    before[price] = size
+            # levels pulled into the view by deletes. Any level missing from the view
+            # is unchanged and lies beyond the previous worst visible level
+            if len(view) < target:
+                if ask:
+                    start = full.bisect_right(old_bound) if old_bound is not None else 0
+                    indices = range(start, target)
+                else:
+                    start = len(full) - full.bisect_left(old_bound) if old_bound is not None else 0
+                    indices = range(len(full) - 1 - start, len(full) - 1 - target, -1)
+                for index in indices:
+                    if len(view) == target:
+                        break
+                    price, size = full.peekitem(index)
+                    if price not in view:
+                        if price not in before:
+                            before[price] = 0
+                        view[price] = size
+
+            for price, size in before.items():
+                current = view.get(price, 0)
+                if current != size:
+                    ret[side].append((price, current))
+        return ret
+
+
 def book_delta(former: dict, latter: dict, book_type=L2_BOOK) -> list:
     ret = {BID: [], ASK: []}
     if book_type == L2_BOOK:
         for side in (BID, ASK):
-            fkeys = set(list(former[side].keys()))
-            lkeys = set(list(latter[side].keys()))
-            for price in fkeys - lkeys:
-                ret[side].append((price, 0))
+            fside, lside = former[side], latter[side]
+            for price in fside:
+                if price not in lside:
+                    ret[side].append((price, 0))
 
-            for price in lkeys - fkeys:
-                ret[side].append((price, latter[side][price]))
-
-            for price in lkeys.intersection(fkeys):
-                if former[side][price] != latter[side][price]:
-                    ret[side].append((price, latter[side][price]))
+            for price, size in lside.items():
+                if price not in fside or fside[price] != size:
+                    ret[side].append((price, size))
     else:
         raise ValueError("Not supported for L3 Books")
 
     return ret
+
+
+class DeltaTracker:
+    """
+    Records the levels touched while an exchange handler mutates an L2 book, so
+    the BOOK_DELTA payload can be produced in O(levels touched) instead of
+    diffing the previous and current book with book_delta()
+    """
+    def __init__(self, book: dict):
+        self.book = book
+        # price -> size before the first change since the last delta()
+        self.touched = {BID: {}, ASK: {}}
+
+    def set(self, side: str, price, size):
+        """
+        Set a level, a size of 0 removes it
+        """
+        levels = self.book[side]
+        touched = self.touched[side]
+        if price not in touched:
+            touched[price] = levels.get(price, 0)
+        if size == 0:
+            if price in levels:
+                del levels[price]
+        else:
+            levels[price] = size
+
+    def replace(self, side: str, levels: dict):
+        """
+        Replace an entire side, for exchanges that send full books
+        """
+        current = self.book[side]
+        for price in [price for price in current if price not in levels]:
+            self.set(side, price, 0)
+        for price, size in levels.items():
+            if current.get(price) != size:
+                self.set(side, price, size)
+
+    def delta(self) -> dict:
+        """
+        Return the changes since the last call, in book delta format, and reset the tracker
+        """
+        ret = {BID: [], ASK: []}
+        for side in (BID, ASK):
+            levels = self.book[side]
+            for price, size in self.touched[side].items():
+                current = levels.get(price, 0)
+                if current != size:
+                    ret[side].append((price, current))
+            self.touched[side] = {}
+        return ret
@@ -0,0 +1,334 @@
+'''
+Copyright (C) 2017-2020  Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+
+
+Binary raw message capture files, see CaptureWriter and CaptureReader
+
+A capture file is an 8 byte header (magic, format version, codec) followed by blocks.
+Each block is a header (compressed size, number of records, lowest and highest receipt
+timestamp) and the block's records, compressed. A record is a header (receipt timestamp
+in nanoseconds, flags, feed id length, message length), the feed id and the message.
+
+Every block also gets an entry in a sidecar index file (the capture file name + '.idx'):
+lowest and highest timestamp, file offset and number of records, so a reader can go to a
+timestamp by decompressing only the blocks that follow it. The index is rebuilt from the
+block headers if it is missing or incomplete.
+'''
+import asyncio
+import atexit
+import logging
+import mmap
+import os
+import struct
+import zlib
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+LOG = logging.getLogger('feedhandler')
+
+
+NONE = 'none'
+GZIP = 'gzip'
+ZSTD = 'zstd'
+
+MAGIC = b'CFCAP'
+VERSION = 1
+_CODECS = (NONE, GZIP, ZSTD)
+
+# magic, version, codec
+_FILE_HEADER = struct.Struct('<5sBBx')
+# compressed size, records, lowest and highest receipt timestamp (ns)
+_BLOCK_HEADER = struct.Struct('<IIqq')
+# receipt timestamp (ns), flags, feed id length, message length
+_RECORD = struct.Struct('<qBHI')
+# lowest and highest receipt timestamp (ns), block offset, records
+_INDEX = struct.Struct('<qqQI')
+
+# the message was a str (utf-8 encoded in the file)
+TEXT = 1
+
+
+Record = namedtuple('Record', ['timestamp', 'feed_id', 'message'])
+
+
+def is_capture(filename: str) -> bool:
+    """
+    True if the file is a binary capture (rather than a text capture, see AsyncFileCallback)
+    """
+    with open(filename, 'rb') as fp:
+        return fp.read(len(MAGIC)) == MAGIC
+
+
+def _compressor(codec: str, level: int = None):
+    if codec == GZIP:
+        level = 6 if level is None else level
+        return lambda data: _gzip(data, level)
+    if codec == ZSTD:
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compress
+    return bytes
+
+
+def _gzip(data: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _decompressor(codec: str):
+    if codec == GZIP:
+        return lambda data: zlib.decompress(data, 16 + zlib.MAX_WBITS)
+    if codec == ZSTD:
+        if zstandard is None:
+            raise ValueError("Reading zstd compressed captures requires zstandard")
+        return zstandard.ZstdDecompressor().decompress
+    return lambda data: data
+
+
+class CaptureWriter:
+    """
+    Raw message capture callback (FeedHandler(raw_message_capture=CaptureWriter(path))) writing
+    binary capture files, see the module documentation.
+
+    Messages are collected into blocks of about `block_size` bytes. Full blocks are compressed
+    and written by a background thread, in order, so the event loop does not wait on the disk.
+    Files are named <path>/<name>.<pid>.<n>.cap (every worker process writes its own) and are
+    rotated once they reach `rotate` bytes.
+
+    Call stop() (done by FeedHandler.run on shutdown) or close() to write the last block.
+    """
+    def __init__(self, path: str, name: str = 'capture', codec: str = None, level: int = None,
+                 block_size: int = 1024 * 1024, rotate: int = 1024 * 1024 * 1024, max_pending: int = 8):
+        """
+        codec: str
+            'zstd' (default if zstandard is installed), 'gzip' or 'none'
+        level: int
+            compression level, defaults to the codec's default
+        max_pending: int
+            number of blocks that can wait for the writer thread before capturing waits for it
+        """
+        if codec is None:
+            codec = ZSTD if zstandard is not None else GZIP
+        if codec not in _CODECS:
+            raise ValueError(f"Invalid capture codec {codec}, must be one of {', '.join(_CODECS)}")
+        if codec == ZSTD and zstandard is None:
+            raise ValueError("zstd compressed captures require zstandard")
+        self.path = path
+        self.name = name
+        self.codec = codec
+        self.compress = _compressor(codec, level)
+        self.block_size = block_size
+        self.rotate = rotate
+        self.max_pending = max_pending
+
+        self.buffer = bytearray()
+        self.records = 0
+        self.lowest = None
+        self.highest = None
+        self.count = 0
+        self.fp = None
+        self.index_fp = None
+        self.filename = None
+        self.executor = None
+        self.pending = deque()
+        atexit.register(self.close)
+
+    async def __call__(self, data, timestamp: float, uuid: str):
+        self.append(data, timestamp, uuid)
+        if len(self.buffer) >= self.block_size:
+            self._submit()
+            while self.pending and (self.pending[0].done() or len(self.pending) > self.max_pending):
+                await asyncio.wrap_future(self.pending.popleft())
+
+    def append(self, data, timestamp: float, uuid: str):
+        timestamp = round(timestamp * 1_000_000_000)
+        flags = 0
+        if isinstance(data, str):
+            data = data.encode()
+            flags = TEXT
+        feed_id = uuid.encode()
+        self.buffer += _RECORD.pack(timestamp, flags, len(feed_id), len(data))
+        self.buffer += feed_id
+        self.buffer += data
+        self.records += 1
+        if self.lowest is None or timestamp < self.lowest:
+            self.lowest = timestamp
+        if self.highest is None or timestamp > self.highest:
+            self.highest = timestamp
+
+    def _cut(self) -> tuple:
+        block = (bytes(self.buffer), self.records, self.lowest, self.highest)
+        self.buffer = bytearray()
+        self.records = 0
+        self.lowest = self.highest = None
+        return block
+
+    def _submit(self):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='capture')
+        self.pending.append(self.executor.submit(self._write, *self._cut()))
+
+    def _open(self):
+        os.makedirs(self.path, exist_ok=True)
+        self.filename = os.path.join(self.path, f"{self.name}.{os.getpid()}.{self.count}.cap")
+        self.fp = open(self.filename, 'wb')
+        self.fp.write(_FILE_HEADER.pack(MAGIC, VERSION, _CODECS.index(self.codec)))
+        self.index_fp = open(self.filename + '.idx', 'wb')
+
+    def _write(self, payload: bytes, records: int, lowest: int, highest: int):
+        if self.fp is None:
+            self._open()
+        payload = self.compress(payload)
+        offset = self.fp.tell()
+        self.fp.write(_BLOCK_HEADER.pack(len(payload), records, lowest, highest))
+        self.fp.write(payload)
+        self.fp.flush()
+        # the index only points at blocks that are on disk
+        self.index_fp.write(_INDEX.pack(lowest, highest, offset, records))
+        self.index_fp.flush()
+        if self.fp.tell() >= self.rotate:
+            self._close_files()
+            self.count += 1
+
+    def _close_files(self):
+        if self.fp is not None:
+            self.fp.close()
+            self.index_fp.close()
+            self.fp = self.index_fp = None
+
+    async def stop(self):
+        if self.records:
+            self._submit()
+        while self.pending:
+            await asyncio.wrap_future(self.pending.popleft())
+        self.close()
+
+    def close(self):
+        """
+        Write the last block and close the file, blocking until queued blocks are written
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        self.pending.clear()
+        if self.records:
+            self._write(*self._cut())
+        self._close_files()
+
+
+class CaptureReader:
+    """
+    Reads a binary capture file. Iterating yields every Record (receipt timestamp in
+    nanoseconds, feed id, message as str or bytes, as it was received) in file order,
+    records(start, end) only those received in [start, end], decompressing only the blocks
+    that can hold them, records(raw=True) messages without copying them.
+    """
+    def __init__(self, filename: str):
+        self.filename = filename
+        with open(filename, 'rb') as fp:
+            header = fp.read(_FILE_HEADER.size)
+        if len(header) < _FILE_HEADER.size:
+            raise ValueError(f"{filename} is not a capture file")
+        magic, version, codec = _FILE_HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not a capture file")
+        if version != VERSION:
+            raise ValueError(f"{filename}: unsupported capture format version {version}")
+        self.codec = _CODECS[codec]
+        self.decompress = _decompressor(self.codec)
+        self._index = None
+
+    def __iter__(self):
+        return self.records()
+
+    def index(self) -> list:
+        """
+        (lowest timestamp, highest timestamp, offset, records) of every block
+        """
+        if self._index is None:
+            self._index = self._load_index()
+        return self._index
+
+    def _load_index(self) -> list:
+        size = os.path.getsize(self.filename)
+        try:
+            with open(self.filename + '.idx', 'rb') as fp:
+                data = fp.read()
+        except FileNotFoundError:
+            return self._scan()
+        entries = [_INDEX.unpack_from(data, pos) for pos in range(0, len(data) - _INDEX.size + 1, _INDEX.size)]
+        if entries:
+            # the capture can have blocks the index is missing if the writer was killed in between
+            _, _, offset, _ = entries[-1]
+            if offset + _BLOCK_HEADER.size > size:
+                return self._scan()
+            with open(self.filename, 'rb') as fp:
+                fp.seek(offset)
+                length = _BLOCK_HEADER.unpack(fp.read(_BLOCK_HEADER.size))[0]
+            if offset + _BLOCK_HEADER.size + length != size:
+                return self._scan()
+        elif size > _FILE_HEADER.size:
+            return self._scan()
+        return entries
+
+    def _scan(self) -> list:
+        LOG.info("%s: rebuilding capture index from block headers", self.filename)
+        entries = []
+        size = os.path.getsize(self.filename)
+        with open(self.filename, 'rb') as fp:
+            offset = _FILE_HEADER.size
+            while offset + _BLOCK_HEADER.size <= size:
+                fp.seek(offset)
+                length, records, lowest, highest = _BLOCK_HEADER.unpack(fp.read(_BLOCK_HEADER.size))
+                if offset + _BLOCK_HEADER.size + length > size:
+                    # truncated last block
+                    break
+                entries.append((lowest, highest, offset, records))
+                offset += _BLOCK_HEADER.size + length
+        return entries
+
+    def _map(self):
+        with open(self.filename, 'rb') as fp:
+            return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def records(self, start: int = None, end: int = None, raw: bool = False):
+        """
+        Records received between `start` and `end` (nanosecond timestamps, inclusive, either
+        can be None), in file order. The file is memory mapped. With raw, messages are memoryviews
+        of the mapped file (uncompressed captures) or of their decompressed block, not copied
+        or decoded.
+        """
+        data = self._map()
+        view = memoryview(data)
+        for lowest, highest, offset, _ in self.index():
+            if start is not None and highest < start or end is not None and lowest > end:
+                continue
+            length = _BLOCK_HEADER.unpack_from(data, offset)[0]
+            offset += _BLOCK_HEADER.size
+            block = memoryview(self.decompress(view[offset:offset + length]))
+            for record in self._block_records(block, raw):
+                if start is not None and record.timestamp < start or end is not None and record.timestamp > end:
+                    continue
+                yield record
+
+    @staticmethod
+    def _block_records(block: memoryview, raw: bool):
+        pos = 0
+        size = len(block)
+        while pos < size:
+            timestamp, flags, feed_length, length = _RECORD.unpack_from(block, pos)
+            pos += _RECORD.size
+            feed_id = str(block[pos:pos + feed_length], 'utf-8')
+            pos += feed_length
+            message = block[pos:pos + length]
+            pos += length
+            if not raw:
+                message = str(message, 'utf-8') if flags & TEXT else bytes(message)
+            yield Record(timestamp, feed_id, message)
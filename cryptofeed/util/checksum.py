@@ -0,0 +1,92 @@
+'''
+Copyright (C) 2017-2020  Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+
+
+Book checksum helpers: per level string caching and sampled validation
+'''
+from collections import defaultdict
+from itertools import islice
+from time import monotonic
+
+from cryptofeed.defines import BID, ASK
+from cryptofeed.exceptions import BadChecksum
+
+
+class BookChecksum:
+    """
+    Exchanges that publish book checksums compute them over a string built from the
+    top levels of the book. Formatting every level on every update dominates the cost
+    of validation, so formatted levels are cached and a level is only re-formatted when
+    its size object changes (unchanged levels keep the same size object in the book).
+
+    Validation can also be sampled, every `interval` book updates and/or every
+    `interval_ms` milliseconds per pair. Snapshots should always be validated.
+    """
+    def __init__(self, feed_id: str, level_format, depth: int = None, interval: int = None, interval_ms: int = None):
+        """
+        level_format: callable
+            takes a price and size and returns the string for the level
+        depth: int
+            number of levels per side covered by the checksum, None for the full book
+        """
+        self.feed_id = feed_id
+        self.level_format = level_format
+        self.depth = depth
+        self.interval = interval
+        self.interval_ms = interval_ms
+        self.updates = defaultdict(int)
+        self.last_validation = defaultdict(float)
+        self.validations = defaultdict(int)
+        self.mismatches = defaultdict(int)
+        self._cache = defaultdict(lambda: {BID: {}, ASK: {}})
+
+    def levels(self, pair: str, book: dict) -> tuple:
+        """
+        Return the formatted levels of the book, best first, as (bids, asks)
+        """
+        cache = self._cache[pair]
+        ret = []
+        for side in (BID, ASK):
+            old = cache[side]
+            new = {}
+            strings = []
+            levels = reversed(book[side].items()) if side == BID else iter(book[side].items())
+            if self.depth:
+                levels = islice(levels, self.depth)
+            for price, size in levels:
+                entry = old.get(price)
+                if entry is None or entry[0] is not size:
+                    entry = (size, self.level_format(price, size))
+                new[price] = entry
+                strings.append(entry[1])
+            cache[side] = new
+            ret.append(strings)
+        return tuple(ret)
+
+    def due(self, pair: str, force=False) -> bool:
+        """
+        Returns True if the pair's checksum should be validated on this update
+        """
+        self.updates[pair] += 1
+        if not force and (self.interval or self.interval_ms):
+            if not ((self.interval and self.updates[pair] >= self.interval) or
+                    (self.interval_ms and (monotonic() - self.last_validation[pair]) * 1000 >= self.interval_ms)):
+                return False
+        self.updates[pair] = 0
+        self.last_validation[pair] = monotonic()
+        return True
+
+    def validate(self, pair: str, computed, expected):
+        self.validations[pair] += 1
+        if computed != expected:
+            self.mismatches[pair] += 1
+            raise BadChecksum(f"{self.feed_id}: checksum validation on {pair} orderbook failed")
+
+    def reset(self, pair: str = None):
+        if pair is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(pair, None)
@@ -0,0 +1,96 @@
+'''
+Copyright (C) 2017-2020  Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+
+
+Decompression of compressed websocket frames, timed separately from parsing
+'''
+import asyncio
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+
+GZIP = 'gzip'
+DEFLATE = 'deflate'
+
+_WBITS = {
+    GZIP: 16 + zlib.MAX_WBITS,
+    # raw deflate, no header
+    DEFLATE: -zlib.MAX_WBITS
+}
+
+
+class Inflater:
+    """
+    Inflates frames that are each a complete gzip or raw deflate stream (Huobi, OKEx/OKCoin).
+    A finished decompressobj cannot be reset for the next stream, and copying a primed one
+    is slower than zlib.decompress, which is used for every frame.
+
+    Frames of at least `offload` bytes are inflated in a worker thread (zlib releases the GIL),
+    so other connections' messages are handled meanwhile. Frames of a connection are still
+    handled in order.
+    """
+    def __init__(self, compression: str, offload: int = None):
+        if compression not in _WBITS:
+            raise ValueError(f"Invalid compression {compression}")
+        self.compression = compression
+        self.wbits = _WBITS[compression]
+        self.offload = offload
+        self.frames = 0
+        self.offloaded = 0
+        self.inflate_time = 0.0
+        self.parse_time = 0.0
+        self.compressed_bytes = 0
+        self.inflated_bytes = 0
+        self.executor = None
+
+    def inflate(self, data: bytes) -> bytes:
+        return zlib.decompress(data, self.wbits)
+
+    def _timed_inflate(self, data: bytes) -> bytes:
+        start = perf_counter()
+        ret = zlib.decompress(data, self.wbits)
+        self.inflate_time += perf_counter() - start
+        return ret
+
+    async def decode(self, data: bytes, loads):
+        """
+        Inflate a frame and parse it with `loads`
+        """
+        self.frames += 1
+        self.compressed_bytes += len(data)
+        if self.offload is not None and len(data) >= self.offload:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'inflate-{self.compression}')
+            self.offloaded += 1
+            data = await asyncio.get_event_loop().run_in_executor(self.executor, self._timed_inflate, data)
+        else:
+            data = self._timed_inflate(data)
+        self.inflated_bytes += len(data)
+
+        start = perf_counter()
+        ret = loads(data)
+        self.parse_time += perf_counter() - start
+        return ret
+
+    def stats(self) -> dict:
+        """
+        Frames handled and offloaded, bytes in and out, and seconds spent inflating and parsing
+        """
+        return {
+            'compression': self.compression,
+            'frames': self.frames,
+            'offloaded': self.offloaded,
+            'compressed_bytes': self.compressed_bytes,
+            'inflated_bytes': self.inflated_bytes,
+            'inflate_time': self.inflate_time,
+            'parse_time': self.parse_time
+        }
+
+    def stop(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
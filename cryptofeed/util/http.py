@@ -0,0 +1,126 @@
+'''
+Copyright (C) 2017-2020  Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+
+
+Shared, pooled HTTP client for feeds' REST requests (book snapshots etc), with a
+token bucket rate limiter per exchange
+'''
+import asyncio
+import logging
+import time
+import weakref
+
+import aiohttp
+
+from cryptofeed.defines import BINANCE, BINANCE_DELIVERY, BINANCE_FUTURES, BINANCE_US, COINBASE
+
+
+LOG = logging.getLogger('feedhandler')
+
+
+# request weight per second and burst size, per exchange. Exchanges not listed are not limited
+RATE_LIMITS = {
+    # 1200 weight per minute
+    BINANCE: (20, 100),
+    BINANCE_US: (20, 100),
+    # 2400 weight per minute
+    BINANCE_FUTURES: (40, 200),
+    BINANCE_DELIVERY: (40, 200),
+    # 3 public requests per second, bursts of 6
+    COINBASE: (3, 6)
+}
+
+
+class TokenBucket:
+    """
+    Token bucket filled at `rate` tokens per second up to `capacity`. acquire() waits
+    until enough tokens are available, callers are served in order.
+    """
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0
+        self._lock = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens: float = 1):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            tokens = min(tokens, self.capacity)
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """
+        Stop handing out tokens for `seconds`, eg when the exchange asks to back off
+        """
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+
+_limiters = {}
+_sessions = weakref.WeakKeyDictionary()
+
+
+def limiter(exchange: str):
+    """
+    The exchange's shared TokenBucket, or None if its requests are not limited
+    """
+    if exchange not in _limiters:
+        limit = RATE_LIMITS.get(exchange)
+        _limiters[exchange] = TokenBucket(*limit) if limit else None
+    return _limiters[exchange]
+
+
+def session() -> aiohttp.ClientSession:
+    """
+    The shared session of the running event loop, connections are pooled and kept alive
+    """
+    loop = asyncio.get_event_loop()
+    ret = _sessions.get(loop)
+    if ret is None or ret.closed:
+        ret = _sessions[loop] = aiohttp.ClientSession()
+    return ret
+
+
+async def close_session():
+    ret = _sessions.pop(asyncio.get_event_loop(), None)
+    if ret is not None and not ret.closed:
+        await ret.close()
+
+
+async def get_json(exchange: str, url: str, weight: float = 1):
+    """
+    GET url on the shared session once the exchange's rate limiter allows `weight`, and
+    return the decoded JSON. A 429 or 418 (banned) response pauses the exchange's limiter
+    for the Retry-After period before the error is raised.
+    """
+    bucket = limiter(exchange)
+    if bucket:
+        await bucket.acquire(weight)
+    async with session().get(url) as response:
+        if response.status in (418, 429):
+            retry_after = int(response.headers.get('Retry-After', 60))
+            LOG.warning("%s: rate limited, pausing requests for %d seconds", exchange, retry_after)
+            if bucket:
+                bucket.pause(retry_after)
+        response.raise_for_status()
+        return await response.json()
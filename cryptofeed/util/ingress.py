@@ -0,0 +1,122 @@
+'''
+Copyright (C) 2017-2020  Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+
+
+Bounded ingress queue between a websocket reader and the feed's message parser
+'''
+import asyncio
+from collections import deque
+
+
+BLOCK = 'block'
+DROP_OLDEST = 'drop_oldest'
+RESYNC = 'resync'
+
+_CLOSED = object()
+
+
+class IngressQueue:
+    """
+    Bounded queue of (message, receipt timestamp) pairs. The reader stamps messages
+    as they come off the socket, so receipt timestamps stay accurate when parsing lags.
+
+    When the queue is full the overflow policy applies:
+        block: the reader waits for the parser (backpressure onto the socket)
+        drop_oldest: the oldest queued message is dropped
+        resync: every queued message is dropped and put() returns False, the connection
+                should be restarted so books are rebuilt from a snapshot
+    """
+    def __init__(self, size: int, policy: str = BLOCK):
+        if size < 1:
+            raise ValueError("Ingress queue size must be at least 1")
+        if policy not in (BLOCK, DROP_OLDEST, RESYNC):
+            raise ValueError(f"Invalid ingress overflow policy {policy}")
+        self.size = size
+        self.policy = policy
+        self.received = 0
+        self.dropped = 0
+        self.resyncs = 0
+        self.high_water = 0
+        self._queue = deque()
+        self._closed = False
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+
+    def __len__(self):
+        return len(self._queue)
+
+    def reset(self):
+        """
+        Empty the queue for a new connection, counters are kept
+        """
+        self._queue.clear()
+        self._closed = False
+        self._not_empty.clear()
+        self._not_full.set()
+
+    async def put(self, message, timestamp: float) -> bool:
+        """
+        Returns False if the message was not queued, either because the queue is aborted
+        or because it overflowed under the resync policy
+        """
+        self.received += 1
+        if len(self._queue) >= self.size:
+            if self.policy == BLOCK:
+                while len(self._queue) >= self.size and not self._closed:
+                    self._not_full.clear()
+                    await self._not_full.wait()
+            elif self.policy == DROP_OLDEST:
+                self._queue.popleft()
+                self.dropped += 1
+            else:
+                self.dropped += len(self._queue) + 1
+                self.resyncs += 1
+                self._queue.clear()
+                return False
+        if self._closed:
+            return False
+
+        self._queue.append((message, timestamp))
+        if len(self._queue) > self.high_water:
+            self.high_water = len(self._queue)
+        self._not_empty.set()
+        return True
+
+    async def get(self) -> tuple:
+        """
+        Returns the next (message, timestamp), or None once the queue is closed and drained
+        """
+        while not self._queue:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        item = self._queue.popleft()
+        self._not_full.set()
+        return None if item is _CLOSED else item
+
+    def close(self):
+        """
+        The reader is done, get() returns None after the queued messages
+        """
+        self._queue.append(_CLOSED)
+        self._not_empty.set()
+
+    def abort(self):
+        """
+        The parser is done, queued messages are discarded and a blocked reader is released
+        """
+        self._closed = True
+        self._queue.clear()
+        self._not_full.set()
+
+    def stats(self) -> dict:
+        return {
+            'depth': len(self._queue),
+            'high_water': self.high_water,
+            'received': self.received,
+            'dropped': self.dropped,
+            'resyncs': self.resyncs
+        }
@@ -0,0 +1,216 @@
+'''
+Copyright (C) 2017-2020  Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+
+
+Compact L3 (order by order) book
+'''
+from array import array
+from collections.abc import Mapping
+
+from sortedcontainers import SortedDict as sd
+
+from cryptofeed.defines import BID, ASK
+
+
+class L3Level(Mapping):
+    """
+    A price level of an L3Book, a read only mapping of order id to size in
+    FIFO (queue) order. The orders live in the book's slot storage, the level
+    only holds the first and last slot of its queue.
+    """
+    __slots__ = ('_book', 'side', 'price', 'head', 'tail', 'count')
+
+    def __init__(self, book, side: str, price):
+        self._book = book
+        self.side = side
+        self.price = price
+        self.head = -1
+        self.tail = -1
+        self.count = 0
+
+    def _slots(self):
+        nxt = self._book._next
+        slot = self.head
+        while slot != -1:
+            yield slot
+            slot = nxt[slot]
+
+    def __getitem__(self, order_id):
+        book = self._book
+        slot = book._index.get(order_id)
+        if slot is None or book._levels[slot] is not self:
+            raise KeyError(order_id)
+        return book._sizes[slot]
+
+    def __contains__(self, order_id):
+        slot = self._book._index.get(order_id)
+        return slot is not None and self._book._levels[slot] is self
+
+    def __iter__(self):
+        ids = self._book._ids
+        for slot in self._slots():
+            yield ids[slot]
+
+    def __len__(self):
+        return self.count
+
+    def items(self):
+        ids, sizes = self._book._ids, self._book._sizes
+        return [(ids[slot], sizes[slot]) for slot in self._slots()]
+
+    def values(self):
+        sizes = self._book._sizes
+        return [sizes[slot] for slot in self._slots()]
+
+    def copy(self) -> dict:
+        return dict(self.items())
+
+    def __repr__(self):
+        return repr(self.copy())
+
+
+class L3Book(Mapping):
+    """
+    An L3 book, keyed by side like the dict books, where each side is a SortedDict
+    of price to L3Level.
+
+    Orders are stored in slots (parallel arrays of order id, size, level and queue
+    links) with a single order id to slot index, so add, modify and cancel are O(1)
+    apart from creating or removing a price level. Freed slots are reused.
+
+    The update methods take an optional delta dict and append the
+    (order_id, price, size) tuples the exchanges emit, size 0 for removed orders.
+    """
+    __slots__ = ('_sides', '_index', '_ids', '_sizes', '_levels', '_next', '_prev', '_free')
+
+    def __init__(self):
+        self._sides = {BID: sd(), ASK: sd()}
+        self._index = {}
+        self._ids = []
+        self._sizes = []
+        self._levels = []
+        self._next = array('i')
+        self._prev = array('i')
+        self._free = -1
+
+    def __getitem__(self, side):
+        return self._sides[side]
+
+    def __iter__(self):
+        return iter(self._sides)
+
+    def __len__(self):
+        return len(self._sides)
+
+    def __repr__(self):
+        return repr(self._sides)
+
+    @property
+    def orders(self) -> int:
+        return len(self._index)
+
+    def order(self, order_id):
+        """
+        Returns (side, price, size) of the order, or None if it is not in the book
+        """
+        slot = self._index.get(order_id)
+        if slot is None:
+            return None
+        level = self._levels[slot]
+        return level.side, level.price, self._sizes[slot]
+
+    def add(self, side: str, order_id, price, size, delta: dict = None):
+        """
+        Add an order to the back of the queue at price. An order already in the
+        book under the same id is removed first and loses its queue position.
+        """
+        if order_id in self._index:
+            self.cancel(order_id, delta)
+
+        levels = self._sides[side]
+        level = levels.get(price)
+        if level is None:
+            level = L3Level(self, side, price)
+            levels[price] = level
+
+        slot = self._free
+        if slot == -1:
+            slot = len(self._ids)
+            self._ids.append(order_id)
+            self._sizes.append(size)
+            self._levels.append(level)
+            self._next.append(-1)
+            self._prev.append(level.tail)
+        else:
+            self._free = self._next[slot]
+            self._ids[slot] = order_id
+            self._sizes[slot] = size
+            self._levels[slot] = level
+            self._next[slot] = -1
+            self._prev[slot] = level.tail
+
+        if level.tail == -1:
+            level.head = slot
+        else:
+            self._next[level.tail] = slot
+        level.tail = slot
+        level.count += 1
+        self._index[order_id] = slot
+
+        if delta is not None:
+            delta[side].append((order_id, price, size))
+
+    def modify(self, order_id, size, delta: dict = None):
+        """
+        Change the size of an order in place, keeping its queue position. A size
+        of zero or less cancels the order. Returns (side, price) of the order or
+        None if it is not in the book.
+        """
+        slot = self._index.get(order_id)
+        if slot is None:
+            return None
+        if size <= 0:
+            return self.cancel(order_id, delta)
+        level = self._levels[slot]
+        self._sizes[slot] = size
+        if delta is not None:
+            delta[level.side].append((order_id, level.price, size))
+        return level.side, level.price
+
+    def cancel(self, order_id, delta: dict = None):
+        """
+        Remove an order from the book. Returns (side, price) of the order or None
+        if it is not in the book.
+        """
+        slot = self._index.pop(order_id, None)
+        if slot is None:
+            return None
+        level = self._levels[slot]
+        nxt, prev = self._next[slot], self._prev[slot]
+        if prev == -1:
+            level.head = nxt
+        else:
+            self._next[prev] = nxt
+        if nxt == -1:
+            level.tail = prev
+        else:
+            self._prev[nxt] = prev
+        level.count -= 1
+        if level.count == 0:
+            del self._sides[level.side][level.price]
+
+        self._ids[slot] = None
+        self._sizes[slot] = None
+        self._levels[slot] = None
+        self._next[slot] = self._free
+        self._free = slot
+
+        if delta is not None:
+            delta[level.side].append((order_id, level.price, 0))
+        return level.side, level.price
+
+    def clear(self):
+        self.__init__()
@@ -0,0 +1,119 @@
+'''
+Copyright (C) 2017-2020  Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+
+
+Central liveness watchdog for connections and channels, on a hashed timer wheel
+'''
+import asyncio
+import logging
+import math
+from time import monotonic
+
+
+LOG = logging.getLogger('feedhandler')
+
+
+class Watch:
+    """
+    Something expected to keep making progress, tracked through a counter. Nothing is
+    done per message: the counter is sampled every `period` seconds and the watch fires
+    when it has not moved for `timeout` seconds.
+    """
+    __slots__ = ('name', 'timeout', 'period', 'count', 'on_silence', 'last_count', 'last_active', 'active')
+
+    def __init__(self, name: str, timeout: float, period: float, count, on_silence):
+        self.name = name
+        self.timeout = timeout
+        self.period = period
+        self.count = count
+        self.on_silence = on_silence
+        self.last_count = count()
+        self.last_active = monotonic()
+        self.active = True
+
+    def cancel(self):
+        self.active = False
+
+    @property
+    def idle(self) -> float:
+        """
+        Seconds since activity was last seen, to within the sampling period
+        """
+        return monotonic() - self.last_active
+
+
+class LivenessMonitor:
+    """
+    One task checks every watch, scheduled on a timer wheel of `slots` slots, `resolution`
+    seconds apart. Silence is detected within timeout + timeout / 20 + resolution.
+    """
+    def __init__(self, resolution: float = 0.5, slots: int = 512):
+        self.resolution = resolution
+        self.wheel = [[] for _ in range(slots)]
+        self.start_time = monotonic()
+        self.tick = 0
+        self.task = None
+
+    def watch(self, name: str, timeout: float, count, on_silence) -> Watch:
+        """
+        Start watching. count: callable returning the current progress counter.
+        on_silence: callable, called with the watch when it times out. The watch is
+        then re-armed, it fires again if the silence lasts another timeout.
+        """
+        watch = Watch(name, timeout, max(self.resolution, timeout / 20), count, on_silence)
+        self._schedule(watch, watch.last_active + watch.period)
+        return watch
+
+    def _schedule(self, watch: Watch, deadline: float):
+        tick = max(math.ceil((deadline - self.start_time) / self.resolution), self.tick + 1)
+        self.wheel[tick % len(self.wheel)].append((tick, watch))
+
+    def advance(self, now: float):
+        """
+        Check the watches that are due by `now`
+        """
+        target = int((now - self.start_time) / self.resolution)
+        while self.tick < target:
+            self.tick += 1
+            index = self.tick % len(self.wheel)
+            slot = self.wheel[index]
+            if not slot:
+                continue
+            self.wheel[index] = []
+            for entry in slot:
+                tick, watch = entry
+                if tick > self.tick:
+                    self.wheel[index].append(entry)
+                elif watch.active:
+                    self._check(watch, now)
+
+    def _check(self, watch: Watch, now: float):
+        count = watch.count()
+        if count != watch.last_count:
+            watch.last_count = count
+            watch.last_active = now
+        elif now - watch.last_active >= watch.timeout:
+            watch.last_active = now
+            try:
+                watch.on_silence(watch)
+            except Exception:
+                LOG.error("Liveness watch %s: error handling timeout", watch.name, exc_info=True)
+        if watch.active:
+            self._schedule(watch, now + watch.period)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.resolution)
+            self.advance(monotonic())
+
+    def start(self, loop):
+        if self.task is None or self.task.done():
+            self.task = loop.create_task(self._run())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
@@ -7,8 +7,14 @@ associated with this software.
 
 This file contains helper functions for performance instrumentation
 '''
+import asyncio
+import logging
+import os
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
+
+
+LOG = logging.getLogger('feedhandler')
 
 
 _perf_data = defaultdict(lambda: defaultdict(dict))
@@ -37,3 +43,72 @@ def perf_log(exchange: str, key: str, stats=1000, stats_only=True):
         print(f"   Max: {_max} ms")
         print(f"   Average: {_avg} ms")
         _perf_stats[stats_key] = []
+
+
+class LoopLagMonitor:
+    """
+    Samples event loop lag: the delay between when a sleep of `interval_ms` should
+    wake up and when the loop actually gets to run it. Sustained lag means message
+    parsing and callbacks are falling behind the wire.
+
+    Percentiles are computed over the last `window` samples, and logged (with the pid,
+    so each worker process reports its own loop) every `report_interval` seconds.
+    """
+    def __init__(self, interval_ms: float = 5, window: int = 10000, report_interval: float = 60, callback=None):
+        """
+        callback: function
+            if set, called with the stats dict at every report instead of logging it
+        """
+        self.interval = interval_ms / 1000
+        self.samples = deque(maxlen=window)
+        self.report_interval = report_interval
+        self.callback = callback
+        self.max_lag = 0.0
+        self._task = None
+
+    def start(self, loop=None):
+        loop = loop or asyncio.get_event_loop()
+        self._task = loop.create_task(self._sample())
+        return self._task
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _sample(self):
+        last_report = time.monotonic()
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - start - self.interval, 0.0)
+            self.samples.append(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+            if self.report_interval and now - last_report >= self.report_interval:
+                last_report = now
+                self.report()
+
+    def stats(self) -> dict:
+        """
+        Loop lag in milliseconds, p50 and p99 over the sample window, max since start
+        """
+        if not self.samples:
+            return {'pid': os.getpid(), 'samples': 0, 'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+        ordered = sorted(self.samples)
+        return {
+            'pid': os.getpid(),
+            'samples': len(ordered),
+            'p50': ordered[len(ordered) // 2] * 1000,
+            'p99': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+            'max': self.max_lag * 1000
+        }
+
+    def report(self):
+        stats = self.stats()
+        if self.callback:
+            self.callback(stats)
+        else:
+            LOG.info("loop lag (pid %d): p50 %.2f ms, p99 %.2f ms, max %.2f ms over %d samples",
+                     stats['pid'], stats['p50'], stats['p99'], stats['max'], stats['samples'])
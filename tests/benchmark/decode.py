@@ -0,0 +1,63 @@
+'''
+Copyright (C) 2017-2020  Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+
+
+Per message JSON decode cost of the parsers available to Feed.decode, on typical
+exchange messages. Run with: python -m tests.benchmark.decode
+'''
+import timeit
+from decimal import Decimal
+
+from cryptofeed.feed import Decoder
+
+
+# label: (message, True if the exchange sends numbers as strings, see Feed.string_numbers)
+MESSAGES = {
+    'binance depth': ('{"stream":"btcusdt@depth@100ms","data":{"e":"depthUpdate","E":1598990123456,"s":"BTCUSDT","U":4963452917,"u":4963452932,'
+                     '"b":[["11735.01000000","0.00000000"],["11734.62000000","0.17800000"],["11733.95000000","1.25620000"],["11731.00000000","0.04300000"],'
+                     '["11729.80000000","0.60000000"],["11728.14000000","0.00000000"]],"a":[["11735.02000000","2.49931100"],["11735.74000000","0.00000000"],'
+                     '["11736.30000000","0.20000000"],["11738.52000000","0.55300000"],["11740.00000000","3.20500000"]]}}', True),
+    'binance trade': ('{"stream":"btcusdt@aggTrade","data":{"e":"aggTrade","E":1598990123457,"s":"BTCUSDT","a":379431547,"p":"11735.02000000",'
+                     '"q":"0.04200000","f":414106712,"l":414106712,"T":1598990123455,"m":false,"M":true}}', True),
+    'coinbase open': ('{"type":"open","side":"buy","product_id":"BTC-USD","time":"2020-09-01T20:15:23.456789Z","sequence":17312334522,'
+                     '"price":"11735.01","order_id":"4f2a6d3c-8a41-4e33-9ec0-7b7a1f0a54c2","remaining_size":"0.25"}', True),
+    'coinbase match': ('{"type":"match","trade_id":102384712,"maker_order_id":"a6f13f7c-3c54-4a53-9a3c-4d5d0b4d4a11","taker_order_id":'
+                      '"4f2a6d3c-8a41-4e33-9ec0-7b7a1f0a54c2","side":"sell","size":"0.01000000","price":"11735.01000000","product_id":"BTC-USD",'
+                      '"sequence":17312334530,"time":"2020-09-01T20:15:23.512345Z"}', True),
+    'bitmex book': ('{"table":"orderBookL2","action":"update","data":[{"symbol":"XBTUSD","id":8798826500,"side":"Sell","size":125470,"price":11735.5},'
+                   '{"symbol":"XBTUSD","id":8798826550,"side":"Buy","size":40150,"price":11734.5}]}', False)
+}
+
+
+def cases(string_numbers: bool) -> list:
+    ret = []
+    for parser in Decoder.PARSERS:
+        for parse_numeric in (Decimal, float):
+            try:
+                # orjson only decodes to Decimal on exchanges that send numbers as strings
+                decoder = Decoder(parse_numeric, string_numbers=string_numbers, parser=parser)
+            except ValueError:
+                continue
+            ret.append((f"{parser}, {parse_numeric.__name__}", decoder))
+    return ret
+
+
+def run(number: int = 50000):
+    for label, (msg, string_numbers) in MESSAGES.items():
+        print(f"{label} ({len(msg)} bytes)")
+        decoders = cases(string_numbers)
+        for name, decoder in decoders:
+            elapsed = timeit.timeit(lambda: decoder.loads(msg), number=number)
+            print(f"    {name:<30} {elapsed / number * 1e6:7.2f} us")
+        if label.startswith('coinbase'):
+            # cost of the type prefilter Coinbase uses with the json parser
+            decoder = decoders[0][1]
+            elapsed = timeit.timeit(lambda: decoder.field(msg, 'type'), number=number)
+            print(f"    {'field(type) only':<30} {elapsed / number * 1e6:7.2f} us")
+
+
+if __name__ == '__main__':
+    run()